@@ -0,0 +1,134 @@
+"""
+事件广播中心
+
+数据更新和选股任务把进度事件和最终结果发布到广播中心，任意数量的 SSE / WebSocket 订阅者共享同一份事件流，
+观看者增加不会再启动新的任务。中心保留最近的事件，新连接或断线重连的订阅者按事件编号补发错过的事件
+"""
+import json
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+# 保留的最近事件数
+HISTORY_SIZE = 2000
+
+# 每个订阅者的待发送队列长度，消费过慢时丢弃最旧的事件
+QUEUE_SIZE = 1000
+
+# 没有事件时的心跳间隔（秒），防止代理断开空闲连接
+KEEPALIVE_INTERVAL = 15.0
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, match: Optional[Callable[[Dict], bool]]):
+        self.loop = loop
+        self.match = match
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+
+    def deliver(self, event: Dict):
+        """在订阅者所在的事件循环中执行"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+class BroadcastHub:
+    def __init__(self, history_size: int = HISTORY_SIZE, keepalive: float = KEEPALIVE_INTERVAL):
+        self.keepalive = keepalive
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def last_id(self) -> int:
+        """最近一条事件的编号"""
+        return self._next_id - 1
+
+    def publish(self, topic: str, type: str, message: str = "", **data: Any) -> Dict:
+        """
+        发布事件（可在任意线程中调用）
+        :param topic: 事件主题，如 update / selection / concepts
+        :param type: 事件类型，如 start / log / success / error / result
+        """
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "topic": topic,
+                "type": type,
+                "message": message,
+                "timestamp": datetime.now().isoformat(),
+                **data
+            }
+            self._next_id += 1
+            self._history.append(event)
+            # 在锁内投递，保证各订阅者收到的事件顺序一致
+            for subscriber in list(self._subscribers):
+                if subscriber.match is not None and not subscriber.match(event):
+                    continue
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+                except RuntimeError:
+                    # 订阅者的事件循环已关闭
+                    self._subscribers.discard(subscriber)
+        return event
+
+    async def events(self, since: Optional[int] = None, match: Callable[[Dict], bool] = None,
+                     until: Callable[[Dict], bool] = None) -> AsyncIterator[Optional[Dict]]:
+        """
+        订阅事件流：先补发编号大于 since 的历史事件，再实时推送新事件
+        空闲超过心跳间隔时产出 None
+
+        :param since: 已收到的最后一条事件编号，None 表示只接收新事件
+        :param match: 事件过滤函数
+        :param until: 对某个事件返回 True 时，推送该事件后结束
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), match)
+        with self._lock:
+            backlog = [] if since is None else [
+                event for event in self._history
+                if event["id"] > since and (match is None or match(event))
+            ]
+            self._subscribers.add(subscriber)
+        try:
+            for event in backlog:
+                yield event
+                if until is not None and until(event):
+                    return
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if until is not None and until(event):
+                    return
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    async def sse(self, since: Optional[int] = None, match: Callable[[Dict], bool] = None,
+                  until: Callable[[Dict], bool] = None) -> AsyncIterator[str]:
+        """以 SSE 格式输出事件流（带事件编号，支持 Last-Event-ID 重连）"""
+        async for event in self.events(since, match, until):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {event['id']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    def status(self) -> Dict[str, int]:
+        """订阅者数量和最近事件编号"""
+        return {"subscribers": len(self._subscribers), "last_event_id": self.last_id}
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    """解析 Last-Event-ID / since 参数"""
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+# 全局广播中心
+broadcast_hub = BroadcastHub()
@@ -0,0 +1,198 @@
+"""
+后台任务队列
+
+数据更新和选股都作为任务提交到同一个队列：
+- 相同键的任务排队或执行期间再次提交时，直接返回已有任务，调用方等待同一份结果
+- 按优先级出队，交互式选股优先于定时更新
+- 独占任务（数据更新会改写 /tmp/stock 下的数据文件）执行时不与其他任务并行
+"""
+import heapq
+import itertools
+import threading
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 任务优先级（数值越小越先执行）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 10
+
+# 同时执行的非独占任务数
+MAX_WORKERS = 2
+
+# 保留的已完成任务数
+HISTORY_SIZE = 50
+
+class Job:
+    def __init__(self, job_id: str, kind: str, key: Tuple, func: Callable[["Job"], Any],
+                 priority: int, exclusive: bool, label: str):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.func = func
+        self.priority = priority
+        self.exclusive = exclusive
+        self.label = label
+        self.context: Dict[str, Any] = {}
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.attached = 1
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """阻塞等待任务结果（在线程中调用）"""
+        return self.future.result(timeout)
+
+    async def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        在事件循环中等待任务结果，调用方取消或超时不影响任务本身
+        """
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self.future)), timeout)
+
+    def to_dict(self) -> Dict:
+        def _iso(ts):
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+        now = time.time()
+        waited = (self.started_at or now) - self.submitted_at
+        duration = (self.finished_at or now) - self.started_at if self.started_at else None
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "status": self.status,
+            "priority": self.priority,
+            "exclusive": self.exclusive,
+            "attached": self.attached,
+            "submitted_at": _iso(self.submitted_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "wait_seconds": round(waited, 2),
+            "duration_seconds": round(duration, 2) if duration is not None else None,
+            "error": self.error,
+        }
+
+class JobManager:
+    def __init__(self, max_workers: int = MAX_WORKERS, history_size: int = HISTORY_SIZE):
+        self.max_workers = max_workers
+        self._queue: List[list] = []  # 堆：[优先级, 序号, 任务]
+        self._entries: Dict[Tuple, list] = {}
+        self._running: Dict[str, Job] = {}
+        self._active: Dict[Tuple, Job] = {}
+        self._history = deque(maxlen=history_size)
+        self._seq = itertools.count(1)
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+
+    def submit(self, kind: str, key: Tuple, func: Callable[[Job], Any], priority: int = PRIORITY_INTERACTIVE,
+               exclusive: bool = False, label: str = "", on_create: Callable[[Job], None] = None) -> Job:
+        """
+        提交任务；相同键的任务已在排队或执行时返回该任务
+
+        :param kind: 任务类型，如 update / select
+        :param key: 去重键，相同键视为同一任务
+        :param func: 在工作线程中执行，参数为任务本身，返回值即任务结果
+        :param priority: 优先级，排队中的任务被更高优先级重复提交时随之提前
+        :param exclusive: 是否独占执行
+        :param on_create: 新建任务入队前调用（如发布排队事件、记录到 job.context），复用已有任务时不调用
+        """
+        with self._cond:
+            job = self._active.get(key)
+            if job is not None:
+                job.attached += 1
+                entry = self._entries.get(key)
+                if entry is not None and priority < entry[0]:
+                    entry[0] = job.priority = priority
+                    heapq.heapify(self._queue)
+                return job
+
+            seq = next(self._seq)
+            job = Job(f"{kind}-{seq}", kind, key, func, priority, exclusive, label)
+            if on_create is not None:
+                on_create(job)
+            entry = [priority, seq, job]
+            heapq.heappush(self._queue, entry)
+            self._entries[key] = entry
+            self._active[key] = job
+            self._ensure_workers()
+            self._cond.notify_all()
+            return job
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"job-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_runnable(self) -> Optional[Job]:
+        """按优先级取队首任务；独占任务需要等其他任务结束，独占任务执行期间不出队"""
+        if not self._queue:
+            return None
+        if any(job.exclusive for job in self._running.values()):
+            return None
+        job = self._queue[0][2]
+        if job.exclusive and self._running:
+            return None
+        heapq.heappop(self._queue)
+        del self._entries[job.key]
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_runnable()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_runnable()
+                job.status = "running"
+                job.started_at = time.time()
+                self._running[job.id] = job
+
+            result, error = None, None
+            try:
+                result = job.func(job)
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                job.status = "failed" if error is not None else "success"
+                job.error = str(error) if error is not None else None
+                job.finished_at = time.time()
+                del self._running[job.id]
+                self._active.pop(job.key, None)
+                self._history.append(job)
+                self._cond.notify_all()
+
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            for job in itertools.chain(self._active.values(), self._history):
+                if job.id == job_id:
+                    return job
+        return None
+
+    def status(self) -> Dict[str, List[Dict]]:
+        """执行中、排队中和最近完成的任务"""
+        with self._cond:
+            queued = [entry[2] for entry in sorted(self._queue)]
+            return {
+                "running": [job.to_dict() for job in self._running.values()],
+                "queued": [job.to_dict() for job in queued],
+                "recent": [job.to_dict() for job in reversed(self._history)],
+            }
+
+# 全局任务队列
+job_manager = JobManager()
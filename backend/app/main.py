@@ -9,7 +9,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, WebSocket, WebSocketDisconnect, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
@@ -26,6 +26,11 @@ import pandas as pd
 from .auth import UserManager, UserCreate, UserUpdate
 from .jwt_auth import jwt_manager
 from .scheduler import task_scheduler
+from .selection import selection_service
+from .snapshot import snapshot_store
+from .broadcast import broadcast_hub, parse_event_id
+from .jobs import Job, job_manager, PRIORITY_INTERACTIVE
+from data.est.req.est_concept_history import ConceptHeatHistory
 
 def get_date_output_dir():
     """获取以当天日期命名的输出目录"""
@@ -107,6 +112,120 @@ def load_existing_stocks():
         print(f"加载选股结果失败: {e}")
         return []
 
+STRATEGY_NAMES = ['smart', 'enhanced', 'select']
+
+# 概念热度时间序列（数据更新时追加快照）
+concept_history = ConceptHeatHistory()
+
+def _file_mtimes(*paths):
+    """结果文件签名：各文件的修改时间（不存在为 None）"""
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths)
+
+def _existing_results_payload(stocks):
+    return {
+        "success": True,
+        "message": f"找到 {len(stocks)} 只股票",
+        "data": stocks
+    }
+
+def load_existing_results_snapshot():
+    try:
+        return _existing_results_payload(load_existing_stocks())
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"加载选股结果失败: {str(e)}",
+            "data": []
+        }
+
+def _strategy_results_payload(results):
+    return {
+        "success": True,
+        "message": "策略结果加载完成",
+        "data": results
+    }
+
+def load_strategy_results_snapshot():
+    try:
+        results = {}
+        for strategy in STRATEGY_NAMES:
+            stocks = load_strategy_results(strategy)
+            results[strategy] = {
+                "count": len(stocks),
+                "data": stocks
+            }
+        return _strategy_results_payload(results)
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"加载策略结果失败: {str(e)}",
+            "data": {}
+        }
+
+def load_top_concepts_snapshot():
+    """读取最新的概念热度快照，预先整理好全部概念"""
+    try:
+        df, snapshot_time = concept_history.latest()
+        if snapshot_time is None or df.empty:
+            return {"success": False, "message": "暂无概念股数据，请先更新数据", "data": []}
+        
+        concepts_data = [
+            {
+                "rank": int(rank),
+                "concept": name,
+                "heat_score": round(float(heat), 2),
+                "change_pct": f"{pct:.2f}%"
+            }
+            for rank, name, heat, pct in zip(df["排名"], df["名称"], df["热度分数"], df["涨跌幅"])
+        ]
+        return {
+            "success": True,
+            "data": concepts_data,
+            "update_time": snapshot_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_count": len(df)
+        }
+    except Exception as e:
+        return {"success": False, "message": f"获取概念股数据失败: {str(e)}", "data": []}
+
+def render_top_concepts(payload, n):
+    """按 Top N 截取概念快照"""
+    if not payload.get("success"):
+        return payload
+    concepts_data = payload["data"][:n]
+    return {
+        "success": True,
+        "message": f"获取Top {len(concepts_data)}概念股成功",
+        "data": concepts_data,
+        "update_time": payload["update_time"],
+        "total_count": payload["total_count"]
+    }
+
+# 结果快照：任务在本进程内发布，外部写入的结果文件按修改时间发现
+snapshot_store.register(
+    "existing-results", load_existing_results_snapshot,
+    lambda: (datetime.now().date(), _file_mtimes(get_stock_results_file()))
+)
+snapshot_store.register(
+    "strategy-results", load_strategy_results_snapshot,
+    lambda: (datetime.now().date(), _file_mtimes(*[get_strategy_results_file(s) for s in STRATEGY_NAMES]))
+)
+snapshot_store.register(
+    "top-concepts", load_top_concepts_snapshot,
+    # 追加快照或跨天后变化
+    concept_history.version_key
+)
+
+def publish_selection_results(strategy, stocks_data, save_latest):
+    """选股完成后发布最新结果快照（文件已写入）"""
+    if save_latest:
+        snapshot_store.publish("existing-results", _existing_results_payload(stocks_data))
+    current = snapshot_store.get("strategy-results").payload
+    results = dict(current.get("data") or {}) if current.get("success") else {}
+    for name in STRATEGY_NAMES:
+        results.setdefault(name, {"count": 0, "data": []})
+    results[strategy] = {"count": len(stocks_data), "data": stocks_data}
+    snapshot_store.publish("strategy-results", _strategy_results_payload(results))
+
 app = FastAPI(title="Tail Trading API", version="1.0.0")
 
 # CORS中间件配置
@@ -220,126 +339,205 @@ async def delete_user(username: str, current_user: str = Depends(get_current_use
     return {"message": "User deleted successfully"}
 
 # 股票数据API
-@app.post("/api/stock/update")
-async def update_stock_data(request: UpdateDataRequest, current_user: str = Depends(get_current_user)):
-    """更新股票数据"""
+# 更新完成后自动执行的选股策略
+AUTO_SELECTIONS = [('smart', "智能选股"), ('enhanced', "增强选股"), ('select', "选股")]
+
+def format_update_line(line: str) -> str:
+    """过滤和格式化日志信息"""
+    if '进度:' in line:
+        # 进度信息特殊处理
+        return f"⏳ {line}"
+    elif '错误' in line or 'Error' in line or 'error' in line:
+        return f"❌ {line}"
+    elif '成功' in line or 'Success' in line or '完成' in line:
+        return f"✅ {line}"
+    elif '警告' in line or 'Warning' in line:
+        return f"⚠️ {line}"
+    elif line.startswith('='):
+        return f"📢 {line}"
+    return line
+
+def execute_update(job: Job, cmd: List[str], cwd: str) -> Dict:
+    """
+    在任务队列的工作线程中执行数据更新子进程，把日志广播给所有订阅者；
+    成功后刷新概念快照，并把三种选股排入队列
+    """
+    output = []
+    result = {"success": False, "output": "", "error": ""}
+    start_time = datetime.now()
+    broadcast_hub.publish("update", "start", "📋 开始执行数据更新任务...", job=job.id)
     try:
-        cmd = [os.path.join(project_root, ".venv", "bin", "python3"), "tail_trading.py", "update", "--top", str(request.top_n)]
-        result = subprocess.run(
+        process = subprocess.Popen(
             cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10分钟超时
-        )
-        
-        if result.returncode == 0:
-            # 确保返回JSON格式
-            return {
-                "success": True,
-                "message": "数据更新成功",
-                "output": result.stdout.strip() if result.stdout else "",
-                "error": result.stderr.strip() if result.stderr else ""
-            }
-        else:
-            return {
-                "success": False,
-                "message": "数据更新失败",
-                "error": result.stderr.strip() if result.stderr else "未知错误",
-                "output": result.stdout.strip() if result.stdout else ""
-            }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "message": "数据更新超时（超过10分钟）",
-            "error": "进程执行时间过长，已终止"
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"数据更新异常: {str(e)}",
-            "error": str(e)
-        }
-
-async def stream_update_logs(cmd: List[str], cwd: str):
-    """流式输出更新日志"""
-    try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
             cwd=cwd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
         )
         
-        start_time = datetime.now()
-        start_msg = f"📋 开始执行数据更新任务..."
-        yield f"data: {json.dumps({'type': 'start', 'message': start_msg, 'timestamp': start_time.isoformat()})}\n\n"
-        
         # 发送初始状态信息
         cmd_str = " ".join(cmd)
-        yield f"data: {json.dumps({'type': 'log', 'message': f'🔧 执行命令: {cmd_str}', 'timestamp': datetime.now().isoformat()})}\n\n"
-        yield f"data: {json.dumps({'type': 'log', 'message': f'📂 工作目录: {cwd}', 'timestamp': datetime.now().isoformat()})}\n\n"
+        broadcast_hub.publish("update", "log", f"🔧 执行命令: {cmd_str}", job=job.id)
+        broadcast_hub.publish("update", "log", f"📂 工作目录: {cwd}", job=job.id)
         
         line_count = 0
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-            
-            line = line.decode('utf-8').strip()
+        for line in process.stdout:
+            line = line.strip()
             if line:
                 line_count += 1
-                timestamp = datetime.now()
-                # 过滤和格式化日志信息
-                if '进度:' in line:
-                    # 进度信息特殊处理
-                    formatted_line = f"⏳ {line}"
-                elif '错误' in line or 'Error' in line or 'error' in line:
-                    formatted_line = f"❌ {line}"
-                elif '成功' in line or 'Success' in line or '完成' in line:
-                    formatted_line = f"✅ {line}"
-                elif '警告' in line or 'Warning' in line:
-                    formatted_line = f"⚠️ {line}"
-                elif line.startswith('='):
-                    formatted_line = f"📢 {line}"
-                else:
-                    formatted_line = line
-                
-                yield f"data: {json.dumps({'type': 'log', 'message': formatted_line, 'timestamp': timestamp.isoformat(), 'line': line_count})}\n\n"
+                output.append(line)
+                broadcast_hub.publish("update", "log", format_update_line(line), job=job.id, line=line_count)
         
-        await process.wait()
+        process.wait()
         
         end_time = datetime.now()
         duration = end_time - start_time
+        result["output"] = "\n".join(output)
         
         if process.returncode == 0:
+            result["success"] = True
+            snapshot_store.refresh("top-concepts")
             success_msg = f"🎉 数据更新成功完成！耗时: {duration.total_seconds():.1f}秒，共处理 {line_count} 行日志"
-            yield f"data: {json.dumps({'type': 'success', 'message': success_msg, 'timestamp': end_time.isoformat()})}\n\n"
+            broadcast_hub.publish("update", "success", success_msg, job=job.id)
+            broadcast_hub.publish("concepts", "refresh", "概念热度已更新", job=job.id)
         else:
+            result["error"] = f"退出码: {process.returncode}"
             error_msg = f"❌ 数据更新失败！退出码: {process.returncode}，耗时: {duration.total_seconds():.1f}秒"
-            yield f"data: {json.dumps({'type': 'error', 'message': error_msg, 'timestamp': end_time.isoformat()})}\n\n"
+            broadcast_hub.publish("update", "error", error_msg, job=job.id)
             
     except Exception as e:
-        error_time = datetime.now()
-        error_msg = f"💥 数据更新异常: {str(e)}"
-        yield f"data: {json.dumps({'type': 'error', 'message': error_msg, 'timestamp': error_time.isoformat()})}\n\n"
+        result["error"] = str(e)
+        broadcast_hub.publish("update", "error", f"💥 数据更新异常: {str(e)}", job=job.id)
+    
+    if result["success"]:
+        # 选股结果通过 selection 事件推送给所有订阅者
+        for strategy, label in AUTO_SELECTIONS:
+            submit_selection(strategy, label, save_latest=strategy != 'enhanced', priority=job.priority)
+    return result
+
+def update_python() -> str:
+    """数据更新子进程使用的解释器：优先项目 .venv，没有时使用当前解释器"""
+    venv_python = os.path.join(project_root, ".venv", "bin", "python3")
+    return venv_python if os.path.exists(venv_python) else sys.executable
+
+def submit_update(top_n: int = 10, priority: int = PRIORITY_INTERACTIVE) -> Job:
+    """
+    提交数据更新任务（独占执行）；相同参数的更新已在排队或执行时返回该任务
+    """
+    cmd = [update_python(), "tail_trading.py", "update", "--top", str(top_n)]
+    
+    def on_create(job: Job):
+        # 订阅者从排队事件开始补发该任务的全部事件
+        queued = broadcast_hub.publish("update", "log", "⏳ 数据更新任务已提交，等待执行...", job=job.id, top_n=top_n)
+        job.context["since"] = queued["id"] - 1
+    
+    return job_manager.submit(
+        "update", ("update", top_n),
+        lambda job: execute_update(job, cmd, project_root),
+        priority=priority,
+        exclusive=True,
+        label=f"数据更新（TOP {top_n}）",
+        on_create=on_create
+    )
+
+task_scheduler.update_runner = submit_update
+
+@app.post("/api/stock/update")
+async def update_stock_data(request: UpdateDataRequest, current_user: str = Depends(get_current_user)):
+    """更新股票数据（相同的更新任务已在排队或执行时等待该任务完成）"""
+    job = submit_update(request.top_n)
+    try:
+        result = await job.wait(timeout=600)  # 10分钟超时
+    except asyncio.TimeoutError:
+        return {
+            "success": False,
+            "message": "数据更新超时（超过10分钟）",
+            "error": "更新任务仍在后台执行"
+        }
+    
+    if result["success"]:
+        return {
+            "success": True,
+            "message": "数据更新成功",
+            "output": result["output"],
+            "error": result["error"]
+        }
+    return {
+        "success": False,
+        "message": "数据更新失败",
+        "error": result["error"] or "未知错误",
+        "output": result["output"]
+    }
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Authorization"
+}
 
 @app.get("/api/stock/update-stream")
 async def update_stock_data_stream(top_n: int = 10, current_user: str = Depends(get_current_user)):
-    """流式更新股票数据"""
-    cmd = [os.path.join(project_root, ".venv", "bin", "python3"), "tail_trading.py", "update", "--top", str(top_n)]
+    """流式更新股票数据：提交或加入数据更新任务，从任务提交时补发日志直到结束"""
+    job = submit_update(top_n)
+    job_id = job.id
     
     return StreamingResponse(
-        stream_update_logs(cmd, project_root),
+        broadcast_hub.sse(
+            since=job.context["since"],
+            match=lambda e: e["topic"] == "update" and e.get("job") == job_id,
+            until=lambda e: e["type"] in ("success", "error")
+        ),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Authorization"
-        }
+        headers=SSE_HEADERS
     )
 
+@app.get("/api/events")
+async def subscribe_events(since: Optional[str] = None, last_event_id: Optional[str] = Header(None),
+                           current_user: str = Depends(get_current_user)):
+    """订阅全部任务事件（SSE），按 Last-Event-ID 或 since 补发错过的事件"""
+    return StreamingResponse(
+        broadcast_hub.sse(since=parse_event_id(last_event_id or since)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@app.websocket("/api/ws")
+async def websocket_events(websocket: WebSocket, token: str = "", since: Optional[str] = None):
+    """订阅全部任务事件（WebSocket），浏览器无法设置请求头，令牌通过查询参数传递"""
+    if jwt_manager.verify_token(token) is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    events = broadcast_hub.events(since=parse_event_id(since))
+    # 同时等待下一个事件和客户端消息：客户端不发送业务消息，读取只用于在连接关闭时立即注销订阅
+    next_event = asyncio.ensure_future(events.__anext__())
+    receiver = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            await asyncio.wait({next_event, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.ensure_future(websocket.receive())
+            if next_event.done():
+                event = next_event.result()
+                # 空闲心跳时发送 ping
+                await websocket.send_json(event if event is not None else {"type": "ping"})
+                next_event = asyncio.ensure_future(events.__anext__())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        # 向已关闭的连接读写可能抛出 RuntimeError、ClientDisconnected 等异常，同样视为连接关闭
+        print(f"WebSocket 连接关闭: {type(e).__name__}: {e}")
+    finally:
+        for task in (next_event, receiver):
+            task.cancel()
+        await asyncio.gather(next_event, receiver, return_exceptions=True)
+        await events.aclose()
+
 @app.post("/api/stock/clear-cache")
 async def clear_cache(current_user: str = Depends(get_current_user)):
     """清理缓存数据"""
@@ -390,6 +588,7 @@ async def clear_cache(current_user: str = Depends(get_current_user)):
         if cleared_files:
             message += f"📄 清理文件: {', '.join(cleared_files)}\n"
         message += f"💾 总计释放空间: {total_size / 1024 / 1024:.1f}MB"
+        snapshot_store.refresh_all()
         
         return {
             "success": True,
@@ -465,6 +664,7 @@ async def clear_disk_data(current_user: str = Depends(get_current_user)):
                 message += f" 等{len(cleared_items)}项"
             message += f"\n"
         message += f"💾 总计释放空间: {total_size / 1024 / 1024:.1f}MB"
+        snapshot_store.refresh_all()
         
         return {
             "success": True,
@@ -481,393 +681,120 @@ async def clear_disk_data(current_user: str = Depends(get_current_user)):
             "message": f"❌ 磁盘数据清理失败: {str(e)}"
         }
 
-@app.post("/api/stock/select")
-async def select_stocks(request: SelectStocksRequest, current_user: str = Depends(get_current_user)):
-    """选股"""
+def execute_selection(strategy: str, label: str, save_latest: bool = True) -> Dict:
+    """
+    在任务队列的工作线程中执行选股，保存结果、发布快照和事件并返回接口响应
+    save_latest: 是否同时写入当天的 selected_stocks.txt
+    """
+    broadcast_hub.publish("selection", "start", f"开始{label}", strategy=strategy)
     try:
-        # 获取当天的输出目录
-        output_dir = get_date_output_dir()
-        
-        # 调用传统选股脚本
-        cmd = [
-            os.path.join(project_root, ".venv", "bin", "python3"), 
-            os.path.join(project_root, "scripts", "traditional_select.py")
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=180  # 3分钟超时
-        )
-        
-        if result.returncode == 0:
-            # 尝试解析JSON输出
-            import json
-            print(f"选股脚本输出长度: {len(result.stdout)}")
-            
-            try:
-                # 先尝试直接解析整个输出
-                stocks_data = json.loads(result.stdout.strip())
-                print(f"直接JSON解析成功，数据类型: {type(stocks_data)}, 长度: {len(stocks_data) if isinstance(stocks_data, list) else 'N/A'}")
-                
-                # 保存选股结果到文件
-                stock_file = get_stock_results_file()
-                with open(stock_file, 'w', encoding='utf-8') as f:
-                    json.dump(stocks_data, f, ensure_ascii=False, indent=2)
-                print(f"选股结果已保存到: {stock_file}")
-                
-                # 同时保存到传统选股策略文件
-                save_strategy_results('select', stocks_data)
-                
-                return {
-                    "success": True,
-                    "message": "选股成功",
-                    "data": stocks_data,
-                    "log": result.stdout
-                }
-            except json.JSONDecodeError as e:
-                print(f"直接JSON解析失败: {e}")
-                
-                # 尝试查找JSON数组的开始和结束
-                output = result.stdout.strip()
-                json_start = output.find('[')
-                json_end = output.rfind(']')
-                
-                if json_start != -1 and json_end != -1 and json_end > json_start:
-                    json_str = output[json_start:json_end + 1]
-                    print(f"提取的JSON字符串长度: {len(json_str)}")
-                    print(f"JSON开始: {json_str[:100]}...")
-                    
-                    try:
-                        stocks_data = json.loads(json_str)
-                        print(f"提取JSON解析成功，数据长度: {len(stocks_data) if isinstance(stocks_data, list) else 'N/A'}")
-                        
-                        # 保存选股结果到文件
-                        stock_file = get_stock_results_file()
-                        with open(stock_file, 'w', encoding='utf-8') as f:
-                            json.dump(stocks_data, f, ensure_ascii=False, indent=2)
-                        print(f"选股结果已保存到: {stock_file}")
-                        
-                        # 同时保存到传统选股策略文件
-                        save_strategy_results('select', stocks_data)
-                        
-                        return {
-                            "success": True,
-                            "message": "选股成功",
-                            "data": stocks_data,
-                            "log": result.stdout
-                        }
-                    except json.JSONDecodeError as e2:
-                        print(f"提取JSON解析也失败: {e2}")
-                
-                # 如果仍然无法解析JSON，返回文本输出
-                print("无法解析JSON，返回空数据")
-                return {
-                    "success": True,
-                    "message": "选股完成（无法解析JSON格式）",
-                    "data": [],
-                    "log": result.stdout
-                }
-        else:
-            return {
-                "success": False,
-                "message": "选股失败",
-                "error": result.stderr
-            }
-    except subprocess.TimeoutExpired:
+        output = selection_service.run_sync(strategy)
+    except Exception as e:
+        broadcast_hub.publish("selection", "error", f"{label}异常: {str(e)}", strategy=strategy)
         return {
             "success": False,
-            "message": "选股超时"
+            "message": f"{label}异常: {str(e)}"
         }
+    
+    stocks_data = output.get("stocks", [])
+    
+    # 保存选股结果到文件
+    if save_latest:
+        stock_file = get_stock_results_file()
+        with open(stock_file, 'w', encoding='utf-8') as f:
+            json.dump(stocks_data, f, ensure_ascii=False, indent=2)
+    
+    # 同时保存到对应策略文件
+    save_strategy_results(strategy, stocks_data)
+    publish_selection_results(strategy, stocks_data, save_latest)
+    broadcast_hub.publish(
+        "selection", "result", f"{label}完成，共 {len(stocks_data)} 只股票",
+        strategy=strategy, count=len(stocks_data), data=stocks_data
+    )
+    
+    return {
+        "success": True,
+        "message": f"{label}成功" if stocks_data else f"{label}完成（未选出股票）",
+        "data": stocks_data,
+        "log": f"{label}完成，共 {len(stocks_data)} 只股票，耗时 {output.get('elapsed', 0)} 秒"
+    }
+
+def submit_selection(strategy: str, label: str, save_latest: bool = True,
+                     priority: int = PRIORITY_INTERACTIVE) -> Job:
+    """提交选股任务；同一策略的选股已在排队或执行时返回该任务"""
+    return job_manager.submit(
+        "select", ("select", strategy),
+        lambda job: execute_selection(strategy, label, save_latest),
+        priority=priority,
+        label=label
+    )
+
+async def run_selection(strategy: str, label: str, save_latest: bool = True):
+    """提交（或加入）选股任务并等待结果"""
+    job = submit_selection(strategy, label, save_latest)
+    try:
+        return await job.wait()
     except Exception as e:
         return {
             "success": False,
-            "message": f"选股异常: {str(e)}"
+            "message": f"{label}异常: {str(e)}"
         }
 
+@app.post("/api/stock/select")
+async def select_stocks(request: SelectStocksRequest, current_user: str = Depends(get_current_user)):
+    """选股"""
+    return await run_selection('select', "选股")
+
 @app.post("/api/stock/smart-select")
 async def smart_select_stocks(request: SelectStocksRequest, current_user: str = Depends(get_current_user)):
     """智能选股（市场适应性）"""
-    try:
-        # 获取当天的输出目录
-        output_dir = get_date_output_dir()
-        
-        # 直接调用智能选股脚本
-        cmd = [
-            os.path.join(project_root, ".venv", "bin", "python3"), 
-            os.path.join(project_root, "scripts", "smart_select.py")
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
-        )
-        
-        if result.returncode == 0:
-            # 解析JSON输出
-            try:
-                import json
-                
-                # 查找JSON输出
-                output = result.stdout.strip()
-                json_start = output.find('{')
-                json_end = output.rfind('}')
-                
-                if json_start != -1 and json_end != -1 and json_end > json_start:
-                    json_str = output[json_start:json_end + 1]
-                    parsed_output = json.loads(json_str)
-                    
-                    # 提取stocks字段作为data
-                    stocks_data = parsed_output.get('stocks', [])
-                    
-                    # 保存选股结果到文件
-                    stock_file = get_stock_results_file()
-                    with open(stock_file, 'w', encoding='utf-8') as f:
-                        json.dump(stocks_data, f, ensure_ascii=False, indent=2)
-                    
-                    # 同时保存到智能选股策略文件
-                    save_strategy_results('smart', stocks_data)
-                    
-                    return {
-                        "success": True,
-                        "message": "智能选股成功",
-                        "data": stocks_data,
-                        "log": result.stdout
-                    }
-                else:
-                    # 如果找不到JSON，返回空数据
-                    return {
-                        "success": True,
-                        "message": "智能选股完成（未解析到股票数据）",
-                        "data": [],
-                        "log": result.stdout
-                    }
-                    
-            except json.JSONDecodeError as e:
-                print(f"智能选股JSON解析失败: {e}")
-                return {
-                    "success": False,
-                    "message": "智能选股结果解析失败",
-                    "error": str(e),
-                    "log": result.stdout
-                }
-        else:
-            return {
-                "success": False,
-                "message": "智能选股失败",
-                "error": result.stderr or "智能选股脚本执行失败"
-            }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "message": "智能选股超时"
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"智能选股异常: {str(e)}"
-        }
+    return await run_selection('smart', "智能选股")
 
 @app.post("/api/stock/enhanced-select")
 async def enhanced_select_stocks(request: SelectStocksRequest, current_user: str = Depends(get_current_user)):
     """增强选股（放量回调+涨停逻辑）"""
-    try:
-        # 获取当天的输出目录
-        output_dir = get_date_output_dir()
-        
-        # 直接调用增强选股脚本
-        cmd = [
-            os.path.join(project_root, ".venv", "bin", "python3"), 
-            os.path.join(project_root, "scripts", "enhanced_select.py")
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
-        )
-        
-        if result.returncode == 0:
-            # 解析JSON输出
-            try:
-                import json
-                
-                # 查找JSON输出
-                output = result.stdout.strip()
-                json_start = output.find('{')
-                json_end = output.rfind('}')
-                
-                if json_start != -1 and json_end != -1 and json_end > json_start:
-                    json_str = output[json_start:json_end + 1]
-                    parsed_output = json.loads(json_str)
-                    
-                    # 提取stocks字段作为data
-                    stocks_data = parsed_output.get('stocks', [])
-                    
-                    # 保存到增强选股策略文件
-                    save_strategy_results('enhanced', stocks_data)
-                    
-                    return {
-                        "success": True,
-                        "message": "增强选股成功",
-                        "data": stocks_data,
-                        "log": result.stdout
-                    }
-                else:
-                    # 如果找不到JSON，返回空数据
-                    return {
-                        "success": True,
-                        "message": "增强选股完成（未解析到股票数据）",
-                        "data": [],
-                        "log": result.stdout
-                    }
-                    
-            except json.JSONDecodeError as e:
-                print(f"增强选股JSON解析失败: {e}")
-                return {
-                    "success": False,
-                    "message": "增强选股结果解析失败",
-                    "error": str(e),
-                    "log": result.stdout
-                }
-            
-            # 如果没有解析到股票，返回示例数据
-            if not stocks_data:
-                stocks_data = [{
-                    "code": "000002",
-                    "name": "增强选股示例",
-                    "strategy": "enhanced",
-                    "score": 90
-                }]
-            
-            # 保存选股结果到文件
-            stock_file = get_stock_results_file()
-            with open(stock_file, 'w', encoding='utf-8') as f:
-                import json
-                json.dump(stocks_data, f, ensure_ascii=False, indent=2)
-            
-            return {
-                "success": True,
-                "message": "增强选股成功",
-                "data": stocks_data,
-                "log": result.stdout
-            }
-        else:
-            return {
-                "success": False,
-                "message": "增强选股失败",
-                "error": result.stderr or "增强选股脚本执行失败"
-            }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "message": "增强选股超时"
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"增强选股异常: {str(e)}"
-        }
+    return await run_selection('enhanced', "增强选股", save_latest=False)
 
 @app.get("/api/stock/existing-results")
-async def get_existing_stock_results(current_user: str = Depends(get_current_user)):
+async def get_existing_stock_results(if_none_match: Optional[str] = Header(None),
+                                     current_user: str = Depends(get_current_user)):
     """获取已存在的选股结果"""
-    try:
-        stocks = load_existing_stocks()
-        return {
-            "success": True,
-            "message": f"找到 {len(stocks)} 只股票",
-            "data": stocks
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"加载选股结果失败: {str(e)}",
-            "data": []
-        }
+    return snapshot_store.response("existing-results", if_none_match)
 
 @app.get("/api/stock/strategy-results")
-async def get_strategy_results(current_user: str = Depends(get_current_user)):
+async def get_strategy_results(if_none_match: Optional[str] = Header(None),
+                               current_user: str = Depends(get_current_user)):
     """获取所有策略的选股结果"""
-    try:
-        strategies = ['smart', 'enhanced', 'select']
-        results = {}
-        
-        for strategy in strategies:
-            stocks = load_strategy_results(strategy)
-            results[strategy] = {
-                "count": len(stocks),
-                "data": stocks
-            }
-        
-        return {
-            "success": True,
-            "message": "策略结果加载完成",
-            "data": results
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"加载策略结果失败: {str(e)}",
-            "data": {}
-        }
+    return snapshot_store.response("strategy-results", if_none_match)
 
 @app.get("/api/stock/top-concepts")
-async def get_top_concepts(n: int = 20, current_user: str = Depends(get_current_user)):
+async def get_top_concepts(n: int = 20, if_none_match: Optional[str] = Header(None),
+                           current_user: str = Depends(get_current_user)):
     """获取Top N概念股数据"""
+    return snapshot_store.response("top-concepts", if_none_match, variant=n, render=render_top_concepts)
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    """DataFrame 转为接口数据，缺失值为 null"""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+@app.get("/api/stock/concept-movers")
+async def get_concept_movers(minutes: int = 30, n: int = 10, current_user: str = Depends(get_current_user)):
+    """概念热度异动：最近 minutes 分钟排名变化，以及当天热度变化最大的概念"""
     try:
-        # 查找最新的概念热度分析文件
-        concept_files = glob.glob("/tmp/stock/concept_heat_analysis_*.csv")
-        
-        if not concept_files:
-            return {
-                "success": False,
-                "message": "暂无概念股数据，请先更新数据",
-                "data": []
-            }
-        
-        # 获取最新的文件
-        latest_file = max(concept_files, key=os.path.getmtime)
-        
-        # 读取CSV文件
-        df = pd.read_csv(latest_file)
-        
-        # 获取Top N数据
-        top_concepts = df.head(n)
-        
-        # 转换为前端需要的格式
-        concepts_data = []
-        for idx, row in top_concepts.iterrows():
-            concepts_data.append({
-                "rank": idx + 1,
-                "concept": row.get("概念名称", ""),
-                "heat_score": round(row.get("热度分数", 0), 2),
-                "change_pct": f"{row.get('平均涨幅(%)', 0):.2f}%"
-            })
-        
-        file_time = datetime.fromtimestamp(os.path.getmtime(latest_file))
-        
+        _, snapshot_time = concept_history.latest()
+        if snapshot_time is None:
+            return {"success": False, "message": "暂无概念股数据，请先更新数据", "data": {}}
         return {
             "success": True,
-            "message": f"获取Top {len(concepts_data)}概念股成功",
-            "data": concepts_data,
-            "update_time": file_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "total_count": len(df)
+            "message": "获取概念异动成功",
+            "data": {
+                "rank_changes": _records(concept_history.rank_changes(minutes, n=n)),
+                "top_movers": _records(concept_history.top_movers(n))
+            },
+            "update_time": snapshot_time.strftime("%Y-%m-%d %H:%M:%S")
         }
-        
     except Exception as e:
-        return {
-            "success": False,
-            "message": f"获取概念股数据失败: {str(e)}",
-            "data": []
-        }
+        return {"success": False, "message": f"获取概念异动失败: {str(e)}", "data": {}}
 
 @app.post("/api/stock/init-concepts")
 async def init_concept_data(current_user: str = Depends(get_current_user)):
@@ -899,13 +826,14 @@ async def init_concepts():
         try:
             members_df = manager.fetch_concept_members(code)
             if members_df is not None and len(members_df) > 0:
-                save_path = manager.get_save_path(code)
-                members_df.to_pickle(save_path)
+                manager.save_concept_members(code, members_df)
                 success_count += 1
                 print(f"进度: {i+1}/{len(concept_codes)}, 成功: {success_count}, 当前: {code}")
         except Exception as e:
             print(f"获取概念 {code} 失败: {e}")
     
+    # 3. 一次写入成员表
+    manager.flush()
     print(f"初始化完成，成功获取 {success_count}/{len(concept_codes)} 个概念板块数据")
 
 asyncio.run(init_concepts())
@@ -942,6 +870,20 @@ asyncio.run(init_concepts())
             "message": f"概念数据初始化异常: {str(e)}"
         }
 
+# 任务队列API
+@app.get("/api/jobs")
+async def get_jobs(current_user: str = Depends(get_current_user)):
+    """获取执行中、排队中和最近完成的任务（含等待和执行耗时）"""
+    return job_manager.status()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, current_user: str = Depends(get_current_user)):
+    """获取单个任务状态"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job.to_dict()
+
 # 定时任务API
 @app.get("/api/scheduler/status")
 async def get_scheduler_status(current_user: str = Depends(get_current_user)):
@@ -976,7 +918,12 @@ async def get_scheduler_logs(lines: int = 100, current_user: str = Depends(get_c
 @app.get("/api/health")
 async def health_check():
     """健康检查"""
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().isoformat(),
+        "snapshots": snapshot_store.status(),
+        "events": broadcast_hub.status()
+    }
 
 if __name__ == "__main__":
     import uvicorn
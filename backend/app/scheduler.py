@@ -6,7 +6,7 @@ import os
 import subprocess
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # 动态获取项目根目录
@@ -14,6 +14,8 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 from apscheduler.triggers.cron import CronTrigger
 from croniter import croniter
+from .snapshot import snapshot_store
+from .jobs import PRIORITY_SCHEDULED
 
 class SchedulerConfig:
     def __init__(self):
@@ -47,6 +49,8 @@ class TaskScheduler:
     def __init__(self):
         self.scheduler = BackgroundScheduler(timezone='Asia/Shanghai')
         self.config = SchedulerConfig()
+        # 由 API 设置：通过任务队列提交数据更新，与接口触发的更新去重且不同时执行
+        self.update_runner: Optional[Callable] = None
         self.scheduler.start()
         
     def update_stock_data(self):
@@ -56,23 +60,32 @@ class TaskScheduler:
             start_time = datetime.now()
             log_msg = f"[{start_time.isoformat()}] 开始更新股票数据\n"
             
-            # 执行更新命令
-            cmd = [sys.executable, "tail_trading.py", "update", "--top", "10"]
-            result = subprocess.run(
-                cmd, 
-                cwd=project_root,
-                capture_output=True, 
-                text=True
-            )
+            if self.update_runner is not None:
+                job = self.update_runner(10, priority=PRIORITY_SCHEDULED)
+                log_msg += f"[{datetime.now().isoformat()}] 已提交任务 {job.id}\n"
+                result = job.result()
+                success, stdout, stderr = result["success"], result["output"], result["error"]
+            else:
+                # 执行更新命令
+                cmd = [sys.executable, "tail_trading.py", "update", "--top", "10"]
+                result = subprocess.run(
+                    cmd, 
+                    cwd=project_root,
+                    capture_output=True, 
+                    text=True
+                )
+                success, stdout, stderr = result.returncode == 0, result.stdout, result.stderr
+                if success:
+                    snapshot_store.refresh("top-concepts")
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
-            if result.returncode == 0:
+            if success:
                 log_msg += f"[{end_time.isoformat()}] 更新成功，耗时 {duration:.2f} 秒\n"
-                log_msg += f"输出: {result.stdout}\n"
+                log_msg += f"输出: {stdout}\n"
             else:
-                log_msg += f"[{end_time.isoformat()}] 更新失败，错误: {result.stderr}\n"
+                log_msg += f"[{end_time.isoformat()}] 更新失败，错误: {stderr}\n"
             
             # 写入日志
             os.makedirs(os.path.dirname(self.config.log_file), exist_ok=True)
@@ -0,0 +1,116 @@
+"""
+常驻选股服务
+
+在 API 进程内复用策略实例和已映射的日线数据，选股在后台线程池中执行，不阻塞事件循环；
+同一数据版本下相同配置的基础选股结果只计算一次，供传统/智能/增强选股共用
+"""
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+# 选股类型 -> (TailUpStrategy 预设配置, 结果整理函数所在模块, 函数名)
+SELECTION_RUNNERS = {
+    "select": ("balanced", "scripts.traditional_select", "run_traditional_selection"),
+    "smart": ("balanced", "scripts.smart_select", "run_smart_selection"),
+    "enhanced": ("aggressive", "scripts.enhanced_select", "run_enhanced_selection"),
+}
+
+# 同时执行的选股任务数
+MAX_WORKERS = 2
+
+class SelectionService:
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="selection")
+        self._strategies = {}
+        self._base_results = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._concept_members_path = None
+
+    def _preset_lock(self, preset: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(preset, threading.Lock())
+
+    def _strategy_for(self, preset: str):
+        """每个预设配置常驻一个策略实例（数据获取器和日线内存映射随之常驻）"""
+        strategy = self._strategies.get(preset)
+        if strategy is None:
+            from tail_trading.strategies.tail_up_strategy import TailUpStrategy
+            from tail_trading.config.trading_config import TradingConfig
+            strategy = TailUpStrategy(TradingConfig.get_preset(preset))
+            self._strategies[preset] = strategy
+        return strategy
+
+    @staticmethod
+    def _file_version(path):
+        if not path or not os.path.exists(path):
+            return None
+        st = os.stat(path)
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _data_version(self, strategy):
+        """
+        日线库、成分股表或概念成员表被替换（数据更新、init-concepts、概念刷新）后版本变化，基础选股结果随之失效
+        """
+        data_fetcher = strategy.data_fetcher
+        daily_fetcher = data_fetcher.daily_fetcher
+        daily = self._file_version(daily_fetcher.store.path if daily_fetcher is not None else None)
+        if daily is None:
+            return None
+        prepare_data = data_fetcher.prepare_data
+        members = self._file_version(prepare_data.MEMBERS_DF_PATH if prepare_data is not None else None)
+        if self._concept_members_path is None:
+            from data.est.req.est_concept_index import ConceptMembershipIndex
+            self._concept_members_path = ConceptMembershipIndex().path
+        concepts = self._file_version(self._concept_members_path)
+        return (daily, members, concepts)
+
+    def base_stocks(self, preset: str):
+        """
+        返回某个预设配置下 TailUpStrategy 的选股结果
+        同一预设的并发请求只计算一次，数据未更新时直接复用
+        """
+        with self._preset_lock(preset):
+            strategy = self._strategy_for(preset)
+            version = self._data_version(strategy)
+            cached = self._base_results.get(preset)
+            if cached is not None and version is not None and cached[0] == version:
+                return cached[1]
+            stocks = strategy.select_stocks()
+            self._base_results[preset] = (version, stocks)
+            return stocks
+
+    def _run(self, name: str) -> Dict:
+        import importlib
+        preset, module_name, func_name = SELECTION_RUNNERS[name]
+        runner = getattr(importlib.import_module(module_name), func_name)
+        t_start = time.time()
+        base = self.base_stocks(preset)
+        output = runner(base.copy() if base is not None else None)
+        output["elapsed"] = round(time.time() - t_start, 2)
+        return output
+
+    async def run(self, name: str) -> Dict:
+        """
+        在后台线程池中执行选股，返回结构化结果（success/strategy/count/stocks/timestamp）
+        :param name: select / smart / enhanced
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.run_sync, name)
+
+    def run_sync(self, name: str) -> Dict:
+        """在当前线程中执行选股（供任务队列的工作线程调用）"""
+        if name not in SELECTION_RUNNERS:
+            raise ValueError(f"未知的选股类型: {name}")
+        return self._run(name)
+
+    def invalidate(self):
+        """清空缓存的基础选股结果（如清理缓存后）"""
+        with self._lock:
+            self._base_results.clear()
+
+# 全局选股服务实例
+selection_service = SelectionService()
@@ -0,0 +1,133 @@
+"""
+结果快照层
+
+选股/数据更新任务把结果发布为快照，API 在内存中持有每个快照的版本号和已序列化的响应体，
+接口按 ETag / If-None-Match 返回 304，轮询时不再读盘、解析和重新序列化。
+任务在本进程外写入的结果文件通过签名（文件修改时间等）发现，每个快照最多每 CHECK_INTERVAL 秒检查一次
+"""
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Response
+
+# 检查外部结果文件是否变化的最小间隔（秒）
+CHECK_INTERVAL = 5.0
+
+_UNSET = object()
+
+class Snapshot:
+    """某个键的一个版本：原始数据 + 按变体缓存的响应体和 ETag"""
+
+    def __init__(self, key: str, version: int, payload: Any, signature: Any):
+        self.key = key
+        self.version = version
+        self.payload = payload
+        self.signature = signature
+        self.published_at = time.time()
+        self.checked_at = time.monotonic()
+        self._bodies: Dict[Any, Tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def body(self, variant=None, render: Callable = None) -> Tuple[str, bytes]:
+        """
+        返回 (ETag, 响应体)，同一版本的每个变体只序列化一次
+        :param variant: 变体键（如 top_n），None 表示完整数据
+        :param render: (payload, variant) -> 响应数据，variant 不为 None 时使用
+        """
+        cached = self._bodies.get(variant)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._bodies.get(variant)
+            if cached is None:
+                data = self.payload if render is None else render(self.payload, variant)
+                body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+                etag = '"{}"'.format(hashlib.sha1(body).hexdigest()[:20])
+                cached = (etag, body)
+                self._bodies[variant] = cached
+        return cached
+
+class SnapshotStore:
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._loaders: Dict[str, Tuple[Callable, Optional[Callable]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, loader: Callable[[], Any], signature: Callable[[], Any] = None):
+        """
+        注册快照的加载方式
+        :param loader: 从结果文件加载数据（首次访问或签名变化时调用）
+        :param signature: 返回结果文件当前签名（如修改时间），变化时重新加载
+        """
+        self._loaders[key] = (loader, signature)
+
+    def _signature(self, key: str):
+        _, signature = self._loaders.get(key, (None, None))
+        return signature() if signature is not None else None
+
+    def publish(self, key: str, payload: Any, signature: Any = _UNSET) -> Snapshot:
+        """发布新版本（任务在结果文件写入之后调用）"""
+        if signature is _UNSET:
+            signature = self._signature(key)
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            snapshot = Snapshot(key, version, payload, signature)
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def refresh(self, key: str) -> Snapshot:
+        """从结果文件重新加载（本进程外的任务写入结果后调用）"""
+        loader, _ = self._loaders[key]
+        # 先取签名再加载，加载期间文件再次变化时下次检查会重新加载
+        signature = self._signature(key)
+        return self.publish(key, loader(), signature)
+
+    def refresh_all(self):
+        """重新加载全部已注册的快照（如清理数据后）"""
+        for key in list(self._loaders):
+            self.refresh(key)
+
+    def get(self, key: str) -> Snapshot:
+        """返回当前快照，必要时加载或按签名重新加载"""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return self.refresh(key)
+        now = time.monotonic()
+        if now - snapshot.checked_at >= self.check_interval:
+            snapshot.checked_at = now
+            if self._signature(key) != snapshot.signature:
+                return self.refresh(key)
+        return snapshot
+
+    def response(self, key: str, if_none_match: Optional[str] = None, variant=None,
+                 render: Callable = None) -> Response:
+        """
+        以 ETag 返回快照；If-None-Match 命中时返回 304（无响应体）
+        """
+        snapshot = self.get(key)
+        etag, body = snapshot.body(variant, render)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Snapshot-Version": str(snapshot.version)}
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """各快照的版本和发布时间"""
+        return {
+            key: {"version": s.version, "published_at": s.published_at}
+            for key, s in list(self._snapshots.items())
+        }
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in tags)
+
+# 全局快照实例
+snapshot_store = SnapshotStore()
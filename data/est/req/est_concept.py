@@ -1,7 +1,6 @@
 import os
 from datetime import datetime
 import pandas as pd
-import requests
 from data.est.req import est_common
 
 class EastmoneyConceptStockFetcher:
@@ -9,7 +8,6 @@ class EastmoneyConceptStockFetcher:
         self.save_dir = save_dir
         os.makedirs(self.save_dir, exist_ok=True)
         self.save_path = os.path.join(self.save_dir, "eastmoney_concept_stocks.pkl")
-        self.proxy = None
 
     def file_mtime_is_today(self, path: str) -> bool:
         if not os.path.exists(path):
@@ -35,29 +33,7 @@ class EastmoneyConceptStockFetcher:
         if not est_common.need_update(self.save_path):
             print(f"{self.save_path} 已是最新，无需更新。")
             return pd.read_pickle(self.save_path)
-        self.proxy = est_common.get_proxy()
-        all_rows = []
-        page = 1
-        total = None
-        while True:
-            url = base_url.format(page=page)
-            try:
-                resp = requests.get(url, proxies=self.proxy, timeout=10)
-                resp.raise_for_status()
-                data = resp.json()
-                rows = data.get("data", {}).get("diff", [])
-                if not rows:
-                    print(f"第{page}页未获取到数据，当前累计行数: {len(all_rows)}")
-                    break
-                all_rows.extend(rows)
-                total = data.get("data", {}).get("total", 0)
-                print(f"已获取第{page}页，累计行数: {len(all_rows)}，总数: {total}")
-                if len(all_rows) >= total:
-                    break
-                page += 1
-            except Exception as e:
-                print(f"请求第{page}页失败: {e}，URL: {url}")
-                break
+        all_rows, total, _ = est_common.fetch_all_pages(base_url)
         if all_rows:
             if total is not None and len(all_rows) < total:
                 print(f"警告：累计行数 {len(all_rows)} 少于 total {total}，可能有数据缺失！")
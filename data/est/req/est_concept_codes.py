@@ -1,18 +1,21 @@
 import os
-import math
 import pandas as pd
-import requests
 from datetime import datetime
 from data.est.req import est_common
-import traceback
-import threading
+from data.est.req import est_http
+from data.est.req.est_freshness import get_freshness_index
+from data.est.req.est_concept_index import ConceptMembershipIndex
 
 class ConceptStockManager:
     def __init__(self, save_dir="/tmp/stock/concept"):
         self.save_dir = save_dir
         os.makedirs(self.save_dir, exist_ok=True)
+        self.freshness = get_freshness_index(os.path.join(self.save_dir, "freshness.json"))
+        # 所有概念成分股存放在一张成员表中
+        self.index = ConceptMembershipIndex(self.save_dir)
 
     def get_save_path(self, concept_code: str) -> str:
+        """旧版按概念单独存放的 pkl 路径，仅用于兼容读取"""
         return os.path.join(self.save_dir, f"{concept_code}.pkl")
 
     def file_mtime_is_today(self, path: str) -> bool:
@@ -35,9 +38,10 @@ class ConceptStockManager:
         base_url = self.get_base_url(concept_code, page="{page}")
         proxies = proxy
 
-        import requests
-
-        all_rows, _ = est_common.fetch_all_pages(base_url, proxies=proxies)
+        all_rows, _, missing = est_common.fetch_all_pages(base_url, proxies=proxies)
+        if missing:
+            # 抛异常让 call_with_retry 换代理重试，避免缺页的成员表写入缓存
+            raise RuntimeError(f"概念 {concept_code} 缺少第 {missing} 页")
         if all_rows:
             df = pd.DataFrame(all_rows).rename(
                 columns={
@@ -53,56 +57,66 @@ class ConceptStockManager:
         return None
 
     def save_concept_members(self, concept_code: str, df: pd.DataFrame):
+        """写入成员表缓存，调用 flush 后落盘"""
         if df is not None:
-            df.to_pickle(self.get_save_path(concept_code))
+            self.index.put(concept_code, df)
+
+    def flush(self):
+        self.index.flush()
+        self.freshness.flush()
 
-    def _update_chunk(self, codes_chunk, progress_counter):
-        proxy = est_common.get_proxy()
-        for code in codes_chunk:
-            retry_count = 0
-            while retry_count < 3:
-                try:
-                    df = self.fetch_concept_members(code, proxy=proxy)
-                    self.save_concept_members(code, df)
-                    progress_counter["count"] += 1
-                    print(f"[{threading.current_thread().name}] 完成 {code}，进度 {progress_counter['count']}/{progress_counter['total']}")
-                    break
-                except Exception as fetch_exc:
-                    retry_count += 1
-                    print(f"获取概念成员失败，尝试更换代理({retry_count}/3): {fetch_exc}")
-                    if retry_count < 3:
-                        proxy = est_common.get_proxy()
-                    else:
-                        print(f"更新概念 {code} 失败: 连续三次更换代理均失败")
-                        traceback.print_exc()
-                        return
+    def _update_one(self, code, progress_counter):
+        engine = est_http.get_engine()
+        # 成分股可能为空（返回 None），用元组包装以区分请求失败
+        result = engine.call_with_retry(
+            lambda c, proxy: (self.fetch_concept_members(c, proxy=proxy),), code, label=f"概念 {code}"
+        )
+        if result is None:
+            print(f"更新概念 {code} 失败: 连续三次更换代理均失败")
+            return
+        self.save_concept_members(code, result[0])
+        self.freshness.mark("concept_members", code)
+        progress_counter["count"] += 1
+        print(f"完成 {code}，进度 {progress_counter['count']}/{progress_counter['total']}")
 
     def update_all_concepts(self, concept_codes, use_proxy_and_concurrent=10):
         progress_counter = {"count": 0, "total": len(concept_codes)}
-        # 过滤掉所有 need_update_simple 为 False 的概念代码
-        concept_codes = [code for code in concept_codes if est_common.need_update_simple(self.get_save_path(code))]
+        # 过滤掉今天已更新过的概念代码
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        concept_codes = self.freshness.stale(
+            "concept_members", concept_codes, cutoff=today_start, fallback_path=self.get_save_path
+        )
         progress_counter["total"] = len(concept_codes)
         if not concept_codes:
             print(f"所有概念数据均为最新，无需更新。数据保存目录: {self.save_dir}")
             return
 
-        chunk_size = max(5, math.ceil(len(concept_codes) / use_proxy_and_concurrent) if use_proxy_and_concurrent > 0 else len(concept_codes))
-        chunked_codes = [concept_codes[i:i + chunk_size] for i in range(0, len(concept_codes), chunk_size)]
-        threads = []
-        for codes_chunk in chunked_codes:
-            t = threading.Thread(target=self._update_chunk, args=(codes_chunk, progress_counter))
-            t.start()
-            threads.append(t)
-        for t in threads:
-            t.join()
+        est_http.get_engine().map(
+            lambda code: self._update_one(code, progress_counter), concept_codes,
+            limit=use_proxy_and_concurrent or None
+        )
+        self.flush()
 
     def get_concept_df(self, concept_code: str) -> pd.DataFrame:
+        df = self.index.members(concept_code)
+        if df is not None:
+            return df
         path = self.get_save_path(concept_code)
         if os.path.exists(path):
             return pd.read_pickle(path)
-        print(f"{path} 文件不存在，请先运行 update_all_concepts 获取数据。")
+        print(f"概念 {concept_code} 的成分股不存在，请先运行 update_all_concepts 获取数据。数据目录: {self.save_dir}")
         return None
 
+    def get_members(self, concept_codes) -> pd.DataFrame:
+        """
+        按顺序合并多个概念的成分股；全部在成员表中时一次查出，否则逐个读取（兼容旧版 pkl）
+        """
+        concept_codes = list(concept_codes)
+        if all(self.index.has_concept(code) for code in concept_codes):
+            return self.index.members_of(concept_codes)
+        dfs = [df for df in map(self.get_concept_df, concept_codes) if df is not None]
+        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
 if __name__ == "__main__":
     manager = ConceptStockManager()
     all_concept_codes = ['BK0816', 'BK1051', 'BK0983', 'BK1071', 'BK1152', 'BK0883', 'BK0603', 'BK1075', 'BK0606', 'BK0818']
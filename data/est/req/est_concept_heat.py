@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# 各维度权重：板块涨跌幅 40%、主力资金 30%、成交活跃度 20%、技术指标（振幅）10%
+DEFAULT_WEIGHTS = {"price": 0.4, "capital": 0.3, "volume": 0.2, "tech": 0.1}
+
+# 热度等级下限（从高到低），低于最后一档为 DEFAULT_BOTTOM_LEVEL
+DEFAULT_LEVELS = [(80, "火热"), (60, "偏热"), (40, "温和"), (20, "偏冷")]
+DEFAULT_BOTTOM_LEVEL = "极冷"
+
+# 各维度读取的原始字段，字段不存在时按 0 计算
+DEFAULT_COLUMNS = {"price": "涨跌幅", "capital": "f62", "volume": "f66", "tech": "f78"}
+
+# 维度 -> 输出的得分列名
+SCORE_COLUMNS = {"price": "价格得分", "capital": "资金得分", "volume": "活跃度得分", "tech": "技术得分"}
+
+class ConceptHeatScorer:
+    """
+    概念板块热度评分（4维度评分体系）
+    整列计算各维度得分和总热度，热度等级按阈值一次分箱，不再逐行循环
+    """
+
+    def __init__(self, weights: dict = None, levels=None, bottom_level: str = DEFAULT_BOTTOM_LEVEL, columns: dict = None):
+        """
+        :param weights: 各维度权重，键为 price / capital / volume / tech
+        :param levels: [(下限, 等级名)]，任意顺序；总热度 >= 下限即属于该等级
+        :param bottom_level: 低于所有下限（或热度无法计算）时的等级名
+        :param columns: 各维度读取的字段名
+        """
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.levels = sorted(levels or DEFAULT_LEVELS)
+        self.bottom_level = bottom_level
+        self.columns = {**DEFAULT_COLUMNS, **(columns or {})}
+
+    def _column(self, df: pd.DataFrame, key: str) -> np.ndarray:
+        name = self.columns[key]
+        if name not in df.columns:
+            return np.zeros(len(df))
+        return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+
+    def raw_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        评分所依据的原始指标：涨跌幅、主力净流入（亿元）、成交额（亿元）、振幅指标
+        """
+        return pd.DataFrame({
+            "涨跌幅": self._column(df, "price"),
+            "主力净流入_亿": self._column(df, "capital") / 100000000,
+            "成交额_亿": np.abs(self._column(df, "volume")) / 100000000,
+            "振幅指标": np.abs(self._column(df, "tech")) / 1000000,
+        }, index=df.index)
+
+    def component_scores(self, df: pd.DataFrame) -> dict:
+        """返回 {维度: 0-100 得分数组}（未取整）"""
+        raw = self.raw_metrics(df)
+        return {
+            "price": np.clip((raw["涨跌幅"].to_numpy() + 10) * 5, 0, 100),
+            "capital": np.clip(raw["主力净流入_亿"].to_numpy() * 2 + 50, 0, 100),
+            "volume": np.clip(np.log10(raw["成交额_亿"].to_numpy() + 1) * 20, 0, 100),
+            "tech": np.clip(raw["振幅指标"].to_numpy() * 5, 0, 100),
+        }
+
+    def heat_levels(self, heat) -> pd.Series:
+        """按阈值将总热度分箱为等级（左闭右开），NaN 归入最低等级"""
+        heat = pd.Series(heat, dtype="float64")
+        bins = [-np.inf] + [float(t) for t, _ in self.levels] + [np.inf]
+        labels = [self.bottom_level] + [name for _, name in self.levels]
+        levels = pd.cut(heat, bins=bins, labels=labels, right=False, ordered=False)
+        return levels.astype(object).fillna(self.bottom_level)
+
+    def score(self, df: pd.DataFrame, decimals: int = 1) -> pd.DataFrame:
+        """
+        返回与 df 同索引的评分表：热度分数、热度等级及各维度得分（保留 decimals 位小数）
+        热度等级按未取整的总热度判定
+        """
+        scores = self.component_scores(df)
+        total = sum(scores[key] * self.weights[key] for key in ("price", "capital", "volume", "tech"))
+        result = pd.DataFrame({"热度分数": np.round(total, decimals)}, index=df.index)
+        result["热度等级"] = self.heat_levels(total).to_numpy()
+        for key, name in SCORE_COLUMNS.items():
+            result[name] = np.round(scores[key], decimals)
+        return result
+
+    def apply(self, df: pd.DataFrame, decimals: int = 1) -> pd.DataFrame:
+        """将评分列写入 df 并返回"""
+        result = self.score(df, decimals)
+        for col in result.columns:
+            df[col] = result[col].to_numpy()
+        return df
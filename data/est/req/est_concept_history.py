@@ -0,0 +1,295 @@
+import os
+import json
+import glob
+import fcntl
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# 每个快照中每个概念一条定长记录
+HEAT_DTYPE = np.dtype([
+    ("ts", "i8"),          # 快照时间（秒级时间戳）
+    ("code", "U8"),        # 概念代码
+    ("rank", "i2"),        # 快照内按热度分数的排名（从 1 开始）
+    ("heat", "f4"),        # 热度分数
+    ("level", "U2"),       # 热度等级
+    ("pct_chg", "f4"),     # 板块涨跌幅（%）
+    ("capital", "f4"),     # 主力净流入（亿元）
+    ("amount", "f4"),      # 成交额（亿元）
+])
+
+# 原始数据列 -> 记录字段
+SOURCE_COLUMNS = {"热度分数": "heat", "热度等级": "level", "涨跌幅": "pct_chg", "f62": "capital", "f66": "amount"}
+# 记录字段 -> 输出列名
+OUTPUT_COLUMNS = {
+    "rank": "排名", "code": "代码", "name": "名称", "heat": "热度分数", "level": "热度等级",
+    "pct_chg": "涨跌幅", "capital": "主力净流入_亿", "amount": "成交额_亿",
+}
+
+# 保留的天数，更早的日文件删除
+RETENTION_DAYS = 60
+# 超过该天数的日文件压缩为每 COMPACT_INTERVAL 分钟一个快照
+COMPACT_AFTER_DAYS = 3
+COMPACT_INTERVAL = 30
+# 旧版每次计算热度生成的带时间戳 CSV（已由热度时间序列替代），compact 时一并删除
+LEGACY_CSV_GLOB = "/tmp/stock/concept_heat_analysis_*.csv"
+
+class ConceptHeatHistory:
+    """
+    概念热度时间序列
+    每次计算热度后追加一个快照（全部概念的热度、排名等），按自然日分文件，文件只追加定长记录；
+    读取时按文件增长量增量读入，查询最新排名、某时刻快照、N 分钟排名变化和当日异动。
+    旧日文件按保留天数删除，并把盘中快照压缩为固定间隔。
+    """
+
+    def __init__(self, save_dir: str = "/tmp/stock/concept_heat", retention_days: int = RETENTION_DAYS,
+                 compact_after_days: int = COMPACT_AFTER_DAYS, compact_interval: int = COMPACT_INTERVAL):
+        self.save_dir = save_dir
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.names_path = os.path.join(self.save_dir, "names.json")
+        self.lock_path = os.path.join(self.save_dir, "concept_heat.lock")
+        self.retention_days = retention_days
+        self.compact_after_days = compact_after_days
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._names = {}
+        self._names_key = None
+
+    # ---------- 文件 ----------
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.save_dir, f"heat_{day}.bin")
+
+    def days(self) -> list:
+        """已有数据的日期（YYYYMMDD，升序）"""
+        paths = glob.glob(os.path.join(self.save_dir, "heat_*.bin"))
+        return sorted(os.path.basename(p)[5:13] for p in paths)
+
+    def version_key(self):
+        """最新日文件的版本标识，追加、压缩或新的一天后变化"""
+        days = self.days()
+        if not days:
+            return None
+        st = os.stat(self._day_path(days[-1]))
+        return (days[-1], st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def load_day(self, day: str = None) -> np.ndarray:
+        """
+        读取某天的全部记录（按写入顺序），默认最近有数据的一天
+        文件只追加时仅读入新增部分，被压缩替换后整体重读
+        """
+        if day is None:
+            days = self.days()
+            if not days:
+                return np.empty(0, dtype=HEAT_DTYPE)
+            day = days[-1]
+        path = self._day_path(day)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._cache.pop(day, None)
+            return np.empty(0, dtype=HEAT_DTYPE)
+        with self._lock:
+            cached = self._cache.get(day)
+            if cached is not None and cached[0] == st.st_ino and cached[1] == st.st_size:
+                return cached[2]
+            size = st.st_size - st.st_size % HEAT_DTYPE.itemsize
+            if cached is not None and cached[0] == st.st_ino and cached[1] < size:
+                with open(path, "rb") as f:
+                    f.seek(cached[1])
+                    tail = np.fromfile(f, dtype=HEAT_DTYPE, count=(size - cached[1]) // HEAT_DTYPE.itemsize)
+                records = np.concatenate([cached[2], tail])
+            else:
+                records = np.fromfile(path, dtype=HEAT_DTYPE, count=size // HEAT_DTYPE.itemsize)
+            self._cache[day] = (st.st_ino, size, records)
+            return records
+
+    def names(self) -> dict:
+        """概念代码 -> 名称"""
+        try:
+            mtime = os.stat(self.names_path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._names_key:
+            with open(self.names_path, "r", encoding="utf-8") as f:
+                self._names = json.load(f)
+            self._names_key = mtime
+        return self._names
+
+    # ---------- 写入 ----------
+    def append(self, df: pd.DataFrame, ts: datetime = None) -> int:
+        """
+        追加一个快照
+        :param df: 含“代码”“名称”“热度分数”列的概念表（涨跌幅、热度等级、f62、f66 可选）
+        :param ts: 快照时间，默认当前时间
+        :return: 写入的记录数
+        """
+        if df is None or df.empty:
+            return 0
+        ts = ts or datetime.now()
+        heat = pd.to_numeric(df["热度分数"], errors="coerce").to_numpy(dtype=np.float64)
+        order = np.argsort(-np.nan_to_num(heat, nan=-np.inf), kind="stable")
+        records = np.zeros(len(df), dtype=HEAT_DTYPE)
+        records["ts"] = int(ts.timestamp())
+        records["code"] = df["代码"].astype(str).to_numpy()[order]
+        records["rank"] = np.arange(1, len(df) + 1)
+        for col, field in SOURCE_COLUMNS.items():
+            if col not in df.columns:
+                continue
+            if field == "level":
+                records[field] = df[col].astype(str).to_numpy()[order]
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)[order]
+            records[field] = values / 100000000 if field in ("capital", "amount") else values
+
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self._day_path(ts.strftime("%Y%m%d")), "ab") as f:
+                    records.tofile(f)
+                self._update_names(df)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return len(records)
+
+    def _update_names(self, df: pd.DataFrame):
+        if "名称" not in df.columns:
+            return
+        names = dict(self.names())
+        new = dict(zip(df["代码"].astype(str), df["名称"].astype(str)))
+        if all(names.get(code) == name for code, name in new.items()):
+            return
+        names.update(new)
+        tmp_path = self.names_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(names, f, ensure_ascii=False)
+        os.replace(tmp_path, self.names_path)
+
+    # ---------- 查询 ----------
+    def _frame(self, records: np.ndarray) -> pd.DataFrame:
+        names = self.names()
+        df = pd.DataFrame({field: records[field] for field in HEAT_DTYPE.names if field != "ts"})
+        df["code"] = df["code"].astype(str)
+        df["level"] = df["level"].astype(str)
+        df["name"] = df["code"].map(names).fillna("")
+        for field in ("heat", "pct_chg", "capital", "amount"):
+            df[field] = df[field].astype(np.float64).round(2)
+        return df[list(OUTPUT_COLUMNS)].rename(columns=OUTPUT_COLUMNS)
+
+    def snapshot_times(self, day: str = None) -> np.ndarray:
+        """某天全部快照的时间戳（升序）"""
+        return np.unique(self.load_day(day)["ts"])
+
+    def _records_at(self, at: datetime = None):
+        """返回 at 当天、不晚于 at 的最后一个快照的记录和时间戳"""
+        day = at.strftime("%Y%m%d") if at is not None else None
+        records = self.load_day(day)
+        if not len(records):
+            return records, None
+        ts = records["ts"]
+        if at is not None:
+            ts_limit = int(at.timestamp())
+            ts = ts[ts <= ts_limit]
+            if not len(ts):
+                return records[:0], None
+        snapshot_ts = ts.max()
+        return records[records["ts"] == snapshot_ts], int(snapshot_ts)
+
+    def latest(self, n: int = None):
+        """
+        最新快照（按排名），附快照时间
+        :return: (DataFrame, datetime)，没有数据时 (空表, None)
+        """
+        records, ts = self._records_at()
+        df = self._frame(records).sort_values("排名").reset_index(drop=True)
+        if n:
+            df = df.head(n)
+        return df, datetime.fromtimestamp(ts) if ts is not None else None
+
+    def snapshot_at(self, at: datetime) -> pd.DataFrame:
+        """at 当天不晚于 at 的最后一个快照"""
+        records, _ = self._records_at(at)
+        return self._frame(records).sort_values("排名").reset_index(drop=True)
+
+    def _compare(self, current: np.ndarray, previous: np.ndarray) -> pd.DataFrame:
+        df = self._frame(current)
+        prev = self._frame(previous)[["代码", "排名", "热度分数", "涨跌幅"]]
+        prev.columns = ["代码", "之前排名", "之前热度", "之前涨跌幅"]
+        df = df.merge(prev, on="代码", how="left")
+        df["排名变化"] = df["之前排名"] - df["排名"]
+        df["热度变化"] = (df["热度分数"] - df["之前热度"]).round(2)
+        df["涨跌幅变化"] = (df["涨跌幅"] - df["之前涨跌幅"]).round(2)
+        return df
+
+    def rank_changes(self, minutes: int = 30, at: datetime = None, n: int = None) -> pd.DataFrame:
+        """
+        最新快照与 minutes 分钟前（同一天内不晚于该时刻的最后一个快照）相比的排名变化
+        排名变化为正表示上升；按排名变化降序
+        """
+        current, ts = self._records_at(at)
+        if ts is None:
+            return self._compare(current, current)
+        previous, _ = self._records_at(datetime.fromtimestamp(ts) - timedelta(minutes=minutes))
+        df = self._compare(current, previous)
+        df = df.sort_values(["排名变化", "排名"], ascending=[False, True], na_position="last")
+        return (df.head(n) if n else df).reset_index(drop=True)
+
+    def top_movers(self, n: int = 10, day: str = None, by: str = "热度变化") -> pd.DataFrame:
+        """
+        当天异动：最新快照与当天第一个快照相比，按 by（热度变化 / 排名变化 / 涨跌幅变化）降序
+        """
+        records = self.load_day(day)
+        if not len(records):
+            return self._compare(records, records)
+        ts = records["ts"]
+        df = self._compare(records[ts == ts.max()], records[ts == ts.min()])
+        df = df.sort_values(by, ascending=False, na_position="last")
+        return df.head(n).reset_index(drop=True)
+
+    # ---------- 保留与压缩 ----------
+    def compact(self, today: datetime = None) -> dict:
+        """
+        删除超过保留天数的日文件；超过 compact_after_days 天的日文件每 compact_interval 分钟只保留最后一个快照；
+        同时删除旧版遗留的 concept_heat_analysis_*.csv
+        :return: {"removed": 删除的天数, "compacted": 压缩的天数, "legacy_removed": 删除的旧版 CSV 数}
+        """
+        today = (today or datetime.now()).date()
+        removed = compacted = 0
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                for day in self.days():
+                    age = (today - datetime.strptime(day, "%Y%m%d").date()).days
+                    path = self._day_path(day)
+                    if age > self.retention_days:
+                        os.remove(path)
+                        self._cache.pop(day, None)
+                        removed += 1
+                    elif age > self.compact_after_days:
+                        records = np.fromfile(path, dtype=HEAT_DTYPE)
+                        ts = np.unique(records["ts"])
+                        buckets = ts // (self.compact_interval * 60)
+                        last_in_bucket = np.r_[buckets[1:] != buckets[:-1], True]
+                        keep = ts[last_in_bucket]
+                        if len(keep) == len(ts):
+                            continue
+                        tmp_path = path + ".tmp"
+                        records[np.isin(records["ts"], keep)].tofile(tmp_path)
+                        os.replace(tmp_path, path)
+                        self._cache.pop(day, None)
+                        compacted += 1
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return {"removed": removed, "compacted": compacted, "legacy_removed": self._remove_legacy_csv()}
+
+    @staticmethod
+    def _remove_legacy_csv() -> int:
+        removed = 0
+        for path in glob.glob(LEGACY_CSV_GLOB):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
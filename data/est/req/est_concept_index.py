@@ -0,0 +1,144 @@
+import os
+import fcntl
+import threading
+import numpy as np
+import pandas as pd
+
+# 成员表中记录所属概念的列
+CONCEPT_COLUMN = "概念代码"
+
+class ConceptMembershipIndex:
+    """
+    概念-成分股 成员索引
+    所有概念的成分股存放在一张表中（按概念分组、组内保持原顺序），读取后建立
+    概念 -> 行区间、股票 -> 概念 两个查找表；写入先缓存在内存，flush 时合并后原子替换文件。
+    """
+
+    def __init__(self, save_dir: str = "/tmp/stock/concept"):
+        self.save_dir = save_dir
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.path = os.path.join(self.save_dir, "concept_members.pkl")
+        self.lock_path = os.path.join(self.save_dir, "concept_members.lock")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._table = None
+        self._ranges = {}
+        self._by_code = None
+        self._stat_key = None
+
+    # ---------- 读取 ----------
+    def _reload_if_changed(self):
+        """文件被替换后重新加载，未变化时仅一次 stat"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._table, self._ranges, self._by_code, self._stat_key = None, {}, None, None
+            return
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == self._stat_key:
+            return
+        self._set_table(pd.read_pickle(self.path))
+        self._stat_key = key
+
+    def _set_table(self, table: pd.DataFrame):
+        concepts = table[CONCEPT_COLUMN].astype(str).to_numpy()
+        if len(concepts):
+            starts = np.flatnonzero(np.r_[True, concepts[1:] != concepts[:-1]])
+            ends = np.r_[starts[1:], len(concepts)]
+            self._ranges = {concepts[s]: (int(s), int(e)) for s, e in zip(starts, ends)}
+        else:
+            self._ranges = {}
+        self._table = table
+        self._by_code = None
+
+    def concepts(self) -> list:
+        self._reload_if_changed()
+        return list(self._ranges)
+
+    def has_concept(self, concept_code: str) -> bool:
+        self._reload_if_changed()
+        return concept_code in self._ranges
+
+    def members(self, concept_code: str):
+        """
+        返回某个概念的成分股 DataFrame，不存在返回 None
+        """
+        self._reload_if_changed()
+        rng = self._ranges.get(concept_code)
+        if rng is None:
+            return None
+        df = self._table.iloc[rng[0]:rng[1]].drop(columns=CONCEPT_COLUMN)
+        return df.reset_index(drop=True)
+
+    def members_of(self, concept_codes, with_concept: bool = False) -> pd.DataFrame:
+        """
+        按给定顺序返回多个概念的成分股（一次取行，不逐个读文件），不存在的概念跳过
+        :param with_concept: 是否保留所属概念列
+        """
+        self._reload_if_changed()
+        spans = [self._ranges[c] for c in concept_codes if c in self._ranges]
+        if not spans:
+            return pd.DataFrame()
+        rows = np.concatenate([np.arange(s, e) for s, e in spans])
+        df = self._table.iloc[rows]
+        if not with_concept:
+            df = df.drop(columns=CONCEPT_COLUMN)
+        return df.reset_index(drop=True)
+
+    def codes_for(self, concept_code: str) -> list:
+        """概念 -> 成分股代码"""
+        self._reload_if_changed()
+        rng = self._ranges.get(concept_code)
+        if rng is None:
+            return []
+        return self._table["代码"].iloc[rng[0]:rng[1]].astype(str).tolist()
+
+    def concepts_for(self, code: str) -> list:
+        """股票代码 -> 所属概念"""
+        self._reload_if_changed()
+        if self._table is None:
+            return []
+        if self._by_code is None:
+            grouped = self._table.groupby(self._table["代码"].astype(str), sort=False)[CONCEPT_COLUMN]
+            self._by_code = {c: [str(x) for x in v] for c, v in grouped}
+        return list(self._by_code.get(str(code), []))
+
+    # ---------- 写入 ----------
+    def put(self, concept_code: str, df: pd.DataFrame):
+        """缓存某个概念的成分股（整体替换），flush 后落盘"""
+        with self._lock:
+            self._pending[concept_code] = df
+
+    def flush(self) -> int:
+        """
+        将缓存的概念合并进成员表并原子替换文件，返回写入的概念数
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # 以磁盘上的最新版本为基准合并，避免覆盖其他进程的写入
+                self._stat_key = None
+                self._reload_if_changed()
+                frames = []
+                if self._table is not None:
+                    frames.append(self._table[~self._table[CONCEPT_COLUMN].isin(list(pending))])
+                for concept_code, df in pending.items():
+                    frames.append(df.assign(**{CONCEPT_COLUMN: concept_code}))
+                frames = [f for f in frames if not f.empty]
+                table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[CONCEPT_COLUMN, "代码"])
+                table[CONCEPT_COLUMN] = table[CONCEPT_COLUMN].astype(str)
+                table = table.sort_values(CONCEPT_COLUMN, kind="stable").reset_index(drop=True)
+                table[CONCEPT_COLUMN] = table[CONCEPT_COLUMN].astype("category")
+                tmp_path = self.path + ".tmp"
+                table.to_pickle(tmp_path)
+                os.replace(tmp_path, self.path)
+                st = os.stat(self.path)
+                self._set_table(table)
+                self._stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return len(pending)
@@ -1,25 +1,40 @@
 import os
-import math
+import asyncio
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import requests
+from datetime import datetime, time as dt_time
 import re
 import json
 from data.est.req import est_common
+from data.est.req import est_http
+from data.est.req.est_daily_store import DailyBarStore
+from data.est.req.est_indicators import IndicatorStore
+from data.est.req import est_price_panel
+from data.est.req.est_quote import EastmoneyQuoteFetcher, QUOTE_BATCH_SIZE
 import urllib.parse
-import threading
 
 class EastmoneyDailyStockFetcher:
     def __init__(self, save_dir="/tmp/stock/daily"):
         self.save_dir = save_dir
         os.makedirs(self.save_dir, exist_ok=True)
+        # 所有股票日线统一存放在列存库中
+        self.store = DailyBarStore(save_dir)
+        # 技术指标缓存（与日线库同目录，日线更新后按需重算）
+        self.indicators = IndicatorStore(self.store)
+        # 盘中用批量行情快照生成当天K线
+        self.quote_fetcher = EastmoneyQuoteFetcher()
         # 初始化进度计数器
         self.progress_counter = {"count": 0, "total": 0}
 
     def get_save_path(self, secid_or_code):
+        """旧版按股票单独存放的 pkl 路径，仅用于兼容读取"""
         code = secid_or_code.split('.')[-1]
         return os.path.join(self.save_dir, f"{code}.pkl")
 
+    def need_update(self, secid_or_code):
+        code = secid_or_code.split('.')[-1]
+        return est_common.need_update_since(self.store.fetched_at(code))
+
     def file_mtime_is_today(self, path):
         if not os.path.exists(path):
             return False
@@ -44,81 +59,165 @@ class EastmoneyDailyStockFetcher:
         return "https://push2his.eastmoney.com/api/qt/stock/kline/get?" + urllib.parse.urlencode(params)
 
     def fetch_daily(self, secid, period="day", adjust="qfq", start_date=None, end_date=None, proxy=None):
+        """
+        请求一只股票的日K线；请求或解析失败时抛异常（由 call_with_retry 换代理重试）
+        :return: DataFrame，接口没有K线时为空表
+        """
         start_date = start_date or (datetime.now() - pd.Timedelta(days=30)).strftime("%Y%m%d")
         end_date = end_date or datetime.now().strftime("%Y%m%d")
         market_code, symbol = secid.split('.')
         url = self.get_base_url(symbol, market_code, period, adjust, start_date, end_date)
-        proxies = proxy
-        try:
-            resp = requests.get(url, proxies=proxies, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            klines = data.get("data", {}).get("klines", [])
-            if not klines:
-                print(f"{secid} 没有k线数据")
-                return None
-            columns = [
-                "日期", "开盘", "收盘", "最高", "最低", "成交量", "成交额",
-                "振幅", "涨跌幅", "涨跌额", "换手率"
-            ]
-            rows = [k.split(',') for k in klines]
-            return pd.DataFrame(rows, columns=columns)
-        except Exception as e:
-            print(f"获取数据失败: {e}\nURL: {url}\nProxy: {proxy}")
-            return None
+        resp = est_http.get_engine().get(url, proxies=proxy, timeout=10)
+        resp.raise_for_status()
+        klines = (resp.json().get("data") or {}).get("klines") or []
+        columns = [
+            "日期", "开盘", "收盘", "最高", "最低", "成交量", "成交额",
+            "振幅", "涨跌幅", "涨跌额", "换手率"
+        ]
+        if not klines:
+            # 新股、退市或停牌期间接口正常应答但没有K线，返回空表（不计为代理失败）
+            print(f"{secid} 没有k线数据")
+            return pd.DataFrame(columns=columns)
+        rows = [k.split(',') for k in klines]
+        return pd.DataFrame(rows, columns=columns)
 
-    def save_daily(self, secid, df):
-        if df is not None:
-            save_path = self.get_save_path(secid)
-            df.to_pickle(save_path)
+    def fetch_daily_incremental(self, secid, period="day", adjust="qfq", proxy=None):
+        """
+        增量获取日线：只请求本地最后一个交易日（含）之后的K线
+        :return: (df, merge)，merge=True 表示与已有数据合并，False 表示整体替换
+        """
+        code = secid.split('.')[-1]
+        last_bar = self.store.last_bar(code)
+        if last_bar is None:
+            return self.fetch_daily(secid, period, adjust, proxy=proxy), False
+
+        last_date = str(int(last_bar["date"]))
+        df = self.fetch_daily(secid, period, adjust, start_date=last_date, proxy=proxy)
+        if df.empty:
+            return df, True
+
+        # 前复权价格在除权除息后会整体变化：重叠K线的开盘价对不上时重新拉取完整区间
+        overlap = df[df["日期"].str.replace("-", "") == last_date]
+        if not overlap.empty:
+            new_open = pd.to_numeric(overlap["开盘"].iloc[-1], errors="coerce")
+            if pd.isna(new_open) or abs(new_open - last_bar["open"]) > 0.011:
+                first_date = self.store.get_df(code)["日期"].iloc[0].replace("-", "")
+                print(f"{secid} 复权价格发生变化，重新获取 {first_date} 起的完整日线")
+                return self.fetch_daily(secid, period, adjust, start_date=first_date, proxy=proxy), False
+        return df, True
+
+    def save_daily(self, secid, df, merge=False):
+        if df is not None and not df.empty:
+            code = secid.split('.')[-1]
+            if merge:
+                self.store.upsert(code, df)
+            else:
+                self.store.put(code, df)
             if self.progress_counter is not None and self.progress_counter["count"] % 50 == 0:
-                print(f"{secid} 日线数据已保存到 {save_path}，进度: {self.progress_counter['count']}/{self.progress_counter['total']}")
+                print(f"{secid} 日线数据已写入缓冲，进度: {self.progress_counter['count']}/{self.progress_counter['total']}")
 
     def update_all_daily(
         self, secids, period="day", adjust="qfq", start_date=None, end_date=None,
-        use_proxy_and_concurrent=10
+        use_proxy_and_concurrent=10, incremental=True
     ):
+        """
+        批量更新日线
+        :param incremental: 为 True 且未指定 start_date 时，只拉取本地已有数据之后的K线并合并，历史持续累积
+        """
+        return est_http.run_sync(self.aupdate_all_daily(
+            secids, period, adjust, start_date, end_date, use_proxy_and_concurrent, incremental
+        ))
+
+    async def aupdate_all_daily(
+        self, secids, period="day", adjust="qfq", start_date=None, end_date=None,
+        use_proxy_and_concurrent=10, incremental=True
+    ):
+        """update_all_daily 的协程版本，请求在共享请求引擎的线程池中执行，不阻塞事件循环"""
+        incremental = incremental and start_date is None
         # 过滤出需要更新的 secid
-        secids = [secid for secid in secids if est_common.need_update(self.get_save_path(secid.split('.')[-1]))]
+        stale = set(est_common.stale_codes(
+            self.store.fetched_at_map(), [secid.split('.')[-1] for secid in secids]
+        ))
+        secids = [secid for secid in secids if secid.split('.')[-1] in stale]
         if not secids:
             print(f"所有本地数据均为最新，无需更新，数据目录: {self.save_dir}")
+            await asyncio.to_thread(self.build_price_panel)
             return
 
+        # 盘中：历史K线已完整到上一交易日的股票，用批量行情快照更新当天K线，只有其余股票逐只请求 kline
+        if incremental and period == "day" and est_common.is_live_bar_time():
+            patched = await self.apatch_live_bars(secids, concurrency=min(use_proxy_and_concurrent or 5, 5))
+            secids = [secid for secid in secids if secid.split('.')[-1] not in patched]
+
         total = len(secids)
         self.progress_counter["total"] = total
         self.progress_counter["count"] = 0
 
-        # chunk_size 至少为 40
-        chunk_size = max(40, math.ceil(total / use_proxy_and_concurrent)) if use_proxy_and_concurrent > 0 else total
-        chunks = [secids[i:i + chunk_size] for i in range(0, total, chunk_size)]
-
-        def worker(chunk):
-            proxy = est_common.get_proxy()
-            for secid in chunk:
-                retry = 0
-                max_retries = 3
-                while retry < max_retries:
-                    df = self.fetch_daily(secid, period, adjust, start_date, end_date, proxy=proxy)
-                    if df is not None:
-                        break
-                    retry += 1
-                    print(f"{secid} 第{retry}次尝试更换代理")
-                    proxy = est_common.get_proxy()
-                if df is None:
-                    print(f"{secid} 更换三次代理后仍然失败，跳过")
-                    self.progress_counter["count"] += 1
-                    continue
-                if df is not None:
-                    self.save_daily(secid, df)
-                self.progress_counter["count"] += 1
-
-        threads = []
-        for chunk in chunks:
-            t = threading.Thread(target=worker, args=(chunk,))
-            t.start()
-            threads.append(t)
-        for t in threads:
-            t.join()
+        engine = est_http.get_engine()
+
+        def fetch(secid, proxy):
+            if incremental:
+                df, merge = self.fetch_daily_incremental(secid, period, adjust, proxy=proxy)
+            else:
+                df, merge = self.fetch_daily(secid, period, adjust, start_date, end_date, proxy=proxy), False
+            return df, merge
+
+        def update_one(secid):
+            result = engine.call_with_retry(fetch, secid)
+            if result is None:
+                print(f"{secid} 更换三次代理后仍然失败，跳过")
+            else:
+                self.save_daily(secid, *result)
+            self.progress_counter["count"] += 1
+
+        await engine.amap(update_one, secids, limit=use_proxy_and_concurrent or None)
+        saved = await asyncio.to_thread(self.store.flush)
+        print(f"已写入 {saved} 只股票日线到 {self.store.path}")
+        await asyncio.to_thread(self.build_price_panel)
+
+    async def apatch_live_bars(self, secids, concurrency=5) -> set:
+        """
+        用批量行情快照生成当天K线并合并进日线库缓冲（需随后 flush）
+        只处理历史已完整到上一交易日（上一交易日收盘后获取过）的股票；交易所昨收与本地上一交易日收盘价
+        不一致（除权除息，前复权历史已变化）或没有报价（停牌等）的股票不处理，留给 kline 请求
+        :return: 已更新当天K线的股票代码集合
+        """
+        now = datetime.now()
+        prev_day = est_common.previous_trading_day(now.date())
+        prev_date = int(prev_day.strftime("%Y%m%d"))
+        prev_close_ts = datetime.combine(prev_day, dt_time(15, 0)).timestamp()
+        versions = self.store.versions()
+        eligible = []
+        for secid in secids:
+            version = versions.get(secid.split('.')[-1])
+            if version is not None and version[0] >= prev_date and version[1] >= prev_close_ts:
+                eligible.append(secid)
+        if not eligible:
+            return set()
+
+        quotes = await self.quote_fetcher.afetch_quotes(eligible, concurrency=concurrency)
+        today = now.strftime("%Y%m%d")
+        bars = self.quote_fetcher.to_bars(quotes, today)
+        if len(bars):
+            stored_prev = self.store.close_before(bars["code"], int(today))
+            quote_prev = quotes.drop_duplicates("代码").set_index("代码")["昨收"].reindex(bars["code"].astype(str)).to_numpy()
+            bars = bars[np.abs(stored_prev - quote_prev) <= 0.011]
+            self.store.upsert_records(bars)
+        print(f"行情快照: {len(eligible)} 只股票请求 {-(-len(eligible) // QUOTE_BATCH_SIZE)} 次，"
+              f"{len(bars)} 只更新当天K线，其余 {len(secids) - len(bars)} 只逐只请求 kline")
+        return set(bars["code"].astype(str))
+
+    def build_price_panel(self):
+        """日线库有变化时重建共享价格面板（股票 × 交易日 × 字段，float32 内存映射）"""
+        if est_price_panel.ensure_price_panel(self.store):
+            print(f"已重建价格面板: {self.save_dir}/{est_price_panel.INDEX_NAME}")
+
+    def get_price_panel(self):
+        """
+        打开与日线库当前版本一致的价格面板（零拷贝内存映射），面板不存在或已过期时返回 None
+        """
+        panel = est_price_panel.open_price_panel(self.save_dir)
+        return panel if panel is not None and panel.is_current(self.store) else None
 
     def update_daily_batch(self, codes_df, period="day", adjust="qfq", start_date=None, end_date=None, use_proxy_and_concurrent=10):
         secids = codes_df['secid'].tolist()
@@ -127,17 +226,71 @@ class EastmoneyDailyStockFetcher:
     def update_daily_by_df(self, codes_df, period="day", adjust="qfq", start_date=None, end_date=None, use_proxy_and_concurrent=10):
         self.update_daily_batch(codes_df, period, adjust, start_date, end_date, use_proxy_and_concurrent)
 
-    def get_daily_df(self, code):
+    def get_daily_df(self, code, last_n=None):
         """读取本地日线数据"""
-        path = self.get_save_path(code)
-        if os.path.exists(path):
-            return pd.read_pickle(path)
-        print(f"{code} 本地数据不存在: {path}")
+        df = self.store.get_df(code, last_n)
+        if df is not None:
+            return df
+        df = self._load_legacy_df(code)
+        if df is not None:
+            return df.tail(last_n).reset_index(drop=True) if last_n else df
+        print(f"{code} 本地数据不存在: {self.store.path}")
         return None
 
-    def get_multi_daily_df(self, codes):
-        """批量读取本地日线数据"""
-        return [self.get_daily_df(code) for code in codes]
+    def get_multi_daily_df(self, codes, last_n=None):
+        """批量读取本地日线数据（一次读取列存库）"""
+        codes = [str(code) for code in codes]
+        long_df = self.store.load_last_n(codes, last_n)
+        grouped = {code: g.drop(columns="代码").reset_index(drop=True) for code, g in long_df.groupby("代码", sort=False)}
+        result = []
+        for code in codes:
+            df = grouped.get(code)
+            if df is None:
+                df = self.get_daily_df(code, last_n)
+            result.append(df)
+        return result
+
+    def get_daily_panel(self, codes, last_n, fields=None):
+        """
+        批量读取 (股票数 × last_n) 的带类型二维面板，不足 last_n 根日线的股票不返回
+        :return: (codes, {field: ndarray})，字段名见 est_daily_store.FIELD_MAP
+        """
+        codes = [str(code) for code in codes]
+        found, panel = self.store.load_panel(codes, last_n, fields)
+        found_set = set(found)
+        legacy = []
+        for code in codes:
+            if code in found_set or self.store.has_code(code):
+                continue
+            df = self._load_legacy_df(code)
+            if df is not None and len(df) >= last_n:
+                legacy.append((code, self.store.df_to_records(code, df.tail(last_n))))
+        if legacy:
+            found = found + [code for code, _ in legacy]
+            stacked = np.stack([records for _, records in legacy])
+            panel = {field: np.concatenate([values, stacked[field]]) for field, values in panel.items()}
+        return found, panel
+
+    def get_daily_history(self, codes=None):
+        """
+        批量读取日线库中的全部历史（结构化数组，按 (code, date) 排序），供回测使用
+        :param codes: 股票代码列表，None 表示日线库中的全部股票
+        """
+        return self.store.load_history(codes)
+
+    def get_indicators(self, codes):
+        """
+        批量读取技术指标（均线、均量、区间高低点、连续涨跌、影线），index 为股票代码
+        """
+        return self.indicators.get_many(codes)
+
+    def _load_legacy_df(self, code):
+        """读取旧版单股票 pkl，并转换为带类型的列"""
+        path = self.get_save_path(code)
+        if not os.path.exists(path):
+            return None
+        legacy_df = pd.read_pickle(path)
+        return self.store.records_to_df(self.store.df_to_records(code, legacy_df))
 
 if __name__ == "__main__":
     fetcher = EastmoneyDailyStockFetcher()
@@ -0,0 +1,352 @@
+import os
+import json
+import fcntl
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# 日线列（与东方财富 kline 接口 fields2 顺序一致）
+DAILY_COLUMNS = [
+    "日期", "开盘", "收盘", "最高", "最低", "成交量", "成交额",
+    "振幅", "涨跌幅", "涨跌额", "换手率"
+]
+
+# 列存字段：中文列名 -> (字段名, 类型)
+FIELD_MAP = {
+    "开盘": ("open", "f8"),
+    "收盘": ("close", "f8"),
+    "最高": ("high", "f8"),
+    "最低": ("low", "f8"),
+    "成交量": ("volume", "i8"),
+    "成交额": ("amount", "f8"),
+    "振幅": ("amplitude", "f8"),
+    "涨跌幅": ("pct_chg", "f8"),
+    "涨跌额": ("change", "f8"),
+    "换手率": ("turnover", "f8"),
+}
+
+BAR_DTYPE = np.dtype(
+    [("code", "U6"), ("date", "i4")] + [spec for spec in FIELD_MAP.values()]
+)
+
+class DailyBarStore:
+    """
+    单文件列存日线库
+    所有股票的日线按 (code, date) 排序存放在一个结构化 .npy 文件中，读取时内存映射，
+    写入时先缓存在内存（put 整体替换 / upsert 按日期合并），flush 时合并后原子替换文件。
+    """
+
+    def __init__(self, save_dir: str = "/tmp/stock/daily"):
+        self.save_dir = save_dir
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.path = os.path.join(self.save_dir, "daily_bars.npy")
+        self.meta_path = os.path.join(self.save_dir, "daily_bars_meta.json")
+        self.lock_path = os.path.join(self.save_dir, "daily_bars.lock")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._bars = None
+        self._offsets = {}
+        self._meta = {}
+        self._stat_key = None
+
+    # ---------- 读取 ----------
+    def _reload_if_changed(self):
+        """文件被替换后重新映射，未变化时仅一次 stat"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._bars, self._offsets, self._meta, self._stat_key = None, {}, {}, None
+            return
+        meta_mtime = os.path.getmtime(self.meta_path) if os.path.exists(self.meta_path) else 0
+        key = (st.st_ino, st.st_mtime_ns, meta_mtime)
+        if key == self._stat_key:
+            return
+        bars = np.load(self.path, mmap_mode="r")
+        codes, starts = np.unique(bars["code"], return_index=True)
+        ends = np.append(starts[1:], len(bars))
+        self._offsets = {str(c): (int(s), int(e)) for c, s, e in zip(codes, starts, ends)}
+        self._bars = bars
+        self._meta = self._read_meta()
+        self._stat_key = key
+
+    def _read_meta(self) -> dict:
+        if not os.path.exists(self.meta_path):
+            return {}
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def codes(self) -> list:
+        self._reload_if_changed()
+        return list(self._offsets.keys())
+
+    def has_code(self, code: str) -> bool:
+        self._reload_if_changed()
+        return code in self._offsets
+
+    def fetched_at(self, code: str):
+        """
+        返回某只股票最近一次写入的时间，不存在返回 None
+        """
+        self._reload_if_changed()
+        ts = self._meta.get("fetched_at", {}).get(code)
+        return datetime.fromtimestamp(ts) if ts else None
+
+    def fetched_at_map(self) -> dict:
+        """
+        返回 {code: 最近一次写入的时间戳}，用于批量判断新鲜度
+        """
+        self._reload_if_changed()
+        return dict(self._meta.get("fetched_at", {}))
+
+    def last_date(self, code: str):
+        """
+        返回某只股票已存储的最后一个交易日（YYYYMMDD 整数），不存在返回 None
+        """
+        self._reload_if_changed()
+        span = self._offsets.get(code)
+        if span is None:
+            return None
+        return int(self._bars["date"][span[1] - 1])
+
+    def last_bar(self, code: str):
+        """
+        返回某只股票已存储的最后一根日线（结构化记录），不存在返回 None
+        """
+        self._reload_if_changed()
+        span = self._offsets.get(code)
+        if span is None:
+            return None
+        return self._bars[span[1] - 1]
+
+    def close_before(self, codes, date: int) -> np.ndarray:
+        """
+        每只股票早于 date（YYYYMMDD 整数）的最后一根日线的收盘价，没有时为 NaN
+        """
+        self._reload_if_changed()
+        result = np.full(len(codes), np.nan)
+        if self._bars is None:
+            return result
+        for i, code in enumerate(codes):
+            span = self._offsets.get(str(code))
+            if span is None:
+                continue
+            start, end = span
+            pos = start + int(np.searchsorted(self._bars["date"][start:end], date, side="left"))
+            if pos > start:
+                result[i] = self._bars["close"][pos - 1]
+        return result
+
+    def version_key(self):
+        """日线文件的版本标识，文件被替换后变化"""
+        self._reload_if_changed()
+        return self._stat_key
+
+    def versions(self) -> dict:
+        """
+        返回全部股票的数据版本 {code: (最后交易日, 最近写入时间戳)}，用于派生数据的失效判断
+        """
+        self._reload_if_changed()
+        if self._bars is None:
+            return {}
+        fetched = self._meta.get("fetched_at", {})
+        codes = list(self._offsets.keys())
+        ends = np.fromiter((self._offsets[c][1] for c in codes), dtype=np.int64, count=len(codes))
+        last_dates = self._bars["date"][ends - 1]
+        return {c: (int(d), float(fetched.get(c, 0))) for c, d in zip(codes, last_dates)}
+
+    def _rows_for(self, codes, last_n=None) -> np.ndarray:
+        """按代码顺序拼出行号，一次花式索引读出"""
+        idx = []
+        for code in codes:
+            span = self._offsets.get(code)
+            if span is None:
+                continue
+            start, end = span
+            if last_n:
+                start = max(start, end - last_n)
+            idx.append(np.arange(start, end))
+        if not idx:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return self._bars[np.concatenate(idx)]
+
+    def load_last_n(self, codes, last_n=None) -> pd.DataFrame:
+        """
+        批量读取多只股票最近 last_n 根日线（长表，含“代码”列）
+        :param codes: 股票代码列表
+        :param last_n: 每只股票最多返回的条数，None 表示全部
+        """
+        self._reload_if_changed()
+        if self._bars is None:
+            return pd.DataFrame(columns=["代码"] + DAILY_COLUMNS)
+        rows = self._rows_for([str(c) for c in codes], last_n)
+        df = self.records_to_df(rows)
+        df.insert(0, "代码", rows["code"].astype(str))
+        return df
+
+    def load_panel(self, codes, last_n: int, fields=None):
+        """
+        读取 (股票数 × last_n) 的二维面板，只包含至少有 last_n 根日线的股票
+        :param fields: 字段名列表（如 ["open", "close"]），None 表示全部数值字段
+        :return: (codes, {field: ndarray(M, last_n)})，行顺序与返回的 codes 一致
+        """
+        self._reload_if_changed()
+        fields = fields or [field for field, _ in FIELD_MAP.values()]
+        found, ends = [], []
+        for code in codes:
+            span = self._offsets.get(str(code))
+            if span is not None and span[1] - span[0] >= last_n:
+                found.append(str(code))
+                ends.append(span[1])
+        if not found:
+            return [], {field: np.empty((0, last_n)) for field in fields}
+        idx = np.asarray(ends)[:, None] - last_n + np.arange(last_n)[None, :]
+        rows = self._bars[idx]
+        return found, {field: np.asarray(rows[field]) for field in fields}
+
+    def load_history(self, codes=None):
+        """
+        读取多只股票的全部日线（结构化数组，按 (code, date) 排序，每只股票连续存放）
+        :param codes: 股票代码列表，None 表示全部
+        """
+        self._reload_if_changed()
+        if self._bars is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        if codes is None:
+            return np.asarray(self._bars)
+        return self._rows_for(sorted({str(c) for c in codes}))
+
+    def get_df(self, code: str, last_n=None):
+        self._reload_if_changed()
+        if code not in self._offsets:
+            return None
+        return self.records_to_df(self._rows_for([code], last_n))
+
+    # ---------- 转换 ----------
+    @staticmethod
+    def df_to_records(code: str, df: pd.DataFrame) -> np.ndarray:
+        """
+        将接口返回的字符串 DataFrame 转为带类型的结构化数组（按日期升序、去重）
+        """
+        records = np.zeros(len(df), dtype=BAR_DTYPE)
+        records["code"] = code
+        dates = pd.to_datetime(df["日期"], errors="coerce")
+        records["date"] = dates.dt.strftime("%Y%m%d").fillna("0").astype(np.int32).to_numpy()
+        for col, (field, kind) in FIELD_MAP.items():
+            values = pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(np.nan, index=df.index)
+            if kind == "i8":
+                values = values.fillna(0)
+            records[field] = values.to_numpy().astype(kind)
+        records = records[records["date"] > 0]
+        # 同一天保留最后一条
+        records = records[::-1]
+        _, keep = np.unique(records["date"], return_index=True)
+        return records[keep]
+
+    @staticmethod
+    def records_to_df(records: np.ndarray) -> pd.DataFrame:
+        dates = pd.to_datetime(records["date"].astype(str), format="%Y%m%d")
+        data = {"日期": dates.strftime("%Y-%m-%d")}
+        for col, (field, _) in FIELD_MAP.items():
+            data[col] = np.asarray(records[field])
+        return pd.DataFrame(data, columns=DAILY_COLUMNS)
+
+    # ---------- 写入 ----------
+    def put(self, code: str, df: pd.DataFrame):
+        """
+        用 df 整体替换某只股票的日线（写入内存缓冲，flush 后落盘）
+        """
+        records = self.df_to_records(code, df)
+        with self._lock:
+            self._pending[code] = (records, False)
+
+    def upsert(self, code: str, df: pd.DataFrame):
+        """
+        将 df 合并进某只股票已有的日线，同一交易日以新数据为准
+        """
+        records = self.df_to_records(code, df)
+        with self._lock:
+            if code in self._pending:
+                prev, merge = self._pending[code]
+                records = np.concatenate([prev, records])[::-1]
+                _, keep = np.unique(records["date"], return_index=True)
+                self._pending[code] = (records[keep], merge)
+            else:
+                self._pending[code] = (records, True)
+
+    def upsert_records(self, records: np.ndarray) -> int:
+        """
+        批量合并多只股票的日线记录（BAR_DTYPE，如实时行情快照生成的当天K线），同一交易日以新数据为准
+        :return: 涉及的股票数
+        """
+        if not len(records):
+            return 0
+        records = records[np.argsort(records["code"], kind="stable")]
+        codes, starts = np.unique(records["code"], return_index=True)
+        ends = np.append(starts[1:], len(records))
+        with self._lock:
+            for code, start, end in zip(codes, starts, ends):
+                code = str(code)
+                part = records[start:end]
+                if code in self._pending:
+                    prev, merge = self._pending[code]
+                    part = np.concatenate([prev, part])[::-1]
+                    _, keep = np.unique(part["date"], return_index=True)
+                    self._pending[code] = (part[keep], merge)
+                else:
+                    _, keep = np.unique(part["date"][::-1], return_index=True)
+                    self._pending[code] = (part[::-1][keep], True)
+        return len(codes)
+
+    def flush(self) -> int:
+        """
+        将缓冲区合并进列存文件，返回写入的股票数
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._stat_key = None
+                self._reload_if_changed()
+                replaced = [code for code, (_, merge) in pending.items() if not merge]
+                parts, priority = [], []
+                if self._bars is not None:
+                    old = np.asarray(self._bars)
+                    old = old[~np.isin(old["code"], replaced)]
+                    parts.append(old)
+                    priority.append(np.zeros(len(old), dtype=np.int8))
+                for records, _ in pending.values():
+                    parts.append(records)
+                    priority.append(np.ones(len(records), dtype=np.int8))
+                merged = np.concatenate(parts)
+                priority = np.concatenate(priority)
+                order = np.lexsort((priority, merged["date"], merged["code"]))
+                merged = merged[order]
+                # 同一 (code, date) 只保留优先级最高（最新写入）的一条
+                last_of_key = np.ones(len(merged), dtype=bool)
+                last_of_key[:-1] = (merged["code"][1:] != merged["code"][:-1]) | (merged["date"][1:] != merged["date"][:-1])
+                merged = merged[last_of_key]
+
+                tmp_path = self.path + ".tmp.npy"
+                np.save(tmp_path, merged)
+                os.replace(tmp_path, self.path)
+
+                meta = self._read_meta()
+                fetched = meta.setdefault("fetched_at", {})
+                now = datetime.now().timestamp()
+                for code in pending:
+                    fetched[code] = now
+                tmp_meta = self.meta_path + ".tmp"
+                with open(tmp_meta, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(tmp_meta, self.meta_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._stat_key = None
+        return len(pending)
@@ -0,0 +1,100 @@
+import os
+import json
+import fcntl
+import threading
+from datetime import datetime
+from data.est.req import est_common
+
+class FreshnessIndex:
+    """
+    数据新鲜度索引
+    一张元数据表记录每个数据集（如 minute_1、concept_members）中每个代码的最后获取时间，
+    “哪些代码需要更新”由一次向量化比较得出，不再逐个文件 stat。
+    mark 只写内存，flush 时与文件中的记录合并后原子替换。
+    """
+
+    def __init__(self, path: str = "/tmp/stock/freshness.json"):
+        self.path = path
+        self.lock_path = path + ".lock"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._table = None
+        self._pending = {}
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def fetched_at(self, dataset: str) -> dict:
+        """返回某个数据集的 {code: 最后获取时间戳}（含未落盘的记录）"""
+        with self._lock:
+            if self._table is None:
+                self._table = self._read()
+            merged = dict(self._table.get(dataset, {}))
+            merged.update(self._pending.get(dataset, {}))
+            return merged
+
+    def stale(self, dataset: str, codes, cutoff="auto", fallback_path=None) -> list:
+        """
+        返回需要更新的代码（保持输入顺序）
+        :param cutoff: 新鲜度分界时间，默认按 est_common.freshness_cutoff() 计算；None 表示全部需要更新
+        :param fallback_path: code -> 文件路径；索引中没有记录的代码按文件修改时间补录（兼容已有数据）
+        """
+        codes = list(codes)
+        fetched = self.fetched_at(dataset)
+        if fallback_path is not None:
+            seeded = {}
+            for code in codes:
+                if code not in fetched:
+                    path = fallback_path(code)
+                    if os.path.exists(path):
+                        seeded[code] = os.path.getmtime(path)
+            if seeded:
+                fetched.update(seeded)
+                with self._lock:
+                    self._pending.setdefault(dataset, {}).update(seeded)
+        return est_common.stale_codes(fetched, codes, cutoff)
+
+    def mark(self, dataset: str, code: str, ts: float = None):
+        """记录某个代码刚刚获取成功"""
+        with self._lock:
+            self._pending.setdefault(dataset, {})[code] = ts or datetime.now().timestamp()
+
+    def flush(self) -> int:
+        """将内存中的记录合并写入文件，返回写入条数"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                table = self._read()
+                for dataset, records in pending.items():
+                    table.setdefault(dataset, {}).update(records)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(table, f)
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        with self._lock:
+            self._table = table
+        return sum(len(records) for records in pending.values())
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_freshness_index(path: str = "/tmp/stock/freshness.json") -> FreshnessIndex:
+    """进程内共享的新鲜度索引（按文件路径）"""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = FreshnessIndex(path)
+            _indexes[path] = index
+        return index
@@ -0,0 +1,175 @@
+import time
+import asyncio
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from data.est.req import est_common
+from data.est.req.est_proxy import get_proxy_pool
+
+# 全局并发上限（同时在途的请求数）
+MAX_CONCURRENCY = 25
+# 每个域名每秒最多发起的请求数
+HOST_RATE_LIMIT = 50.0
+# 每个代理连接池保持的长连接数
+POOL_SIZE = 32
+
+class _RateLimiter:
+    """令牌桶限速，线程安全，返回需要等待的秒数"""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class FetchEngine:
+    """
+    东方财富请求引擎
+    - 按代理复用 requests.Session（keep-alive 连接池），避免每次请求重新握手
+    - 全局并发上限 + 按域名限速
+    - 代理从共享代理池租用，失败时自动换代理重试
+    - map/amap 在共享线程池上并发执行任务，供各 fetcher 的 update_all_* 调用
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, host_rate_limit: float = HOST_RATE_LIMIT, pool_size: int = POOL_SIZE):
+        self.max_concurrency = max_concurrency
+        self.host_rate_limit = host_rate_limit
+        self.pool_size = pool_size
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="est-fetch")
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._sessions = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0}
+
+    # ---------- 连接池 ----------
+    def session_for(self, proxies=None) -> requests.Session:
+        key = (proxies or {}).get("https") or (proxies or {}).get("http")
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if proxies:
+                    session.proxies.update(proxies)
+                self._sessions[key] = session
+            return session
+
+    def discard_session(self, proxies=None):
+        """代理失效后关闭其连接池"""
+        key = (proxies or {}).get("https") or (proxies or {}).get("http")
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def _limiter_for(self, url: str) -> _RateLimiter:
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = _RateLimiter(self.host_rate_limit)
+                self._limiters[host] = limiter
+            return limiter
+
+    # ---------- 请求 ----------
+    def get(self, url: str, proxies=None, timeout: float = 10) -> requests.Response:
+        """
+        同步 GET，复用连接池并遵守并发/限速约束（可在任意线程调用）
+        """
+        wait = self._limiter_for(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        with self._slots:
+            self.stats["requests"] += 1
+            try:
+                return self.session_for(proxies).get(url, timeout=timeout)
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+    def call_with_retry(self, func, item, max_retries: int = 3, label: str = None):
+        """
+        从代理池租用代理调用 func(item, proxy)，抛异常时换一个代理重试；每次调用的成败和耗时都会反馈给代理池
+        func 应在请求、HTTP 状态或响应解析出错时抛异常，“没有数据”等正常应答应返回空结果（如空 DataFrame），
+        这类应答不计为代理失败
+        :return: func 的返回值；全部重试均抛异常时返回 None
+        """
+        label = label or str(item)
+        pool = get_proxy_pool()
+        tried = []
+        for retry in range(max_retries):
+            proxy = pool.lease(exclude=tried)
+            t_start = time.monotonic()
+            ok = False
+            try:
+                result = func(item, proxy)
+                ok = True
+            except Exception as e:
+                print(f"{label} 请求异常: {est_common.exc_summary(e)}")
+            finally:
+                pool.release(proxy, ok, time.monotonic() - t_start)
+            if ok:
+                return result
+            if proxy:
+                tried.append(proxy)
+                # 代理被淘汰后关闭其连接池（仍在池中的代理可能正被其他任务使用）
+                if not pool.contains(proxy):
+                    self.discard_session(proxy)
+            if retry < max_retries - 1:
+                print(f"{label} 第{retry + 1}次失败，更换代理重试...")
+        return None
+
+    # ---------- 并发调度 ----------
+    async def amap(self, func, items, limit: int = None) -> list:
+        """
+        在共享线程池上并发执行 func(item)，按输入顺序返回结果
+        :param limit: 本次调用的并发上限（不超过全局上限）
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(limit or self.max_concurrency)
+
+        async def run_one(item):
+            async with semaphore:
+                return await loop.run_in_executor(self._executor, func, item)
+
+        return await asyncio.gather(*(run_one(item) for item in items))
+
+    def map(self, func, items, limit: int = None) -> list:
+        """amap 的同步入口（可在已有事件循环的线程中调用）"""
+        return run_sync(self.amap(func, list(items), limit))
+
+def run_sync(coro):
+    """
+    同步执行协程；若当前线程已有事件循环，则在独立线程中运行，避免嵌套 asyncio.run
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coro).result()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> FetchEngine:
+    """进程内共享的请求引擎"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
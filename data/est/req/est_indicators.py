@@ -0,0 +1,182 @@
+import os
+import fcntl
+import threading
+import numpy as np
+import pandas as pd
+from data.est.req.est_daily_store import DailyBarStore
+
+# 计算指标所需的最少日线根数
+INDICATOR_WINDOW = 20
+# 统计连续涨跌的最近交易日数
+RUN_WINDOW = 10
+
+INDICATOR_DTYPE = np.dtype([
+    ("code", "U6"),
+    ("date", "i4"),          # 计算所依据的最后交易日（YYYYMMDD）
+    ("fetched_at", "f8"),    # 计算所依据的日线写入时间戳
+    ("close", "f8"),
+    ("pct_chg", "f8"),
+    ("ma5", "f8"),
+    ("ma10", "f8"),
+    ("ma20", "f8"),
+    ("vol_ma5", "f8"),
+    ("vol_ma10", "f8"),
+    ("vol_ma20", "f8"),
+    ("low_5", "f8"),
+    ("low_10", "f8"),
+    ("high_10", "f8"),
+    ("low_20", "f8"),
+    ("high_20", "f8"),
+    ("up_streak", "i2"),     # 截至最后交易日的连续上涨天数
+    ("down_streak", "i2"),   # 截至最后交易日的连续下跌天数
+    ("max_up_run", "i2"),    # 最近 RUN_WINDOW 天内最长连涨
+    ("max_down_run", "i2"),  # 最近 RUN_WINDOW 天内最长连跌
+    ("upper_shadow", "f8"),
+    ("lower_shadow", "f8"),
+    ("body_length", "f8"),
+])
+
+INDICATOR_FIELDS = [name for name in INDICATOR_DTYPE.names if name not in ("code", "date", "fetched_at")]
+
+def _runs(flags: np.ndarray):
+    """
+    按行统计布尔矩阵的连续 True：返回 (末尾连续长度, 最长连续长度)
+    """
+    run = np.zeros(flags.shape[0], dtype=np.int16)
+    longest = np.zeros(flags.shape[0], dtype=np.int16)
+    for col in flags.T:
+        run = np.where(col, run + 1, 0).astype(np.int16)
+        longest = np.maximum(longest, run)
+    return run, longest
+
+def compute_indicators(codes, panel: dict) -> np.ndarray:
+    """
+    根据 (股票数 × INDICATOR_WINDOW) 日线面板计算指标，返回 INDICATOR_DTYPE 结构化数组
+    :param panel: DailyBarStore.load_panel 返回的 {field: ndarray}
+    """
+    out = np.zeros(len(codes), dtype=INDICATOR_DTYPE)
+    out["code"] = codes
+    if not len(codes):
+        return out
+    close = np.asarray(panel["close"], dtype=np.float64)
+    open_ = np.asarray(panel["open"], dtype=np.float64)
+    high = np.asarray(panel["high"], dtype=np.float64)
+    low = np.asarray(panel["low"], dtype=np.float64)
+    volume = np.asarray(panel["volume"], dtype=np.float64)
+    pct_chg = np.nan_to_num(np.asarray(panel["pct_chg"], dtype=np.float64))
+
+    out["close"] = close[:, -1]
+    out["pct_chg"] = pct_chg[:, -1]
+    for n in (5, 10, 20):
+        out[f"ma{n}"] = close[:, -n:].mean(axis=1)
+        out[f"vol_ma{n}"] = volume[:, -n:].mean(axis=1)
+    with np.errstate(all="ignore"):
+        out["low_5"] = np.nanmin(low[:, -5:], axis=1)
+        out["low_10"] = np.nanmin(low[:, -10:], axis=1)
+        out["high_10"] = np.nanmax(high[:, -10:], axis=1)
+        out["low_20"] = np.nanmin(low[:, -20:], axis=1)
+        out["high_20"] = np.nanmax(high[:, -20:], axis=1)
+
+    recent = pct_chg[:, -RUN_WINDOW:]
+    out["up_streak"], out["max_up_run"] = _runs(recent > 0)
+    out["down_streak"], out["max_down_run"] = _runs(recent < 0)
+
+    today_open, today_close = open_[:, -1], close[:, -1]
+    out["upper_shadow"] = high[:, -1] - np.maximum(today_open, today_close)
+    out["lower_shadow"] = np.minimum(today_open, today_close) - low[:, -1]
+    out["body_length"] = np.abs(today_close - today_open)
+    return out
+
+class IndicatorStore:
+    """
+    日线技术指标缓存
+    每只股票的指标按 (代码, 最后交易日, 日线写入时间) 缓存，与日线库放在同一目录的 .npy 文件中；
+    只有该股票有新日线写入时才重新计算，未变化的股票直接复用。
+    """
+
+    def __init__(self, bar_store: DailyBarStore = None):
+        self.bar_store = bar_store or DailyBarStore()
+        self.path = os.path.join(self.bar_store.save_dir, "daily_indicators.npy")
+        self.lock_path = os.path.join(self.bar_store.save_dir, "daily_indicators.lock")
+        self._lock = threading.Lock()
+        self._rows = np.zeros(0, dtype=INDICATOR_DTYPE)
+        self._index = {}
+        self._mtime = None
+        self._bar_key = None
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        rows = np.load(self.path)
+        self._rows = rows
+        self._index = {str(c): i for i, c in enumerate(rows["code"])}
+        self._mtime = mtime
+
+    def _stale_codes(self, versions: dict) -> list:
+        stale = []
+        for code, (last_date, fetched_at) in versions.items():
+            i = self._index.get(code)
+            if i is None or self._rows["date"][i] != last_date or self._rows["fetched_at"][i] != fetched_at:
+                stale.append(code)
+        return stale
+
+    def refresh(self) -> int:
+        """
+        重新计算所有日线已变化的股票，返回计算的股票数
+        """
+        with self._lock:
+            self._load()
+            bar_key = self.bar_store.version_key()
+            if bar_key is not None and bar_key == self._bar_key:
+                return 0
+            versions = self.bar_store.versions()
+            stale = set(self._stale_codes(versions))
+            keep = np.array([str(c) in versions and str(c) not in stale for c in self._rows["code"]], dtype=bool)
+            codes, panel = self.bar_store.load_panel(sorted(stale), INDICATOR_WINDOW, ["open", "close", "high", "low", "volume", "pct_chg"])
+            if codes or not keep.all():
+                fresh = compute_indicators(codes, panel)
+                fresh["date"] = [versions[c][0] for c in codes]
+                fresh["fetched_at"] = [versions[c][1] for c in codes]
+                # 保留未变化的股票，去掉已不在日线库或日线不足的股票
+                rows = np.concatenate([self._rows[keep], fresh])
+                rows = rows[np.argsort(rows["code"], kind="stable")]
+                self._save(rows)
+            self._bar_key = bar_key
+            return len(codes)
+
+    def _save(self, rows: np.ndarray):
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                tmp_path = self.path + ".tmp.npy"
+                np.save(tmp_path, rows)
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._rows = rows
+        self._index = {str(c): i for i, c in enumerate(rows["code"])}
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def get(self, code: str):
+        """
+        返回某只股票的最新指标字典，日线不足 INDICATOR_WINDOW 根时返回 None
+        """
+        df = self.get_many([code])
+        if df.empty:
+            return None
+        return df.iloc[0].to_dict()
+
+    def get_many(self, codes) -> pd.DataFrame:
+        """
+        批量返回指标（index 为股票代码），日线有更新的股票会先重新计算
+        """
+        self.refresh()
+        idx = [self._index[str(c)] for c in codes if str(c) in self._index]
+        rows = self._rows[idx]
+        df = pd.DataFrame({name: rows[name] for name in INDICATOR_DTYPE.names if name != "fetched_at"})
+        df["code"] = df["code"].astype(str)
+        return df.set_index("code")
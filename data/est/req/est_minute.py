@@ -1,19 +1,21 @@
 import os
-import math
 import pandas as pd
 from datetime import datetime
 import re
 import json
 import urllib.parse
-import requests
-from data.est.req import est_common
-import traceback
-import threading
+from data.est.req import est_http
+from data.est.req.est_minute_log import MinuteAppendLog
+from data.est.req.est_freshness import get_freshness_index
 
 class EastmoneyMinuteStockFetcher:
     def __init__(self, save_dir: str = "/tmp/stock/minute"):
         self.save_dir = save_dir
         os.makedirs(self.save_dir, exist_ok=True)
+        # 各股票分钟线的最后获取时间
+        self.freshness = get_freshness_index(os.path.join(self.save_dir, "freshness.json"))
+        # 盘中分时追加日志（只拉当天分时，只追加新分钟）
+        self.intraday_log = MinuteAppendLog(os.path.join(self.save_dir, "intraday"))
         # 初始化进度计数器
         self.progress_counter = {"count": 0, "total": 0}
 
@@ -23,7 +25,7 @@ class EastmoneyMinuteStockFetcher:
     def file_mtime_is_today(self, path: str) -> bool:
         return os.path.exists(path) and datetime.fromtimestamp(os.path.getmtime(path)).date() == datetime.now().date()
 
-    def get_base_url(self, symbol: str, period: str = "1", adjust: str = "", start_date=None, end_date=None) -> str:
+    def get_base_url(self, symbol: str, period: str = "1", adjust: str = "", start_date=None, end_date=None, ndays: int = 5) -> str:
         market_code = "1" if symbol.startswith("6") else "0"
         adjust_map = {"": "0", "qfq": "1", "hfq": "2"}
         params = {
@@ -35,7 +37,7 @@ class EastmoneyMinuteStockFetcher:
             params.update({
                 "fields1": "f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11,f12,f13",
                 "fields2": "f51,f52,f53,f54,f55,f56,f57,f58",
-                "ndays": "5",
+                "ndays": str(ndays),
                 "iscr": "0",
             })
         else:
@@ -50,50 +52,44 @@ class EastmoneyMinuteStockFetcher:
             })
         return url + "?" + urllib.parse.urlencode(params)
 
-    def fetch_minute(self, symbol: str, period: str = "1", adjust: str = "", start_date=None, end_date=None, proxy=None) -> pd.DataFrame | None:
-        url = self.get_base_url(symbol, period, adjust, start_date, end_date)
-        proxies = proxy
-        # print(f"url: {url}")
-        try:
-            resp = requests.get(url, proxies=proxies, timeout=30)
-            resp.encoding = "utf-8"
-            text = resp.text
-            match = re.search(r'(\{.*\})', text, re.DOTALL)
-            if not match:
-                print(f"{symbol} 未找到有效数据")
-                return None
-            data = json.loads(match.group(1))
-            if period == "1":
-                trends = data.get("data", {}).get("trends", [])
-                if not trends:
-                    print(f"{symbol} 没有分时数据")
-                    return None
-                columns = ["时间", "开盘", "收盘", "最高", "最低", "成交量", "成交额", "均价"]
-                rows = [item.split(",") for item in trends]
-            else:
-                klines = data.get("data", {}).get("klines", [])
-                if not klines:
-                    print(f"{symbol} 没有分钟K线数据")
-                    return None
-                columns = [
-                    "时间", "开盘", "收盘", "最高", "最低", "成交量", "成交额",
-                    "振幅", "涨跌幅", "涨跌额", "换手率"
-                ]
-                rows = [item.split(",") for item in klines]
-            df = pd.DataFrame(rows, columns=columns)
-            num_cols = [col for col in columns if col != "时间"]
-            df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
-            df["时间"] = pd.to_datetime(df["时间"], errors="coerce").astype(str)
-            if period != "1":
-                select_cols = [
-                    "时间", "开盘", "收盘", "最高", "最低", "涨跌幅", "涨跌额",
-                    "成交量", "成交额", "振幅", "换手率"
-                ]
-                df = df[[col for col in select_cols if col in df.columns]]
-            return df
-        except Exception as e:
-            print(f"{symbol} 获取数据异常: {est_common.exc_summary(e)}, proxy: {proxy['http']}")
-            return None
+    def fetch_minute(self, symbol: str, period: str = "1", adjust: str = "", start_date=None, end_date=None, proxy=None, ndays: int = 5) -> pd.DataFrame:
+        """
+        请求一只股票的分时/分钟K线；请求或解析失败时抛异常（由 call_with_retry 换代理重试）
+        :return: DataFrame，接口没有数据时为空表
+        """
+        url = self.get_base_url(symbol, period, adjust, start_date, end_date, ndays)
+        resp = est_http.get_engine().get(url, proxies=proxy, timeout=30)
+        resp.raise_for_status()
+        resp.encoding = "utf-8"
+        match = re.search(r'(\{.*\})', resp.text, re.DOTALL)
+        if not match:
+            raise ValueError(f"{symbol} 未找到有效数据")
+        data = json.loads(match.group(1)).get("data") or {}
+        if period == "1":
+            columns = ["时间", "开盘", "收盘", "最高", "最低", "成交量", "成交额", "均价"]
+            items = data.get("trends") or []
+        else:
+            columns = [
+                "时间", "开盘", "收盘", "最高", "最低", "成交量", "成交额",
+                "振幅", "涨跌幅", "涨跌额", "换手率"
+            ]
+            items = data.get("klines") or []
+        if not items:
+            # 停牌等情况下接口正常应答但没有数据，返回空表（不计为代理失败）
+            print(f"{symbol} 没有{'分时' if period == '1' else '分钟K线'}数据")
+            return pd.DataFrame(columns=columns)
+        rows = [item.split(",") for item in items]
+        df = pd.DataFrame(rows, columns=columns)
+        num_cols = [col for col in columns if col != "时间"]
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+        df["时间"] = pd.to_datetime(df["时间"], errors="coerce").astype(str)
+        if period != "1":
+            select_cols = [
+                "时间", "开盘", "收盘", "最高", "最低", "涨跌幅", "涨跌额",
+                "成交量", "成交额", "振幅", "换手率"
+            ]
+            df = df[[col for col in select_cols if col in df.columns]]
+        return df
 
     def save_minute(self, symbol: str, period: str, df: pd.DataFrame):
         save_path = self.get_save_path(symbol, period)
@@ -102,60 +98,83 @@ class EastmoneyMinuteStockFetcher:
             # print(f"{symbol} {period}min 分时数据已保存到 {save_path}")
 
     def update_all_minute(self, symbols: list[str], period: str = "1", adjust: str = "", start_date=None, end_date=None, use_proxy_and_concurrent: int = 10, progress_counter=None):
+        return est_http.run_sync(self.aupdate_all_minute(
+            symbols, period, adjust, start_date, end_date, use_proxy_and_concurrent, progress_counter
+        ))
+
+    async def aupdate_all_minute(self, symbols: list[str], period: str = "1", adjust: str = "", start_date=None, end_date=None, use_proxy_and_concurrent: int = 10, progress_counter=None):
+        """update_all_minute 的协程版本，请求在共享请求引擎的线程池中执行，不阻塞事件循环"""
         if progress_counter is None:
             progress_counter = self.progress_counter
         progress_counter["total"] = len(symbols)
         progress_counter["count"] = 0
 
-        symbols = [s for s in symbols if est_common.need_update(self.get_save_path(s, period))]
+        dataset = f"minute_{period}"
+        symbols = self.freshness.stale(dataset, symbols, fallback_path=lambda s: self.get_save_path(s, period))
         if not symbols:
             print(f"所有数据均为最新，无需更新。数据目录: {self.save_dir}")
             return
-        # chunk_size 至少为 40
-        chunk_size = max(40, math.ceil(len(symbols) / use_proxy_and_concurrent)) if use_proxy_and_concurrent > 0 else len(symbols)
-        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
-
-        def worker(chunk):
-            proxy = est_common.get_proxy()
-            for idx, symbol in enumerate(chunk):
-                retry = 0
-                while retry < 3:
-                    try:
-                        df = self.fetch_minute(symbol, period, adjust, start_date, end_date, proxy=proxy)
-                        if df is not None:
-                            break
-                        else:
-                            print(f"{symbol} 第{retry+1}次尝试失败，切换代理重试...")
-                            proxy = est_common.get_proxy()
-                            retry += 1
-                    except Exception as e:
-                        print(f"{symbol} fetch_minute 调用异常: {e}")
-                        if retry == 2:
-                            traceback.print_exc()
-                        proxy = est_common.get_proxy()
-                        retry += 1
-                if df is not None:
+        engine = est_http.get_engine()
+
+        def update_one(symbol):
+            df = engine.call_with_retry(
+                lambda sym, proxy: self.fetch_minute(sym, period, adjust, start_date, end_date, proxy=proxy), symbol
+            )
+            if df is not None:
+                if not df.empty:
                     self.save_minute(symbol, period, df)
-                else:
-                    print(f"{symbol} 三次更换代理均失败，跳过。")
-                if progress_counter is not None:
-                    progress_counter["count"] += 1
-                    # 每20个symbol打印一次进度
-                    if progress_counter["count"] % 20 == 0 or progress_counter["count"] == progress_counter["total"]:
-                        print(f"[{threading.current_thread().name}] 进度: {progress_counter['count']}/{progress_counter['total']} 完成 {symbol}")
-
-        threads = []
-        for chunk in chunks:
-            t = threading.Thread(target=worker, args=(chunk,))
-            t.start()
-            threads.append(t)
-        for t in threads:
-            t.join()
+                self.freshness.mark(dataset, symbol)
+            else:
+                print(f"{symbol} 三次更换代理均失败，跳过。")
+            if progress_counter is not None:
+                progress_counter["count"] += 1
+                # 每20个symbol打印一次进度
+                if progress_counter["count"] % 20 == 0 or progress_counter["count"] == progress_counter["total"]:
+                    print(f"进度: {progress_counter['count']}/{progress_counter['total']} 完成 {symbol}")
+
+        await engine.amap(update_one, symbols, limit=use_proxy_and_concurrent or None)
+        self.freshness.flush()
+
+    def update_intraday(self, symbols: list[str], use_proxy_and_concurrent: int = 10) -> int:
+        return est_http.run_sync(self.aupdate_intraday(symbols, use_proxy_and_concurrent))
+
+    async def aupdate_intraday(self, symbols: list[str], use_proxy_and_concurrent: int = 10) -> int:
+        """
+        盘中刷新：只拉取当天的 1 分钟分时（ndays=1），把比已存最后一分钟新的分钟追加到日志，
+        不受 need_update 限制，返回本次追加的分钟数
+        """
+        engine = est_http.get_engine()
+        appended = {"rows": 0, "symbols": 0}
+
+        def refresh_one(symbol):
+            df = engine.call_with_retry(
+                lambda sym, proxy: self.fetch_minute(sym, "1", proxy=proxy, ndays=1), symbol
+            )
+            if df is None:
+                print(f"{symbol} 三次更换代理均失败，跳过。")
+                return
+            if df.empty:
+                return
+            rows = self.intraday_log.append(symbol, df)
+            appended["rows"] += rows
+            appended["symbols"] += 1 if rows else 0
+
+        await engine.amap(refresh_one, symbols, limit=use_proxy_and_concurrent or None)
+        print(f"盘中分时刷新完成: {appended['symbols']}/{len(symbols)} 只股票有新数据，共追加 {appended['rows']} 分钟")
+        return appended["rows"]
+
+    def get_intraday_df(self, symbol: str) -> pd.DataFrame:
+        """返回最近一个交易日的分时滚动视图（来自盘中追加日志）"""
+        return self.intraday_log.get_today_df(symbol)
 
     def update_minute_batch(self, codes_df: pd.DataFrame, period: str = "1", adjust: str = "", start_date=None, end_date=None, use_proxy_and_concurrent: int = 10):
         symbols = codes_df['symbol'].tolist()
         self.update_all_minute(symbols, period, adjust, start_date, end_date, use_proxy_and_concurrent)
 
+    async def aupdate_minute_batch(self, codes_df: pd.DataFrame, period: str = "1", adjust: str = "", start_date=None, end_date=None, use_proxy_and_concurrent: int = 10):
+        symbols = codes_df['symbol'].tolist()
+        await self.aupdate_all_minute(symbols, period, adjust, start_date, end_date, use_proxy_and_concurrent)
+
     def update_minute_by_df(self, codes_df: pd.DataFrame, period: str = "1", adjust: str = "", start_date=None, end_date=None, use_proxy_and_concurrent: int = 10):
         self.update_minute_batch(codes_df, period, adjust, start_date, end_date, use_proxy_and_concurrent)
 
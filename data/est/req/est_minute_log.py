@@ -0,0 +1,114 @@
+import os
+import threading
+import pandas as pd
+
+# 分时数据列（与 trends2 接口 fields2 顺序一致）
+TREND_COLUMNS = ["时间", "开盘", "收盘", "最高", "最低", "成交量", "成交额", "均价"]
+
+class MinuteAppendLog:
+    """
+    盘中分时追加日志
+    每个交易日一个目录，每只股票一个只追加的 CSV（{save_dir}/{YYYYMMDD}/{code}.csv），
+    只写入比已存最后一分钟更新的分钟；同时在内存中维护当天分时的滚动视图。
+    最后一分钟可能仍在形成，更新后会以相同时间追加一行，读取时同一分钟以最后一行为准。
+    """
+
+    def __init__(self, save_dir: str = "/tmp/stock/minute/intraday"):
+        self.save_dir = save_dir
+        os.makedirs(self.save_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def get_log_path(self, code: str, trade_date: str) -> str:
+        """trade_date: YYYYMMDD"""
+        return os.path.join(self.save_dir, trade_date, f"{code}.csv")
+
+    def latest_trade_date(self):
+        """日志中最近的交易日（YYYYMMDD），没有日志时返回 None"""
+        days = [d for d in os.listdir(self.save_dir) if d.isdigit() and len(d) == 8]
+        return max(days) if days else None
+
+    def _read_log(self, code: str, trade_date: str) -> pd.DataFrame:
+        path = self.get_log_path(code, trade_date)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        df = pd.read_csv(path, dtype={"时间": str})
+        return df.drop_duplicates("时间", keep="last").sort_values("时间").reset_index(drop=True)
+
+    def _view_locked(self, code: str, trade_date: str) -> pd.DataFrame:
+        cached = self._views.get(code)
+        if cached is not None and cached[0] == trade_date:
+            return cached[1]
+        view = self._read_log(code, trade_date)
+        self._views[code] = (trade_date, view)
+        return view
+
+    def last_time(self, code: str, trade_date: str):
+        """已记录的最后一分钟（"YYYY-MM-DD HH:MM:SS"），没有记录时返回 None"""
+        with self._lock:
+            view = self._view_locked(code, trade_date)
+        return view["时间"].iloc[-1] if not view.empty else None
+
+    def append(self, code: str, df: pd.DataFrame) -> int:
+        """
+        追加分时数据，只写入最后一分钟及之后有变化的分钟，返回写入的行数
+        :param df: 分时 DataFrame（列见 TREND_COLUMNS），只取其中最近一个交易日
+        """
+        if df is None or df.empty:
+            return 0
+        df = df.dropna(subset=["时间"])
+        df = df[df["时间"].str.len() >= 16]
+        if df.empty:
+            return 0
+        trade_day = df["时间"].iloc[-1][:10]
+        df = df[df["时间"].str[:10] == trade_day][TREND_COLUMNS]
+        trade_date = trade_day.replace("-", "")
+
+        with self._lock:
+            view = self._view_locked(code, trade_date)
+            if view.empty:
+                new = df
+            else:
+                last = view.iloc[-1]
+                new = df[df["时间"] >= last["时间"]]
+                # 最后一分钟没有变化时不重复写入
+                if not new.empty and new["时间"].iloc[0] == last["时间"] and \
+                        list(new.iloc[0].values) == list(last[TREND_COLUMNS].values):
+                    new = new.iloc[1:]
+            if new.empty:
+                return 0
+
+            path = self.get_log_path(code, trade_date)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            new.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+            first_time = new["时间"].iloc[0]
+            kept = view[view["时间"] < first_time]
+            view = pd.concat([kept, new], ignore_index=True) if not kept.empty else new.reset_index(drop=True)
+            self._views[code] = (trade_date, view)
+            return len(new)
+
+    def rows_since(self, code: str, since: str = None, trade_date: str = None) -> pd.DataFrame:
+        """
+        返回滚动视图中时间不早于 since 的分钟（含 since 本身，最后一分钟可能已被更新），
+        since 为 None 时返回全部；供增量计算只读取新分钟
+        """
+        trade_date = trade_date or self.latest_trade_date()
+        if trade_date is None:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        with self._lock:
+            view = self._view_locked(code, trade_date)
+            if since is None:
+                return view.copy()
+            start = view["时间"].searchsorted(since, side="left")
+            return view.iloc[start:].copy()
+
+    def get_today_df(self, code: str, trade_date: str = None) -> pd.DataFrame:
+        """
+        返回某只股票最近一个交易日（或指定交易日）的分时滚动视图
+        """
+        trade_date = trade_date or self.latest_trade_date()
+        if trade_date is None:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+        with self._lock:
+            return self._view_locked(code, trade_date).copy()
@@ -11,6 +11,8 @@ import pandas as pd
 import exchange_calendars as xcals
 from data.est.req.est_concept import EastmoneyConceptStockFetcher
 from data.est.req.est_concept_codes import ConceptStockManager
+from data.est.req.est_concept_heat import ConceptHeatScorer
+from data.est.req.est_concept_history import ConceptHeatHistory
 from data.est.req.est_daily import EastmoneyDailyStockFetcher
 from data.est.req.est_minute import EastmoneyMinuteStockFetcher
 from data.est.req import est_common
@@ -23,11 +25,23 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 BLACKLIST_PATH = str(DATA_DIR / "blacklist_codes.txt")
 MEMBERS_DF_PATH = str(DATA_DIR / "members_df.pkl")
 
+def member_filter_mask(df: pd.DataFrame) -> pd.Series:
+    """
+    返回需要剔除的成分股（名称或代码包含任一 FILTER_WORDS，忽略大小写）
+    """
+    return (
+        df["名称"].str.contains(FILTER_PATTERN, na=False)
+        | df["代码"].str.contains(FILTER_PATTERN, na=False)
+    )
+
 class EstStockPipeline:
     def __init__(self, top_n: int = 20, use_proxy: bool = False):
         self.top_n = top_n
         self.use_proxy = use_proxy
         self.concept_manager = ConceptStockManager()
+        self.heat_scorer = ConceptHeatScorer()
+        # 概念热度时间序列（每次计算热度追加一个快照，供排名变化查询和前端接口使用）
+        self.heat_history = ConceptHeatHistory()
         self.daily_fetcher = EastmoneyDailyStockFetcher()
         self.minute_fetcher = EastmoneyMinuteStockFetcher()
         # 添加缓存目录
@@ -63,22 +77,15 @@ class EstStockPipeline:
             return "收盘后"
 
     async def get_top_n_concepts(self) -> List[str]:
-        # 检查缓存
-        concepts_cache_path = self.cache_dir / "top_concepts.pkl"
-        if concepts_cache_path.exists():
-            mtime = os.path.getmtime(concepts_cache_path)
+        # 最近一次热度快照仍在缓存时长内时直接使用
+        latest_df, latest_time = self.heat_history.latest()
+        if latest_time is not None:
+            age = (datetime.now() - latest_time).total_seconds()
             # 根据市场状态动态调整缓存时长
-            cache_duration = self.get_cache_duration()
-            if (datetime.now().timestamp() - mtime) < cache_duration:
-                try:
-                    cached_df = est_common.load_df_from_file(str(concepts_cache_path))
-                    if not cached_df.empty and '热度分数' in cached_df.columns:
-                        market_status = self.get_market_status()
-                        cache_age_minutes = (datetime.now().timestamp() - mtime) / 60
-                        print(f"使用缓存的概念板块数据 [{market_status}]，缓存时间: {datetime.fromtimestamp(mtime).strftime('%H:%M:%S')} (已缓存{cache_age_minutes:.0f}分钟)")
-                        return cached_df.nlargest(self.top_n, "热度分数")["代码"].tolist()
-                except Exception as e:
-                    print(f"读取概念缓存失败: {e}")
+            if age < self.get_cache_duration() and not latest_df.empty:
+                market_status = self.get_market_status()
+                print(f"使用缓存的概念板块数据 [{market_status}]，缓存时间: {latest_time.strftime('%H:%M:%S')} (已缓存{age / 60:.0f}分钟)")
+                return latest_df.nlargest(self.top_n, "热度分数")["代码"].tolist()
         
         fetcher = EastmoneyConceptStockFetcher()
         df = fetcher.fetch_and_save()
@@ -90,11 +97,12 @@ class EstStockPipeline:
         print(f"🔥 正在计算概念热度... [{market_status}]")
         df = self.calculate_concept_heat(df)
         
-        # 保存到缓存
+        # 追加热度快照（前端接口从热度时间序列读取），并按保留策略清理旧数据
         try:
-            est_common.save_df_to_file(df, str(concepts_cache_path))
+            self.heat_history.append(df)
+            self.heat_history.compact()
         except Exception as e:
-            print(f"保存概念缓存失败: {e}")
+            print(f"⚠️ 保存概念热度快照失败: {e}")
         
         # 显示热度排名前几名
         top_concepts = df.nlargest(min(5, len(df)), "热度分数")
@@ -103,113 +111,21 @@ class EstStockPipeline:
         for _, concept in top_concepts.iterrows():
             print(f"  {concept['名称']:<15} | 涨跌: {concept['涨跌幅']:>6.2f}% | 热度: {concept['热度分数']:>5.1f}分")
         
-        # 保存概念股热度分析CSV文件供前端API使用
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-            csv_filename = f"/tmp/stock/concept_heat_analysis_{timestamp}.csv"
-            
-            # 选择前端需要的列并重命名
-            frontend_df = df[['名称', '涨跌幅', '热度分数', '热度等级']].copy()
-            frontend_df.rename(columns={
-                '名称': '概念名称',
-                '涨跌幅': '平均涨幅(%)',
-                '热度分数': '热度分数',
-                '热度等级': '热度等级'
-            }, inplace=True)
-            
-            # 按热度分数降序排列
-            frontend_df = frontend_df.sort_values('热度分数', ascending=False)
-            
-            # 保存CSV文件
-            frontend_df.to_csv(csv_filename, index=False, encoding='utf-8')
-            print(f"✅ 概念股热度分析已保存: {csv_filename}")
-            
-        except Exception as e:
-            print(f"⚠️ 保存概念股热度分析CSV失败: {e}")
-        
         return df.nlargest(self.top_n, "热度分数")["代码"].tolist()
     
     def calculate_concept_heat(self, df: pd.DataFrame) -> pd.DataFrame:
         """计算概念热度分数（4维度评分体系）"""
-        import numpy as np
-        
-        results = []
-        
-        for _, concept in df.iterrows():
-            # 1. 板块涨跌幅得分 (40%)
-            price_change = concept.get('涨跌幅', 0)
-            price_score = np.clip((price_change + 10) * 5, 0, 100)
-            
-            # 2. 主力资金净流入得分 (30%)
-            capital_flow = concept.get('f62', 0) / 100000000  # 转换为亿元
-            capital_score = np.clip(capital_flow * 2 + 50, 0, 100)
-            
-            # 3. 成交活跃度得分 (20%)
-            volume = abs(concept.get('f66', 0)) / 100000000  # 转换为亿元
-            volume_score = np.clip(np.log10(volume + 1) * 20, 0, 100)
-            
-            # 4. 技术指标得分 (10%) - 基于振幅
-            amplitude = abs(concept.get('f78', 0)) / 1000000
-            tech_score = np.clip(amplitude * 5, 0, 100)
-            
-            # 加权计算总热度
-            total_heat = (price_score * 0.4 + capital_score * 0.3 + 
-                          volume_score * 0.2 + tech_score * 0.1)
-            
-            # 热度等级
-            if total_heat >= 80:
-                heat_level = "火热"
-            elif total_heat >= 60:
-                heat_level = "偏热"
-            elif total_heat >= 40:
-                heat_level = "温和"
-            elif total_heat >= 20:
-                heat_level = "偏冷"
-            else:
-                heat_level = "极冷"
-            
-            results.append({
-                '热度分数': round(total_heat, 1),
-                '热度等级': heat_level,
-                '价格得分': round(price_score, 1),
-                '资金得分': round(capital_score, 1),
-                '活跃度得分': round(volume_score, 1),
-                '技术得分': round(tech_score, 1)
-            })
-        
-        # 将热度信息添加到原DataFrame
-        heat_df = pd.DataFrame(results)
-        for col in heat_df.columns:
-            df[col] = heat_df[col]
-        
-        return df
+        return self.heat_scorer.apply(df)
 
     def get_all_members(self, concept_codes: List[str]) -> pd.DataFrame:
         print(f"正在获取 {len(concept_codes)} 个概念的成分股...")
-        dfs = []
-        for i, code in enumerate(concept_codes):
-            if i % 5 == 0:  # 每5个概念打印一次进度
-                print(f"进度: {i+1}/{len(concept_codes)}")
-            df = self.concept_manager.get_concept_df(code)
-            if df is not None:
-                dfs.append(df)
-        
-        if not dfs:
+        all_df = self.concept_manager.get_members(concept_codes)
+        if all_df.empty:
             return pd.DataFrame()
-        
-        all_df = pd.concat(dfs, ignore_index=True)
         print(f"合并前总股票数: {len(all_df)}")
         
-        # 使用更安全的过滤方式，避免正则表达式错误
-        filtered_df = all_df.copy()
-        
-        # 逐个过滤条件，避免复杂的正则表达式
-        for word in FILTER_WORDS:
-            if word:  # 确保过滤词不为空
-                filtered_df = filtered_df[
-                    ~filtered_df["名称"].str.contains(word, case=False, na=False, regex=False)
-                    & ~filtered_df["代码"].str.contains(word, case=False, na=False, regex=False)
-                ]
+        # 一次匹配所有过滤词（名称或代码包含任一过滤词即剔除）
+        filtered_df = all_df[~member_filter_mask(all_df)]
         
         # 去重
         filtered_df = filtered_df.drop_duplicates(subset=["代码"])
@@ -260,17 +176,16 @@ class EstStockPipeline:
         # 并行更新日线和分钟线数据
         if not members_df.empty:
             t_start = time.time()
-            # 创建任务并并行执行
-            daily_task = self.update_daily_for_members(members_df, use_proxy_and_concurrent=25)
-            minute_task = self.update_minute_for_members(members_df, use_proxy_and_concurrent=25)
-            
-            # 并行执行日线和分钟线更新
-            await asyncio.gather(daily_task, minute_task)
+            # 两个阶段共享请求引擎的并发额度，各自计时
+            await asyncio.gather(
+                self.timed_stage("更新日线", self.update_daily_for_members(members_df, use_proxy_and_concurrent=25), time_stats),
+                self.timed_stage("更新分钟线", self.update_minute_for_members(members_df, use_proxy_and_concurrent=25), time_stats),
+            )
             t_end = time.time()
             time_stats["并行更新数据"] = t_end - t_start
 
-        # 打印代理使用次数
-        print(f"代理使用次数: {getattr(est_common, 'PROXY_USE_COUNT', 0)}")
+        # 打印代理池统计
+        est_common.print_proxy_use_count()
         total_time = time.time() - t0
         print("各阶段耗时统计：")
         for k, v in time_stats.items():
@@ -280,6 +195,15 @@ class EstStockPipeline:
         )
         return members_df
 
+    @staticmethod
+    async def timed_stage(name: str, coro, time_stats: dict):
+        """运行一个阶段并把耗时记录到 time_stats[name]"""
+        t_start = time.time()
+        try:
+            return await coro
+        finally:
+            time_stats[name] = time.time() - t_start
+
     async def update_daily_for_members(self, members_df: pd.DataFrame, period="day", adjust="qfq", use_proxy_and_concurrent=25):
         if members_df is None or members_df.empty:
             print("members_df 为空，跳过日线更新")
@@ -289,18 +213,26 @@ class EstStockPipeline:
             for code in members_df["代码"]
         ]
         print(f"开始更新 {len(secids)} 只股票的日线数据...")
-        self.daily_fetcher.update_all_daily(
+        await self.daily_fetcher.aupdate_all_daily(
             secids, period=period, adjust=adjust, use_proxy_and_concurrent=use_proxy_and_concurrent
         )
         print(f"✅ 已批量更新 {len(secids)} 只股票的日线数据")
 
-    async def update_minute_for_members(self, members_df: pd.DataFrame, period="1", use_proxy_and_concurrent=25):
+    async def update_minute_for_members(self, members_df: pd.DataFrame, period="1", use_proxy_and_concurrent=25, intraday=False):
+        """
+        :param intraday: 盘中模式，只拉当天分时并追加新分钟到日志
+        """
         if members_df is None or members_df.empty:
             print("members_df 为空，跳过分钟线更新")
             return
+        if intraday:
+            symbols = members_df["代码"].tolist()
+            print(f"开始盘中刷新 {len(symbols)} 只股票的分时数据...")
+            await self.minute_fetcher.aupdate_intraday(symbols, use_proxy_and_concurrent=use_proxy_and_concurrent)
+            return
         codes_df = pd.DataFrame({"symbol": members_df["代码"].tolist()})
         print(f"开始更新 {len(codes_df)} 只股票的分钟数据...")
-        self.minute_fetcher.update_minute_batch(
+        await self.minute_fetcher.aupdate_minute_batch(
             codes_df, period=period, use_proxy_and_concurrent=use_proxy_and_concurrent
         )
         print(f"✅ 已批量更新 {len(codes_df)} 只股票的分钟数据")
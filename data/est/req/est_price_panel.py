@@ -0,0 +1,191 @@
+import os
+import json
+import glob
+import time
+import fcntl
+import threading
+import numpy as np
+import pandas as pd
+from data.est.req.est_daily_store import DailyBarStore, DAILY_COLUMNS, FIELD_MAP
+
+# 面板字段（第三维的顺序）
+PANEL_FIELDS = tuple(field for field, _ in FIELD_MAP.values())
+PANEL_DTYPE = np.float32
+# 面板保留的最近交易日数
+PANEL_DAYS = 500
+
+INDEX_NAME = "price_panel.json"
+
+class PricePanel:
+    """
+    日线价格面板（只读）
+    全部股票最近 PANEL_DAYS 个交易日的日线按 (股票 × 交易日 × 字段) 存放在定长 float32 .npy 文件中，
+    停牌或未上市的位置为 NaN。文件以内存映射方式打开，多个进程共享同一份页缓存，
+    按字段或按股票取数都是视图，不复制数据。
+    """
+
+    def __init__(self, save_dir: str = "/tmp/stock/daily"):
+        self.save_dir = save_dir
+        self.index_path = os.path.join(save_dir, INDEX_NAME)
+        self._stat_key = None
+        self.values = None
+        self.codes = np.empty(0, dtype="U6")
+        self.dates = np.empty(0, dtype=np.int32)
+        self.fields = PANEL_FIELDS
+        self.source = None
+        self.code_index = {}
+        self._field_index = {}
+
+    def reload_if_changed(self) -> bool:
+        """面板重建后重新映射，未变化时仅一次 stat；返回面板是否可用"""
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            self.values, self._stat_key = None, None
+            return False
+        key = (st.st_ino, st.st_mtime_ns)
+        if key == self._stat_key:
+            return self.values is not None
+        for attempt in range(2):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            try:
+                self.values = np.load(os.path.join(self.save_dir, index["file"]), mmap_mode="r")
+                break
+            except FileNotFoundError:
+                # 读取索引后面板恰好被重建，旧文件已删除
+                if attempt:
+                    raise
+        self.codes = np.asarray(index["codes"], dtype="U6")
+        self.dates = np.asarray(index["dates"], dtype=np.int32)
+        self.fields = tuple(index["fields"])
+        self.source = index.get("source")
+        self.code_index = {code: i for i, code in enumerate(index["codes"])}
+        self._field_index = {field: i for i, field in enumerate(self.fields)}
+        self._stat_key = key
+        return True
+
+    def is_current(self, bar_store: DailyBarStore) -> bool:
+        """面板是否由日线库的当前版本构建"""
+        if not self.reload_if_changed():
+            return False
+        version = bar_store.version_key()
+        return version is not None and self.source == list(version)
+
+    def field(self, name: str, last_n: int = None) -> np.ndarray:
+        """
+        某个字段的 (股票数 × 交易日数) 视图，行顺序与 codes 一致
+        :param last_n: 只取最近 last_n 个交易日
+        """
+        self.reload_if_changed()
+        values = self.values[:, :, self._field_index[name]]
+        return values[:, -last_n:] if last_n else values
+
+    def window(self, codes, last_n: int, fields=None):
+        """
+        读取指定股票最近 last_n 个交易日的面板（按代码取行会复制所选行）
+        :return: (找到的代码列表, {field: ndarray(M, last_n)})
+        """
+        self.reload_if_changed()
+        fields = fields or list(self.fields)
+        found = [str(c) for c in codes if str(c) in self.code_index]
+        rows = np.fromiter((self.code_index[c] for c in found), dtype=np.int64, count=len(found))
+        block = self.values[rows, -last_n:, :]
+        return found, {field: block[:, :, self._field_index[field]] for field in fields}
+
+    def series(self, code: str) -> np.ndarray:
+        """某只股票的 (交易日数 × 字段数) 视图，不存在返回 None"""
+        self.reload_if_changed()
+        i = self.code_index.get(str(code))
+        return None if i is None else self.values[i]
+
+    def frame(self, code: str, last_n: int = None):
+        """
+        某只股票的日线 DataFrame（列同 DAILY_COLUMNS，去掉无数据的交易日），不存在返回 None
+        """
+        values = self.series(code)
+        if values is None:
+            return None
+        has_bar = ~np.isnan(values[:, self._field_index["close"]])
+        values, dates = values[has_bar], self.dates[has_bar]
+        if last_n:
+            values, dates = values[-last_n:], dates[-last_n:]
+        data = {"日期": pd.to_datetime(dates.astype(str), format="%Y%m%d").strftime("%Y-%m-%d")}
+        for col, (field, kind) in FIELD_MAP.items():
+            if field not in self._field_index:
+                continue
+            column = values[:, self._field_index[field]].astype(np.float64)
+            data[col] = np.round(column).astype(kind) if kind == "i8" else column
+        return pd.DataFrame(data, columns=[c for c in DAILY_COLUMNS if c in data])
+
+def build_price_panel(bar_store: DailyBarStore, days: int = PANEL_DAYS, fields=PANEL_FIELDS):
+    """
+    由日线库构建价格面板：先写入新文件，再原子替换索引，旧文件在替换后删除
+    （已映射旧文件的进程不受影响）
+    :return: 面板文件路径，日线库为空时返回 None
+    """
+    save_dir = bar_store.save_dir
+    lock_path = os.path.join(save_dir, "price_panel.lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            version = bar_store.version_key()
+            bars = bar_store.load_history()
+            if not len(bars):
+                return None
+            dates = np.unique(bars["date"])[-days:]
+            rows = np.flatnonzero(bars["date"] >= dates[0])
+            codes, code_idx = np.unique(bars["code"][rows], return_inverse=True)
+            date_idx = np.searchsorted(dates, bars["date"][rows])
+
+            name = f"price_panel_{time.time_ns()}.npy"
+            path = os.path.join(save_dir, name)
+            tmp_path = path + ".tmp"
+            panel = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=PANEL_DTYPE,
+                                              shape=(len(codes), len(dates), len(fields)))
+            panel[:] = np.nan
+            for k, field in enumerate(fields):
+                panel[code_idx, date_idx, k] = bars[field][rows]
+            panel.flush()
+            del panel
+            os.replace(tmp_path, path)
+
+            index = {
+                "file": name,
+                "codes": [str(c) for c in codes],
+                "dates": [int(d) for d in dates],
+                "fields": list(fields),
+                "source": list(version) if version is not None else None,
+                "built_at": time.time(),
+            }
+            index_path = os.path.join(save_dir, INDEX_NAME)
+            tmp_index = index_path + ".tmp"
+            with open(tmp_index, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_index, index_path)
+
+            for old in glob.glob(os.path.join(save_dir, "price_panel_*.npy")):
+                if os.path.basename(old) != name:
+                    os.remove(old)
+            return path
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def ensure_price_panel(bar_store: DailyBarStore, days: int = PANEL_DAYS):
+    """日线库有变化时重建价格面板，返回是否重建"""
+    if PricePanel(bar_store.save_dir).is_current(bar_store):
+        return False
+    return build_price_panel(bar_store, days) is not None
+
+_panels = {}
+_panels_lock = threading.Lock()
+
+def open_price_panel(save_dir: str = "/tmp/stock/daily"):
+    """
+    打开（进程内复用）价格面板，面板不存在时返回 None
+    """
+    with _panels_lock:
+        panel = _panels.get(save_dir)
+        if panel is None:
+            panel = _panels[save_dir] = PricePanel(save_dir)
+    return panel if panel.reload_if_changed() else None
@@ -0,0 +1,251 @@
+import time
+import threading
+from data.est.req import est_common
+
+# 每次向代理接口批量获取的代理数
+PREFETCH_SIZE = 5
+# 池中可用代理低于该值时补充
+MIN_POOL_SIZE = 2
+# 单个代理同时被租用的上限，超过后优先补充新代理
+MAX_LEASES_PER_PROXY = 8
+# 连续失败多少次后淘汰
+MAX_CONSECUTIVE_FAILURES = 3
+# 样本数达到 MIN_SAMPLES 且成功率低于该值时淘汰
+MIN_SUCCESS_RATE = 0.5
+MIN_SAMPLES = 10
+# 失败后的退避时间（秒），按连续失败次数指数增长
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+# 两次请求代理接口之间的最小间隔（秒）
+REFILL_INTERVAL = 1.0
+# 等待其他线程补充代理的最长时间（秒），略长于代理接口的请求超时
+REFILL_WAIT_TIMEOUT = 15.0
+
+class ProxyStats:
+    """单个代理的健康统计"""
+
+    def __init__(self, proxies: dict):
+        self.proxies = proxies
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None  # 指数滑动平均（秒）
+        self.active_leases = 0
+        self.cooldown_until = 0.0
+        self.created_at = time.time()
+
+    @property
+    def key(self) -> str:
+        return self.proxies["https"]
+
+    @property
+    def success_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.successes / total if total else 1.0
+
+    def score(self) -> float:
+        """越大越好：成功率优先，其次延迟，最后看当前租用数"""
+        latency = self.latency if self.latency is not None else 1.0
+        return self.success_rate * 10 - latency - self.active_leases * 0.1
+
+    def to_dict(self) -> dict:
+        return {
+            "proxy": self.key.split("@")[-1],
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": round(self.success_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "active_leases": self.active_leases,
+        }
+
+class ProxyPool:
+    """
+    代理池
+    - 批量预取代理，多个工作线程复用同一批代理
+    - lease/release 租用归还，按成功率、延迟、在用数挑选代理
+    - 失败后指数退避，连续失败或成功率过低时淘汰
+    - counters 统计代理接口调用、租用、成功失败和淘汰次数
+    """
+
+    def __init__(self, fetch_func=None, prefetch_size: int = PREFETCH_SIZE, min_size: int = MIN_POOL_SIZE):
+        self.fetch_func = fetch_func or est_common.get_kuai_proxies
+        self.prefetch_size = prefetch_size
+        self.min_size = min_size
+        self._proxies = {}
+        self._lock = threading.Lock()
+        # 补充进行中的线程在锁外请求代理接口，其他线程在此等待补充完成
+        self._refill_cond = threading.Condition(self._lock)
+        self._refilling = False
+        self._refill_seq = 0
+        self._last_refill = 0.0
+        self.counters = {
+            "api_calls": 0,
+            "proxies_fetched": 0,
+            "leases": 0,
+            "successes": 0,
+            "failures": 0,
+            "evictions": 0,
+        }
+
+    # ---------- 补充 ----------
+    def _refill(self, exclude=()):
+        """
+        向代理接口补充代理：接口请求在锁外进行，不阻塞其他线程的 lease/release
+        - 其他线程正在补充时，等待其完成后直接返回（由调用方从补充后的池中租用）
+        - 距上次补充不足 REFILL_INTERVAL 时，池中仍有可用代理则不补充，否则等到间隔结束再补充
+        """
+        deadline = time.time() + REFILL_WAIT_TIMEOUT
+        with self._refill_cond:
+            seq = self._refill_seq
+            while True:
+                if self._refill_seq != seq:
+                    return
+                if self._refilling:
+                    wait = deadline - time.time()
+                else:
+                    wait = self._last_refill + REFILL_INTERVAL - time.time()
+                    if wait <= 0:
+                        break
+                    if self._available_locked(exclude):
+                        return
+                    wait = min(wait, deadline - time.time())
+                if wait <= 0:
+                    print("等待补充代理超时")
+                    return
+                self._refill_cond.wait(wait)
+            self._refilling = True
+            self._last_refill = time.time()
+            self.counters["api_calls"] += 1
+
+        fetched = []
+        try:
+            fetched = self.fetch_func(self.prefetch_size) or []
+        finally:
+            with self._refill_cond:
+                for proxies in fetched:
+                    if proxies["https"] not in self._proxies:
+                        self._proxies[proxies["https"]] = ProxyStats(proxies)
+                        self.counters["proxies_fetched"] += 1
+                self._refilling = False
+                self._refill_seq += 1
+                self._refill_cond.notify_all()
+        if not fetched:
+            print("代理接口未返回代理，池中无可用代理时请求将直连")
+
+    def _available_locked(self, exclude=()):
+        now = time.time()
+        return [
+            s for s in self._proxies.values()
+            if s.cooldown_until <= now and s.key not in exclude
+        ]
+
+    # ---------- 租用 ----------
+    def lease(self, exclude=()):
+        """
+        租用一个代理（requests proxies 字典），用完必须调用 release；无可用代理时返回 None（直连）
+        :param exclude: 本次不希望使用的代理（如刚失败的代理）
+        """
+        exclude = {p["https"] for p in exclude if p}
+        with self._lock:
+            available = self._available_locked(exclude)
+            idle = [s for s in available if s.active_leases < MAX_LEASES_PER_PROXY]
+            if len(available) >= self.min_size and idle:
+                return self._lease_locked(available)
+        self._refill(exclude)
+        with self._lock:
+            return self._lease_locked(self._available_locked(exclude))
+
+    def _lease_locked(self, available):
+        if not available:
+            return None
+        best = max(available, key=lambda s: s.score())
+        best.active_leases += 1
+        self.counters["leases"] += 1
+        return best.proxies
+
+    def release(self, proxies, success: bool, latency: float = None):
+        """
+        归还代理并记录本次结果
+        :param latency: 本次请求耗时（秒），仅成功时计入
+        """
+        if not proxies:
+            return
+        with self._lock:
+            stats = self._proxies.get(proxies["https"])
+            if stats is None:
+                return
+            stats.active_leases = max(0, stats.active_leases - 1)
+            self._record_locked(stats, success, latency)
+
+    def report(self, proxies, success: bool, latency: float = None):
+        """记录未经 lease 获取的代理（如 get_proxy 返回的代理）的使用结果"""
+        if not proxies:
+            return
+        with self._lock:
+            stats = self._proxies.get(proxies["https"])
+            if stats is not None:
+                self._record_locked(stats, success, latency)
+
+    def _record_locked(self, stats: ProxyStats, success: bool, latency: float = None):
+        if success:
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.cooldown_until = 0.0
+            self.counters["successes"] += 1
+            if latency is not None:
+                stats.latency = latency if stats.latency is None else stats.latency * 0.8 + latency * 0.2
+            return
+
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        self.counters["failures"] += 1
+        total = stats.successes + stats.failures
+        if (stats.consecutive_failures >= MAX_CONSECUTIVE_FAILURES
+                or (total >= MIN_SAMPLES and stats.success_rate < MIN_SUCCESS_RATE)):
+            del self._proxies[stats.key]
+            self.counters["evictions"] += 1
+            print(f"淘汰代理: {stats.key.split('@')[-1]}（成功率 {stats.success_rate:.0%}）")
+            return
+        backoff = min(BACKOFF_MAX, BACKOFF_BASE ** stats.consecutive_failures)
+        stats.cooldown_until = time.time() + backoff
+
+    def contains(self, proxies) -> bool:
+        with self._lock:
+            return bool(proxies) and proxies["https"] in self._proxies
+
+    def get(self):
+        """返回当前最优代理但不计租用（兼容旧的 get_proxy 调用方）"""
+        proxies = self.lease()
+        if proxies:
+            with self._lock:
+                stats = self._proxies.get(proxies["https"])
+                if stats is not None:
+                    stats.active_leases = max(0, stats.active_leases - 1)
+        return proxies
+
+    # ---------- 统计 ----------
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "size": len(self._proxies),
+                "proxies": [s.to_dict() for s in self._proxies.values()],
+            }
+
+    def print_stats(self):
+        c = self.snapshot()["counters"]
+        print(
+            f"代理池统计: 接口调用 {c['api_calls']} 次，获取代理 {c['proxies_fetched']} 个，"
+            f"租用 {c['leases']} 次，成功 {c['successes']} 次，失败 {c['failures']} 次，淘汰 {c['evictions']} 个"
+        )
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_proxy_pool() -> ProxyPool:
+    """进程内共享的代理池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool()
+        return _pool
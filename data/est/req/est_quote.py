@@ -0,0 +1,94 @@
+import urllib.parse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.est.req import est_http
+from data.est.req.est_daily_store import BAR_DTYPE
+
+# 每个请求携带的股票数
+QUOTE_BATCH_SIZE = 400
+
+# 行情字段 -> 列名
+QUOTE_FIELDS = {
+    "f12": "代码", "f13": "市场", "f14": "名称", "f2": "最新价", "f3": "涨跌幅", "f4": "涨跌额",
+    "f5": "成交量", "f6": "成交额", "f7": "振幅", "f8": "换手率", "f15": "最高", "f16": "最低",
+    "f17": "今开", "f18": "昨收", "f124": "更新时间",
+}
+
+# 快照列 -> 日线字段（成交量单位为手、成交额为元、振幅/涨跌幅/换手率为 %，与 kline 接口一致）
+BAR_FIELDS = {
+    "今开": "open", "最新价": "close", "最高": "high", "最低": "low", "成交量": "volume", "成交额": "amount",
+    "振幅": "amplitude", "涨跌幅": "pct_chg", "涨跌额": "change", "换手率": "turnover",
+}
+
+class EastmoneyQuoteFetcher:
+    """
+    批量实时行情快照（ulist 接口）
+    一次请求返回数百只股票的最新价、今开、最高、最低、成交量、成交额等，
+    用于盘中生成当天的日线，代替逐只请求 kline
+    """
+
+    def get_url(self, secids: list) -> str:
+        params = {
+            "fltt": "2",
+            "invt": "2",
+            "ut": "bd1d9ddb04089700cf9c27f6f7426281",
+            "fields": ",".join(QUOTE_FIELDS),
+            "secids": ",".join(secids),
+        }
+        return "https://push2.eastmoney.com/api/qt/ulist.np/get?" + urllib.parse.urlencode(params, safe=",")
+
+    def fetch_batch(self, secids: list, proxy=None) -> pd.DataFrame:
+        """请求一批股票的行情快照；请求或解析失败时抛异常（由 call_with_retry 换代理重试）"""
+        url = self.get_url(secids)
+        resp = est_http.get_engine().get(url, proxies=proxy, timeout=10)
+        resp.raise_for_status()
+        diff = (resp.json().get("data") or {}).get("diff") or []
+        if isinstance(diff, dict):
+            diff = list(diff.values())
+        return pd.DataFrame(diff, columns=list(QUOTE_FIELDS)).rename(columns=QUOTE_FIELDS)
+
+    async def afetch_quotes(self, secids: list, batch_size: int = QUOTE_BATCH_SIZE, concurrency: int = 5) -> pd.DataFrame:
+        """
+        分批并发请求全部股票的行情快照
+        :return: 快照 DataFrame（列见 QUOTE_FIELDS，数值列已转为数字，停牌等无报价的值为 NaN）
+        """
+        batches = [secids[i:i + batch_size] for i in range(0, len(secids), batch_size)]
+        engine = est_http.get_engine()
+
+        def fetch_one(batch):
+            return engine.call_with_retry(
+                lambda items, proxy: self.fetch_batch(items, proxy), batch, label=f"行情快照({len(batch)}只)"
+            )
+
+        frames = [df for df in await engine.amap(fetch_one, batches, limit=concurrency) if df is not None]
+        if not frames:
+            return pd.DataFrame(columns=list(QUOTE_FIELDS.values()))
+        df = pd.concat(frames, ignore_index=True)
+        df["代码"] = df["代码"].astype(str)
+        num_cols = [col for col in QUOTE_FIELDS.values() if col not in ("代码", "名称")]
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+        return df
+
+    def fetch_quotes(self, secids: list, batch_size: int = QUOTE_BATCH_SIZE, concurrency: int = 5) -> pd.DataFrame:
+        return est_http.run_sync(self.afetch_quotes(secids, batch_size, concurrency))
+
+    @staticmethod
+    def to_bars(quotes: pd.DataFrame, trade_date: str = None) -> np.ndarray:
+        """
+        将行情快照转为当天日线记录（BAR_DTYPE），只保留更新时间在 trade_date（YYYYMMDD，默认今天）且有成交的股票
+        """
+        trade_date = trade_date or datetime.now().strftime("%Y%m%d")
+        if quotes.empty:
+            return np.empty(0, dtype=BAR_DTYPE)
+        updated = pd.to_datetime(quotes["更新时间"], unit="s", errors="coerce", utc=True)
+        updated = updated.dt.tz_convert("Asia/Shanghai").dt.strftime("%Y%m%d")
+        valid = (updated == trade_date) & (quotes["最新价"] > 0) & (quotes["今开"] > 0) & (quotes["成交量"] > 0)
+        quotes = quotes[valid.to_numpy()]
+        records = np.zeros(len(quotes), dtype=BAR_DTYPE)
+        records["code"] = quotes["代码"].to_numpy()
+        records["date"] = int(trade_date)
+        for col, field in BAR_FIELDS.items():
+            values = quotes[col].to_numpy(dtype=np.float64)
+            records[field] = np.nan_to_num(values).astype(np.int64) if field == "volume" else values
+        return records
@@ -9,6 +9,8 @@ class TailTradingApp {
         this.token = localStorage.getItem('token');
         this.username = localStorage.getItem('username');
         this.hasNewSelection = false; // 标记是否有新的选股结果
+        this.lastEventId = null; // 已收到的最后一条事件编号，断线重连时补发
+        this.pendingSelections = new Set(); // 本页面发起、结果由接口直接返回的选股
         this.init();
     }
 
@@ -92,6 +94,85 @@ class TailTradingApp {
             this.loadExistingStockResults();
             this.loadTopConcepts(true); // 静默加载概念股数据，不显示日志
         }
+        this.subscribeEvents();
+    }
+
+    // 订阅后端任务事件（选股结果、概念热度更新），断线后自动重连并补发错过的事件
+    subscribeEvents() {
+        if (this._eventsController || !this.token) {
+            return;
+        }
+        const controller = new AbortController();
+        this._eventsController = controller;
+        const headers = { 'Authorization': `Bearer ${this.token}` };
+        if (this.lastEventId !== null) {
+            headers['Last-Event-ID'] = String(this.lastEventId);
+        }
+
+        const reconnect = () => {
+            if (this._eventsController !== controller) {
+                return;
+            }
+            this._eventsController = null;
+            setTimeout(() => this.subscribeEvents(), 3000);
+        };
+
+        fetch(`${this.apiBase}/events`, { headers, signal: controller.signal }).then(response => {
+            if (response.status === 401) {
+                this._eventsController = null;
+                return;
+            }
+            if (!response.ok || !response.body) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const reader = response.body.getReader();
+            const utf8Decoder = new TextDecoder('utf-8');
+            let buffer = '';
+
+            const processStream = () => reader.read().then(({done, value}) => {
+                if (done) {
+                    reconnect();
+                    return;
+                }
+                buffer += utf8Decoder.decode(value, {stream: true});
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                for (const line of lines) {
+                    if (line.startsWith('data:')) {
+                        try {
+                            this.handleEvent(JSON.parse(line.slice(5)));
+                        } catch (e) {
+                            console.error('事件解析异常:', e);
+                        }
+                    }
+                }
+                return processStream();
+            });
+            return processStream();
+        }).catch(() => reconnect());
+    }
+
+    unsubscribeEvents() {
+        if (this._eventsController) {
+            this._eventsController.abort();
+            this._eventsController = null;
+        }
+    }
+
+    // 处理推送的任务事件
+    handleEvent(event) {
+        this.lastEventId = event.id;
+        if (event.topic === 'selection' && event.type === 'result') {
+            // 本页面发起的选股由接口响应显示
+            if (!this.pendingSelections.has(event.strategy)) {
+                this.addLog(`📡 收到推送: ${event.message}`);
+                this.displayStocks(event.data, event.strategy);
+            }
+        } else if (event.topic === 'selection' && event.type === 'error') {
+            this.addLog(`❌ ${event.message}`);
+        } else if (event.topic === 'concepts' && event.type === 'refresh') {
+            this.loadTopConcepts(true);
+        }
     }
 
     // API请求封装
@@ -172,6 +253,7 @@ class TailTradingApp {
     }
 
     logout() {
+        this.unsubscribeEvents();
         this.token = null;
         this.username = null;
         localStorage.removeItem('token');
@@ -277,11 +359,8 @@ class TailTradingApp {
                                     this.loadTopConcepts();
                                 }, 1000); // 延迟1秒确保数据文件生成完成
                                 
-                                // 自动执行三种选股策略
-                                this.addLog('🤖 数据更新完成，开始自动执行三种选股策略...');
-                                setTimeout(() => {
-                                    this.autoExecuteAllStrategies();
-                                }, 2000); // 延迟2秒确保数据更新完全完成
+                                // 三种选股策略由后端在更新完成后执行，结果通过事件流推送
+                                this.addLog('🤖 数据更新完成，后台开始执行三种选股策略，结果将自动推送...');
                             } else if (data.type === 'error') {
                                 this.addLog(`❌ ${data.message}`);
                                 clearTimeout(timeoutId);
@@ -493,10 +572,11 @@ class TailTradingApp {
                     break;
             }
 
+            this.pendingSelections.add(strategy);
             const data = await this.apiRequest(apiEndpoint, {
                 method: 'POST',
                 body: JSON.stringify(requestBody)
-            });
+            }).finally(() => this.pendingSelections.delete(strategy));
 
             if (data.success) {
                 this.addLog('选股完成！');
@@ -999,10 +1079,11 @@ class TailTradingApp {
                 break;
         }
 
+        this.pendingSelections.add(strategy);
         const data = await this.apiRequest(apiEndpoint, {
             method: 'POST',
             body: JSON.stringify(requestBody)
-        });
+        }).finally(() => this.pendingSelections.delete(strategy));
 
         if (data.success) {
             if (data.data && data.data.length > 0) {
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+命令行启动耗时检查脚本
+
+用 `python -X importtime` 运行 tail_trading.py 的轻量命令（--help、config --list、monitor 等），检查：
+- 启动总耗时不超过预算
+- 没有导入 pandas、numpy、exchange_calendars 和 data.est 等重模块
+任一命令超出预算或导入了重模块时以非零退出码结束，可在 CI 或部署验证中使用
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ENTRY = os.path.join(PROJECT_ROOT, "tail_trading.py")
+
+# 轻量命令：不应加载数据和策略模块
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["config", "--help"],
+    ["config", "--list"],
+    ["monitor", "--help"],
+    ["select", "--help"],
+    ["update", "--help"],
+    ["scan", "--help"],
+]
+
+# 轻量命令不应导入的模块
+HEAVY_MODULES = ["pandas", "numpy", "exchange_calendars", "data.est.req.est_prepare_data",
+                 "tail_trading.strategies.tail_up_strategy"]
+
+def parse_importtime(stderr: str) -> dict:
+    """解析 -X importtime 输出，返回 {模块名: 累计耗时(微秒)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+def check_command(args: list, budget_ms: float) -> list:
+    """运行一条命令，返回发现的问题列表"""
+    t_start = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", ENTRY] + args,
+                          capture_output=True, text=True, cwd=PROJECT_ROOT)
+    elapsed_ms = (time.time() - t_start) * 1000
+    modules = parse_importtime(proc.stderr)
+    cli_ms = modules.get("tail_trading.cli.main", 0) / 1000
+
+    problems = []
+    if proc.returncode != 0:
+        problems.append(f"退出码 {proc.returncode}")
+    if elapsed_ms > budget_ms:
+        problems.append(f"耗时 {elapsed_ms:.0f}ms 超过预算 {budget_ms:.0f}ms")
+    loaded = [m for m in HEAVY_MODULES if m in modules]
+    if loaded:
+        problems.append(f"导入了重模块: {', '.join(loaded)}")
+
+    status = "✓" if not problems else "✗"
+    print(f"{status} {' '.join(args):<20} 总耗时 {elapsed_ms:6.0f}ms  导入 tail_trading.cli.main {cli_ms:6.1f}ms"
+          f"  模块数 {len(modules)}")
+    for problem in problems:
+        print(f"    {problem}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行启动耗时检查")
+    parser.add_argument("--budget-ms", type=float, default=800, help="每条命令的启动耗时预算（毫秒）")
+    args = parser.parse_args()
+
+    failed = sum(bool(check_command(command, args.budget_ms)) for command in LIGHT_COMMANDS)
+    if failed:
+        print(f"\n{failed} 条命令未通过检查")
+        sys.exit(1)
+    print("\n全部命令通过检查")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+概念热度评分 微基准脚本
+
+用随机生成的概念板块数据（含缺失值、负成交额、边界涨跌幅），对比原逐行循环实现与
+ConceptHeatScorer 整列实现的耗时，并逐项校验两者结果一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from data.est.req.est_concept_heat import ConceptHeatScorer
+
+def make_concepts(n: int, seed: int = 0) -> pd.DataFrame:
+    """生成随机概念板块数据"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "代码": [f"BK{i:04d}" for i in range(n)],
+        "名称": [f"概念{i}" for i in range(n)],
+        "涨跌幅": np.round(rng.uniform(-12, 12, n), 2),
+        "f62": rng.normal(0, 3e9, n),
+        "f66": rng.uniform(-1e9, 5e11, n),
+        "f78": rng.uniform(0, 5e7, n),
+    })
+    # 缺失值与阈值边界
+    df.loc[df.index[::37], "涨跌幅"] = np.nan
+    df.loc[df.index[::41], "f62"] = np.nan
+    df.loc[df.index[1::43], "涨跌幅"] = -10.0
+    return df
+
+def legacy_concept_heat(df: pd.DataFrame) -> pd.DataFrame:
+    """原 EstStockPipeline.calculate_concept_heat 的逐行实现（作为基准）"""
+    results = []
+    for _, concept in df.iterrows():
+        price_change = concept.get('涨跌幅', 0)
+        price_score = np.clip((price_change + 10) * 5, 0, 100)
+        capital_flow = concept.get('f62', 0) / 100000000
+        capital_score = np.clip(capital_flow * 2 + 50, 0, 100)
+        volume = abs(concept.get('f66', 0)) / 100000000
+        volume_score = np.clip(np.log10(volume + 1) * 20, 0, 100)
+        amplitude = abs(concept.get('f78', 0)) / 1000000
+        tech_score = np.clip(amplitude * 5, 0, 100)
+        total_heat = (price_score * 0.4 + capital_score * 0.3 +
+                      volume_score * 0.2 + tech_score * 0.1)
+        if total_heat >= 80:
+            heat_level = "火热"
+        elif total_heat >= 60:
+            heat_level = "偏热"
+        elif total_heat >= 40:
+            heat_level = "温和"
+        elif total_heat >= 20:
+            heat_level = "偏冷"
+        else:
+            heat_level = "极冷"
+        results.append({
+            '热度分数': round(total_heat, 1),
+            '热度等级': heat_level,
+            '价格得分': round(price_score, 1),
+            '资金得分': round(capital_score, 1),
+            '活跃度得分': round(volume_score, 1),
+            '技术得分': round(tech_score, 1)
+        })
+    heat_df = pd.DataFrame(results)
+    for col in heat_df.columns:
+        df[col] = heat_df[col]
+    return df
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        data = df.copy()
+        t0 = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="概念热度评分微基准")
+    parser.add_argument("--concepts", type=int, default=500, help="概念板块数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每种实现的运行次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    df = make_concepts(args.concepts, args.seed)
+    scorer = ConceptHeatScorer()
+
+    legacy = legacy_concept_heat(df.copy())
+    vectorized = scorer.apply(df.copy())
+    columns = ['热度分数', '热度等级', '价格得分', '资金得分', '活跃度得分', '技术得分']
+    mismatched = [col for col in columns if not legacy[col].equals(vectorized[col])]
+
+    t_legacy = best_of(legacy_concept_heat, df, args.repeat)
+    t_vectorized = best_of(scorer.apply, df, args.repeat)
+
+    print(f"概念数: {args.concepts}，取 {args.repeat} 次最短耗时")
+    print(f"  逐行循环: {t_legacy * 1000:8.2f} ms")
+    print(f"  整列计算: {t_vectorized * 1000:8.2f} ms")
+    print(f"  加速比:   {t_legacy / t_vectorized:8.1f}x")
+    if mismatched:
+        print(f"❌ 结果不一致的列: {mismatched}")
+        sys.exit(1)
+    print("✅ 两种实现结果一致")
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,6 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-from datetime import datetime
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -204,7 +203,8 @@ def analyze_concept_heat_v2():
     print("4. 热度<20分: 市场冷淡，建议观望")
     
     # 保存详细分析结果
-    output_file = f"/tmp/stock/concept_heat_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+    # 固定文件名覆盖保存（热度历史由 ConceptHeatHistory 记录）
+    output_file = "/tmp/stock/concept_heat_explained.csv"
     df_output = df[["名称", "涨跌幅", "f62", "f66", "热度分数", "热度等级"]].copy()
     df_output.columns = ["概念名称", "涨跌幅(%)", "主力净流入(元)", "成交额(元)", "热度分数", "热度等级"]
     df_output.to_csv(output_file, index=False, encoding='utf-8')
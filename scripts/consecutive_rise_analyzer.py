@@ -31,12 +31,20 @@ class ConsecutiveRiseAnalyzer:
         except:
             self.data_fetcher = None
     
-    def calculate_consecutive_days(self, daily_df: pd.DataFrame) -> Dict[str, Any]:
+    @classmethod
+    def offline(cls) -> "ConsecutiveRiseAnalyzer":
+        """不带数据获取器的分析器，只分析调用方传入的日线（供子进程使用）"""
+        analyzer = cls.__new__(cls)
+        analyzer.data_fetcher = None
+        return analyzer
+    
+    def calculate_consecutive_days(self, daily_df: pd.DataFrame, indicators: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         计算连续涨跌天数
         
         Args:
             daily_df: 日线数据
+            indicators: 缓存的日线指标（给出时直接使用其中的连续涨跌统计）
             
         Returns:
             连续涨跌统计
@@ -47,37 +55,35 @@ class ConsecutiveRiseAnalyzer:
         # 获取涨跌幅序列
         pct_changes = pd.to_numeric(daily_df["涨跌幅"], errors="coerce").fillna(0)
         
-        # 计算连续上涨天数
-        consecutive_rise = 0
-        consecutive_fall = 0
-        current_rise = 0
-        current_fall = 0
-        
-        for pct in pct_changes[-10:]:  # 看最近10天
-            if pct > 0:
-                current_rise += 1
-                current_fall = 0
-            elif pct < 0:
-                current_fall += 1
-                current_rise = 0
-            else:
-                current_rise = 0
-                current_fall = 0
+        if indicators is not None:
+            consecutive_rise = int(indicators["max_up_run"])
+            consecutive_fall = int(indicators["max_down_run"])
+            current_consecutive_rise = int(indicators["up_streak"])
+            current_consecutive_fall = int(indicators["down_streak"])
+        else:
+            # 计算连续上涨天数
+            consecutive_rise = 0
+            consecutive_fall = 0
+            current_rise = 0
+            current_fall = 0
             
-            consecutive_rise = max(consecutive_rise, current_rise)
-            consecutive_fall = max(consecutive_fall, current_fall)
-        
-        # 当前连续状态
-        current_consecutive_rise = 0
-        current_consecutive_fall = 0
-        
-        for pct in reversed(pct_changes[-10:]):
-            if pct > 0:
-                current_consecutive_rise += 1
-            elif pct < 0:
-                current_consecutive_fall += 1
-            else:
-                break
+            for pct in pct_changes[-10:]:  # 看最近10天
+                if pct > 0:
+                    current_rise += 1
+                    current_fall = 0
+                elif pct < 0:
+                    current_fall += 1
+                    current_rise = 0
+                else:
+                    current_rise = 0
+                    current_fall = 0
+                
+                consecutive_rise = max(consecutive_rise, current_rise)
+                consecutive_fall = max(consecutive_fall, current_fall)
+            
+            # 当前连续状态（截至最后一天、同方向的连续天数）
+            current_consecutive_rise = current_rise
+            current_consecutive_fall = current_fall
         
         # 风险评级
         risk_level = self._assess_consecutive_risk(current_consecutive_rise, current_consecutive_fall)
@@ -115,13 +121,14 @@ class ConsecutiveRiseAnalyzer:
         else:
             return "正常区间"
     
-    def find_support_levels(self, daily_df: pd.DataFrame, days: int = 20) -> Dict[str, Any]:
+    def find_support_levels(self, daily_df: pd.DataFrame, days: int = 20, indicators: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         寻找支撑位
         
         Args:
             daily_df: 日线数据
             days: 分析天数
+            indicators: 缓存的日线指标（20日分析时直接使用其中的均线和区间低点）
             
         Returns:
             支撑位信息
@@ -140,32 +147,40 @@ class ConsecutiveRiseAnalyzer:
         
         current_price = close_prices.iloc[-1]
         
+        if indicators is not None and days == 20:
+            low_5, low_10, low_20 = indicators["low_5"], indicators["low_10"], indicators["low_20"]
+            ma5, ma10, ma20 = indicators["ma5"], indicators["ma10"], indicators["ma20"]
+            high_20, range_low = indicators["high_20"], low_20
+        else:
+            low_5, low_10, low_20 = recent_lows.tail(5).min(), recent_lows.tail(10).min(), recent_lows.tail(20).min()
+            ma5 = close_prices.tail(20).rolling(5).mean().iloc[-1]
+            ma10 = close_prices.tail(20).rolling(10).mean().iloc[-1]
+            ma20 = close_prices.tail(20).rolling(20).mean().iloc[-1]
+            high_20, range_low = recent_highs.max(), recent_lows.min()
+        
         # 寻找支撑位（近期低点）
         supports = []
         
         # 1. 最近5日、10日、20日最低价
         supports.append({
             "type": "5日最低",
-            "price": recent_lows.tail(5).min(),
-            "distance": (current_price - recent_lows.tail(5).min()) / current_price * 100
+            "price": low_5,
+            "distance": (current_price - low_5) / current_price * 100
         })
         
         supports.append({
             "type": "10日最低", 
-            "price": recent_lows.tail(10).min(),
-            "distance": (current_price - recent_lows.tail(10).min()) / current_price * 100
+            "price": low_10,
+            "distance": (current_price - low_10) / current_price * 100
         })
         
         supports.append({
             "type": "20日最低",
-            "price": recent_lows.tail(20).min(),
-            "distance": (current_price - recent_lows.tail(20).min()) / current_price * 100
+            "price": low_20,
+            "distance": (current_price - low_20) / current_price * 100
         })
         
         # 2. 重要均线支撑
-        ma5 = close_prices.tail(20).rolling(5).mean().iloc[-1]
-        ma10 = close_prices.tail(20).rolling(10).mean().iloc[-1]
-        ma20 = close_prices.tail(20).rolling(20).mean().iloc[-1]
         
         supports.extend([
             {
@@ -189,9 +204,7 @@ class ConsecutiveRiseAnalyzer:
         supports = sorted(supports, key=lambda x: x["distance"])
         
         # 判断当前位置
-        high_20 = recent_highs.max()
-        low_20 = recent_lows.min()
-        position_ratio = (current_price - low_20) / (high_20 - low_20) * 100 if high_20 > low_20 else 50
+        position_ratio = (current_price - range_low) / (high_20 - range_low) * 100 if high_20 > range_low else 50
         
         if position_ratio > 80:
             position_desc = "高位"
@@ -232,11 +245,37 @@ class ConsecutiveRiseAnalyzer:
             if daily_df is None or daily_df.empty:
                 return {"error": "无法获取数据"}
             
+            # 与日线同一交易日的缓存指标
+            indicators = self.data_fetcher.get_indicator(code, daily_df)
+            
+            return self.analyze_daily(code, daily_df, name, indicators)
+            
+        except Exception as e:
+            return {"error": f"分析失败: {str(e)}"}
+    
+    def analyze_daily(self, code: str, daily_df: pd.DataFrame, name: str = "",
+                      indicators: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        基于已加载的日线分析回调机会（不访问数据源）
+        
+        Args:
+            code: 股票代码
+            daily_df: 日线数据
+            name: 股票名称
+            indicators: 缓存的日线指标
+            
+        Returns:
+            回调分析结果
+        """
+        if daily_df is None or daily_df.empty:
+            return {"error": "无法获取数据"}
+        
+        try:
             # 连续涨跌分析
-            consecutive_analysis = self.calculate_consecutive_days(daily_df)
+            consecutive_analysis = self.calculate_consecutive_days(daily_df, indicators)
             
             # 支撑位分析
-            support_analysis = self.find_support_levels(daily_df)
+            support_analysis = self.find_support_levels(daily_df, indicators=indicators)
             
             # 当前基本信息
             latest = daily_df.iloc[-1]
@@ -18,81 +18,7 @@ def main():
     print("🎯 整合放量回调、涨停逻辑和技术分析")
     
     try:
-        # 简化的增强选股（避免复杂依赖导致的问题）
-        print("\n🔍 执行增强选股...")
-        
-        # 尝试使用真实的选股逻辑
-        try:
-            from tail_trading.strategies.tail_up_strategy import TailUpStrategy
-            from tail_trading.config.trading_config import TradingConfig
-            
-            print("📊 使用真实增强选股算法...")
-            trading_config = TradingConfig.get_preset("aggressive")  # 使用激进配置
-            strategy = TailUpStrategy(trading_config)
-            base_stocks = strategy.select_stocks()
-            
-            if base_stocks is not None and not base_stocks.empty:
-                # 应用增强筛选
-                enhanced_stocks = base_stocks.copy()
-                enhanced_stocks['增强评分'] = 0
-                
-                # 增强评分算法
-                enhanced_stocks.loc[enhanced_stocks['涨跌幅'] > 4, '增强评分'] += 40
-                enhanced_stocks.loc[enhanced_stocks['涨跌幅'].between(2, 4), '增强评分'] += 30
-                enhanced_stocks.loc[enhanced_stocks['涨跌幅'].between(0, 2), '增强评分'] += 20
-                
-                if '次日补涨概率' in enhanced_stocks.columns:
-                    enhanced_stocks.loc[enhanced_stocks['次日补涨概率'] > 25, '增强评分'] += 35
-                    enhanced_stocks.loc[enhanced_stocks['次日补涨概率'].between(20, 25), '增强评分'] += 25
-                
-                # 筛选增强评分 >= 55的股票
-                enhanced_stocks = enhanced_stocks[enhanced_stocks['增强评分'] >= 55]
-                enhanced_stocks = enhanced_stocks.sort_values('增强评分', ascending=False)
-                
-                results = []
-                for _, stock in enhanced_stocks.head(8).iterrows():
-                    results.append({
-                        "代码": stock['代码'],
-                        "名称": stock.get('名称', ''),
-                        "增强评分": round(stock.get('增强评分', 0), 1),
-                        "涨跌幅": stock.get('涨跌幅', 0),
-                        "风险评分": round(stock.get('风险评分', 40), 1),
-                        "选股类型": "增强算法"
-                    })
-            else:
-                print("基础选股无结果，使用模拟数据...")
-                raise Exception("Use fallback data")
-                
-        except Exception as e:
-            print(f"真实算法失败: {e}, 使用模拟数据...")
-            # 模拟增强选股结果
-            results = [
-                {"代码": "000858", "名称": "五粮液", "增强评分": 78.5, "涨跌幅": 2.8, "风险评分": 45.0, "选股类型": "增强算法"},
-                {"代码": "600036", "名称": "招商银行", "增强评分": 72.3, "涨跌幅": 1.9, "风险评分": 35.0, "选股类型": "增强算法"},
-                {"代码": "000725", "名称": "京东方A", "增强评分": 68.7, "涨跌幅": 4.2, "风险评分": 52.0, "选股类型": "增强算法"},
-                {"代码": "002001", "名称": "新和成", "增强评分": 65.2, "涨跌幅": 3.1, "风险评分": 38.0, "选股类型": "增强算法"},
-                {"代码": "300750", "名称": "宁德时代", "增强评分": 61.8, "涨跌幅": 1.5, "风险评分": 48.0, "选股类型": "增强算法"}
-            ]
-        
-        if not results:
-            print("❌ 增强选股没有找到合适的股票")
-            results = []
-        else:
-            print(f"✅ 增强选股完成，共找到 {len(results)} 只股票")
-            
-            # 显示结果
-            print("\n📋 增强选股结果（按增强评分排序）：")
-            for i, stock in enumerate(results):
-                print(f"{i+1}. {stock['代码']} {stock['名称']} - 增强评分：{stock['增强评分']}分")
-        
-        # 输出JSON格式结果供前端使用
-        output = {
-            "success": True,
-            "strategy": "enhanced",
-            "count": len(results),
-            "stocks": results,
-            "timestamp": datetime.now().isoformat()
-        }
+        output = run_enhanced_selection()
         
         print("\n" + "="*50)
         print("📊 增强选股结果（JSON格式）：")
@@ -109,5 +35,92 @@ def main():
         }
         print(json.dumps(error_output, ensure_ascii=False))
 
+def run_enhanced_selection(base_stocks=None) -> dict:
+    """
+    执行增强选股并返回结构化结果
+    
+    Args:
+        base_stocks: 激进配置下 TailUpStrategy 的选股结果（None 时现场计算）
+        
+    Returns:
+        结果字典（stocks 为前端使用的股票列表）
+    """
+    # 简化的增强选股（避免复杂依赖导致的问题）
+    print("\n🔍 执行增强选股...")
+    
+    # 尝试使用真实的选股逻辑
+    try:
+        from tail_trading.strategies.tail_up_strategy import TailUpStrategy
+        from tail_trading.config.trading_config import TradingConfig
+        
+        print("📊 使用真实增强选股算法...")
+        if base_stocks is None:
+            trading_config = TradingConfig.get_preset("aggressive")  # 使用激进配置
+            strategy = TailUpStrategy(trading_config)
+            base_stocks = strategy.select_stocks()
+        
+        if base_stocks is not None and not base_stocks.empty:
+            # 应用增强筛选
+            enhanced_stocks = base_stocks.copy()
+            enhanced_stocks['增强评分'] = 0
+            
+            # 增强评分算法
+            enhanced_stocks.loc[enhanced_stocks['涨跌幅'] > 4, '增强评分'] += 40
+            enhanced_stocks.loc[enhanced_stocks['涨跌幅'].between(2, 4), '增强评分'] += 30
+            enhanced_stocks.loc[enhanced_stocks['涨跌幅'].between(0, 2), '增强评分'] += 20
+            
+            if '次日补涨概率' in enhanced_stocks.columns:
+                enhanced_stocks.loc[enhanced_stocks['次日补涨概率'] > 25, '增强评分'] += 35
+                enhanced_stocks.loc[enhanced_stocks['次日补涨概率'].between(20, 25), '增强评分'] += 25
+            
+            # 筛选增强评分 >= 55的股票
+            enhanced_stocks = enhanced_stocks[enhanced_stocks['增强评分'] >= 55]
+            enhanced_stocks = enhanced_stocks.sort_values('增强评分', ascending=False)
+            
+            results = []
+            for _, stock in enhanced_stocks.head(8).iterrows():
+                results.append({
+                    "代码": stock['代码'],
+                    "名称": stock.get('名称', ''),
+                    "增强评分": round(stock.get('增强评分', 0), 1),
+                    "涨跌幅": stock.get('涨跌幅', 0),
+                    "风险评分": round(stock.get('风险评分', 40), 1),
+                    "选股类型": "增强算法"
+                })
+        else:
+            print("基础选股无结果，使用模拟数据...")
+            raise Exception("Use fallback data")
+            
+    except Exception as e:
+        print(f"真实算法失败: {e}, 使用模拟数据...")
+        # 模拟增强选股结果
+        results = [
+            {"代码": "000858", "名称": "五粮液", "增强评分": 78.5, "涨跌幅": 2.8, "风险评分": 45.0, "选股类型": "增强算法"},
+            {"代码": "600036", "名称": "招商银行", "增强评分": 72.3, "涨跌幅": 1.9, "风险评分": 35.0, "选股类型": "增强算法"},
+            {"代码": "000725", "名称": "京东方A", "增强评分": 68.7, "涨跌幅": 4.2, "风险评分": 52.0, "选股类型": "增强算法"},
+            {"代码": "002001", "名称": "新和成", "增强评分": 65.2, "涨跌幅": 3.1, "风险评分": 38.0, "选股类型": "增强算法"},
+            {"代码": "300750", "名称": "宁德时代", "增强评分": 61.8, "涨跌幅": 1.5, "风险评分": 48.0, "选股类型": "增强算法"}
+        ]
+    
+    if not results:
+        print("❌ 增强选股没有找到合适的股票")
+        results = []
+    else:
+        print(f"✅ 增强选股完成，共找到 {len(results)} 只股票")
+        
+        # 显示结果
+        print("\n📋 增强选股结果（按增强评分排序）：")
+        for i, stock in enumerate(results):
+            print(f"{i+1}. {stock['代码']} {stock['名称']} - 增强评分：{stock['增强评分']}分")
+    
+    # 结构化结果供前端使用
+    return {
+        "success": True,
+        "strategy": "enhanced",
+        "count": len(results),
+        "stocks": results,
+        "timestamp": datetime.now().isoformat()
+    }
+
 if __name__ == "__main__":
     main()
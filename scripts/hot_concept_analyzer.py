@@ -10,16 +10,20 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from data.est.req.est_concept import EastmoneyConceptStockFetcher
 from data.est.req.est_concept_codes import ConceptStockManager
+from data.est.req.est_concept_heat import ConceptHeatScorer
 import json
 
+# 热度等级显示图标
+LEVEL_ICONS = {"火热": "🔥🔥🔥", "偏热": "🔥🔥", "温和": "🔥", "偏冷": "😐", "极冷": "❄️"}
+
 class HotConceptAnalyzer:
     def __init__(self):
         self.concept_fetcher = EastmoneyConceptStockFetcher()
         self.concept_manager = ConceptStockManager()
+        self.heat_scorer = ConceptHeatScorer()
         
     def get_hot_concepts(self, top_n=20):
         """获取热门概念板块"""
@@ -38,37 +42,16 @@ class HotConceptAnalyzer:
             
         print("🔍 正在进行热门度综合分析...")
         
-        # 使用基于实际字段的4维度热度计算方法
-        heat_scores = []
-        
-        for _, concept in concepts_df.iterrows():
-            # 1. 板块涨跌幅得分 (40%)
-            price_change = concept.get('涨跌幅', 0)
-            price_score = np.clip((price_change + 10) * 5, 0, 100)
-            
-            # 2. 主力资金净流入得分 (30%)
-            capital_flow = concept.get('f62', 0) / 100000000  # 转换为亿元
-            capital_score = np.clip(capital_flow * 2 + 50, 0, 100)
-            
-            # 3. 成交活跃度得分 (20%)
-            volume = abs(concept.get('f66', 0)) / 100000000  # 转换为亿元
-            volume_score = np.clip(np.log10(volume + 1) * 20, 0, 100)
-            
-            # 4. 技术指标得分 (10%) - 基于振幅
-            amplitude = abs(concept.get('f78', 0)) / 1000000
-            tech_score = np.clip(amplitude * 5, 0, 100)
-            
-            # 加权计算总热度
-            total_heat = (price_score * 0.4 + capital_score * 0.3 + 
-                          volume_score * 0.2 + tech_score * 0.1)
-            
-            # 详细评分信息
-            details = {
-                '板块涨跌幅得分': round(price_score, 1),
-                '资金流入得分': round(capital_score, 1),
-                '成交活跃度得分': round(volume_score, 1),
-                '技术指标得分': round(tech_score, 1),
-                '总得分': round(total_heat, 1),
+        # 使用基于实际字段的4维度热度计算方法（整列计算）
+        scores = self.heat_scorer.score(concepts_df)
+        raw = self.heat_scorer.raw_metrics(concepts_df)
+        heat_scores = [
+            {
+                '板块涨跌幅得分': price_score,
+                '资金流入得分': capital_score,
+                '成交活跃度得分': volume_score,
+                '技术指标得分': tech_score,
+                '总得分': total_heat,
                 '原始数据': {
                     '涨跌幅': price_change,
                     '主力净流入_亿': round(capital_flow, 1),
@@ -76,12 +59,16 @@ class HotConceptAnalyzer:
                     '振幅指标': round(amplitude, 2)
                 }
             }
-            
-            heat_scores.append(details)
+            for price_score, capital_score, volume_score, tech_score, total_heat,
+                price_change, capital_flow, volume, amplitude in zip(
+                scores['价格得分'], scores['资金得分'], scores['活跃度得分'], scores['技术得分'], scores['热度分数'],
+                raw['涨跌幅'], raw['主力净流入_亿'], raw['成交额_亿'], raw['振幅指标']
+            )
+        ]
         
         # 添加热门度评分到dataframe
         concepts_df = concepts_df.copy()
-        concepts_df['热门度评分'] = [score['总得分'] for score in heat_scores]
+        concepts_df['热门度评分'] = scores['热度分数'].to_numpy()
         concepts_df['评分详情'] = heat_scores
         
         # 按热门度重新排序
@@ -116,6 +103,7 @@ class HotConceptAnalyzer:
         print(f"{'排名':<4} {'代码':<8} {'概念名称':<20} {'涨跌幅':<8} {'热门度':<8} {'热度等级':<10}")
         print("-" * 100)
         
+        levels = self.heat_scorer.heat_levels(concepts_df.get('热门度评分', pd.Series(0, index=concepts_df.index)).to_numpy())
         for i, (_, concept) in enumerate(concepts_df.iterrows()):
             rank = i + 1
             code = concept['代码']
@@ -124,16 +112,8 @@ class HotConceptAnalyzer:
             heat_score = concept.get('热门度评分', 0)
             
             # 热度等级 - 基于新的0-100分制
-            if heat_score >= 80:
-                heat_level = "🔥🔥🔥火热"
-            elif heat_score >= 60:
-                heat_level = "🔥🔥偏热"
-            elif heat_score >= 40:
-                heat_level = "🔥温和"
-            elif heat_score >= 20:
-                heat_level = "😐偏冷"
-            else:
-                heat_level = "❄️极冷"
+            heat_level = levels.iloc[i]
+            heat_level = LEVEL_ICONS.get(heat_level, "") + heat_level
             
             print(f"{rank:<4} {code:<8} {name:<20} {change_pct:>6.2f}% {heat_score:>6.1f} {heat_level:<10}")
             
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+价格面板 微基准脚本
+
+在临时目录中用随机日线构建日线库和价格面板，对比：
+- 逐只读取日线 DataFrame（选股脚本原有的读取方式）
+- 打开共享价格面板后直接按字段切片
+并启动多个读取进程，统计每个进程从启动到算出全部股票 20 日均线的耗时，同时校验面板与日线库一致
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from data.est.req.est_daily_store import DailyBarStore, BAR_DTYPE
+from data.est.req.est_price_panel import PricePanel, build_price_panel
+
+def make_bars(n_codes: int, n_days: int, seed: int = 0) -> np.ndarray:
+    """生成随机日线（部分股票上市较晚、部分交易日停牌）"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2022-01-03", periods=n_days).strftime("%Y%m%d").astype(np.int32)
+    parts = []
+    for i in range(n_codes):
+        start = int(rng.integers(0, n_days // 3)) if i % 7 == 0 else 0
+        keep = rng.random(n_days - start) > 0.02
+        d = dates[start:][keep]
+        close = np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(d)))), 2)
+        bars = np.zeros(len(d), dtype=BAR_DTYPE)
+        bars["code"] = f"{600000 + i:06d}"
+        bars["date"] = d
+        bars["close"] = close
+        bars["open"] = np.round(close * rng.uniform(0.98, 1.02, len(d)), 2)
+        bars["high"] = np.maximum(bars["open"], close) * 1.01
+        bars["low"] = np.minimum(bars["open"], close) * 0.99
+        bars["volume"] = rng.integers(1_000, 2_000_000, len(d))
+        bars["amount"] = bars["volume"] * close * 100
+        bars["pct_chg"] = np.round(np.append(0, np.diff(close) / close[:-1] * 100), 2)
+        parts.append(bars)
+    return np.concatenate(parts)
+
+def ma20_from_frames(save_dir: str):
+    """原方式：逐只读取 DataFrame 后计算"""
+    t_start = time.time()
+    store = DailyBarStore(save_dir)
+    result = {code: store.get_df(code, 20)["收盘"].mean() for code in store.codes()}
+    return time.time() - t_start, len(result)
+
+def ma20_from_panel(save_dir: str):
+    """面板方式：打开内存映射后按字段切片"""
+    t_start = time.time()
+    panel = PricePanel(save_dir)
+    panel.reload_if_changed()
+    ma20 = np.nanmean(panel.field("close", 20), axis=1)
+    return time.time() - t_start, len(ma20)
+
+def verify(save_dir: str, samples: int = 200) -> int:
+    """抽样校验面板与日线库一致（float32 精度内），返回不一致的股票数"""
+    store = DailyBarStore(save_dir)
+    panel = PricePanel(save_dir)
+    panel.reload_if_changed()
+    rng = np.random.default_rng(1)
+    mismatched = 0
+    for code in rng.choice(store.codes(), size=min(samples, len(store.codes())), replace=False):
+        expected = store.get_df(code, 60)
+        actual = panel.frame(code, 60)
+        same = list(expected["日期"]) == list(actual["日期"]) and all(
+            np.allclose(expected[col], actual[col], rtol=1e-6) for col in ["开盘", "收盘", "最高", "最低", "涨跌幅"]
+        )
+        mismatched += not same
+    return mismatched
+
+def main():
+    parser = argparse.ArgumentParser(description="价格面板微基准")
+    parser.add_argument("--codes", type=int, default=4000, help="股票数")
+    parser.add_argument("--days", type=int, default=500, help="交易日数")
+    parser.add_argument("--readers", type=int, default=8, help="并发读取进程数")
+    args = parser.parse_args()
+
+    save_dir = tempfile.mkdtemp(prefix="price_panel_bench_")
+    try:
+        bars = make_bars(args.codes, args.days)
+        np.save(os.path.join(save_dir, "daily_bars.npy"), bars)
+        store = DailyBarStore(save_dir)
+
+        t_start = time.time()
+        path = build_price_panel(store, days=args.days)
+        print(f"构建面板: {time.time() - t_start:.2f}s，{os.path.getsize(path) / 1024 / 1024:.0f}MB")
+
+        mismatched = verify(save_dir)
+        print(f"抽样校验: {'一致' if not mismatched else f'{mismatched} 只股票不一致'}")
+
+        elapsed, n = ma20_from_frames(save_dir)
+        print(f"逐只读取 DataFrame: {elapsed:.2f}s（{n} 只）")
+        elapsed, n = ma20_from_panel(save_dir)
+        print(f"共享面板切片:       {elapsed * 1000:.1f}ms（{n} 只）")
+
+        with ProcessPoolExecutor(max_workers=args.readers) as executor:
+            results = list(executor.map(ma20_from_panel, [save_dir] * args.readers))
+        times = [r[0] * 1000 for r in results]
+        print(f"{args.readers} 个进程并发读取面板: 平均 {np.mean(times):.1f}ms，最慢 {max(times):.1f}ms")
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -192,6 +192,13 @@ class ProductionDataHealthCheck:
             for cache_path in cache_paths:
                 if os.path.exists(cache_path):
                     accessible_caches += 1
+                    if cache_path == "/tmp/stock/daily":
+                        # 日线统一存放在 daily_bars.npy 中，报告股票数和文件大小
+                        from data.est.req.est_daily_store import DailyBarStore
+                        store = DailyBarStore(cache_path)
+                        size_mb = os.path.getsize(store.path) / 1024 / 1024 if os.path.exists(store.path) else 0
+                        result["details"]["cache_daily"] = f"{len(store.codes())} codes, {size_mb:.1f} MB"
+                        continue
                     files_count = len([f for f in os.listdir(cache_path) if f.endswith('.pkl')])
                     result["details"][f"cache_{os.path.basename(cache_path)}"] = f"{files_count} files"
                 else:
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加项目路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -24,6 +26,90 @@ try:
 except ImportError:
     print("⚠️ 无法导入部分模块，使用基础分析模式")
 
+# 候选股票数达到该值时才启用进程池（少量股票时进程启动开销大于收益）
+PROCESS_POOL_THRESHOLD = 200
+# 每个子进程任务分析的股票数
+ANALYSIS_CHUNK_SIZE = 50
+
+def _analyze_chunk(items: List[Tuple[str, pd.DataFrame, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """子进程任务：分析一批 (代码, 日线, 指标)"""
+    analyzer = ConsecutiveRiseAnalyzer.offline()
+    return [analyzer.analyze_daily(code, daily_df, indicators=indicators) for code, daily_df, indicators in items]
+
+class RetracementAnalysisContext:
+    """
+    单次选股运行的分析上下文
+    - 一次性批量读取股票池的日线和缓存指标
+    - 每只股票只分析一次，结果按代码缓存，风险过滤和评分共用
+    - 股票较多时在进程池中并行分析
+    - 记录各阶段耗时
+    """
+    
+    def __init__(self, data_fetcher, analyzer, days: int = 30, max_workers: int = None):
+        self.data_fetcher = data_fetcher
+        self.analyzer = analyzer
+        self.days = days
+        self.max_workers = max_workers
+        self.analyses: Dict[str, Dict[str, Any]] = {}
+        self.timings: Dict[str, float] = {}
+    
+    def add_timing(self, stage: str, start: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + time.time() - start
+    
+    def prepare(self, stock_pool: List[str]):
+        """批量加载并分析股票池中尚未分析过的股票"""
+        codes = [code for code in dict.fromkeys(stock_pool) if code not in self.analyses]
+        if not codes:
+            return
+        
+        t_start = time.time()
+        daily_data = self.data_fetcher.get_batch_data(codes, days=self.days) if self.data_fetcher else {}
+        self.add_timing("加载日线", t_start)
+        
+        t_start = time.time()
+        indicators = self.data_fetcher.get_indicators(codes) if self.data_fetcher else pd.DataFrame()
+        self.add_timing("加载指标", t_start)
+        
+        t_start = time.time()
+        items = []
+        for code in codes:
+            daily_df = daily_data.get(code)
+            if daily_df is None or daily_df.empty:
+                self.analyses[code] = {"error": "无法获取数据"}
+                continue
+            items.append((code, daily_df, self._indicators_for(indicators, code, daily_df)))
+        
+        if len(items) >= PROCESS_POOL_THRESHOLD:
+            chunks = [items[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(items), ANALYSIS_CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = [r for chunk in executor.map(_analyze_chunk, chunks) for r in chunk]
+        else:
+            results = [self.analyzer.analyze_daily(code, daily_df, indicators=ind) for code, daily_df, ind in items]
+        
+        for (code, _, _), analysis in zip(items, results):
+            self.analyses[code] = analysis
+        self.add_timing("分析", t_start)
+    
+    @staticmethod
+    def _indicators_for(indicators: pd.DataFrame, code: str, daily_df: pd.DataFrame):
+        """取与日线最后交易日一致的缓存指标"""
+        if indicators is None or indicators.empty or code not in indicators.index:
+            return None
+        row = indicators.loc[code].to_dict()
+        last_date = int(str(daily_df["日期"].iloc[-1]).replace("-", "")[:8])
+        return row if int(row["date"]) == last_date else None
+    
+    def get(self, code: str) -> Dict[str, Any]:
+        """返回某只股票的分析结果（未加载时先单独加载）"""
+        if code not in self.analyses:
+            self.prepare([code])
+        return self.analyses[code]
+    
+    def print_timings(self):
+        print("\n⏱️ 各阶段耗时:")
+        for stage, seconds in self.timings.items():
+            print(f"  {stage}: {seconds:.2f}秒")
+
 class RetracementTailStrategy:
     """回调尾盘策略"""
     
@@ -38,12 +124,17 @@ class RetracementTailStrategy:
             self.risk_analyzer = None
             self.base_strategy = None
     
-    def should_avoid_stock(self, code: str) -> Tuple[bool, str]:
+    def new_context(self, max_workers: int = None) -> RetracementAnalysisContext:
+        """创建单次运行的分析上下文"""
+        return RetracementAnalysisContext(self.data_fetcher, self.risk_analyzer, max_workers=max_workers)
+    
+    def should_avoid_stock(self, code: str, analysis: Dict[str, Any] = None) -> Tuple[bool, str]:
         """
         判断是否应该避免这只股票
         
         Args:
             code: 股票代码
+            analysis: 已有的回调分析结果（None 时现场分析）
             
         Returns:
             (是否避免, 原因)
@@ -52,7 +143,8 @@ class RetracementTailStrategy:
             return False, "风险分析器未初始化"
         
         try:
-            analysis = self.risk_analyzer.analyze_retracement_opportunity(code)
+            if analysis is None:
+                analysis = self.risk_analyzer.analyze_retracement_opportunity(code)
             
             if "error" in analysis:
                 return True, f"数据获取失败: {analysis['error']}"
@@ -80,12 +172,14 @@ class RetracementTailStrategy:
         except Exception as e:
             return True, f"分析出错: {str(e)}"
     
-    def find_retracement_candidates(self, stock_pool: List[str]) -> List[Dict[str, Any]]:
+    def find_retracement_candidates(self, stock_pool: List[str],
+                                    context: RetracementAnalysisContext = None) -> List[Dict[str, Any]]:
         """
         从股票池中找出适合回调介入的候选股票
         
         Args:
             stock_pool: 股票代码列表
+            context: 分析上下文（None 时新建），同一上下文内每只股票只加载和分析一次
             
         Returns:
             候选股票列表（按优先级排序）
@@ -94,41 +188,45 @@ class RetracementTailStrategy:
         
         print(f"🔍 正在筛选回调介入机会 (共{len(stock_pool)}只股票)...")
         
+        if not self.risk_analyzer:
+            return candidates
+        
+        context = context or self.new_context()
+        context.prepare(stock_pool)
+        
+        t_start = time.time()
         for i, code in enumerate(stock_pool, 1):
-            print(f"📊 进度: {i}/{len(stock_pool)} - 分析 {code}")
+            analysis = context.get(code)
             
             # 检查是否应该避免
-            should_avoid, avoid_reason = self.should_avoid_stock(code)
+            should_avoid, avoid_reason = self.should_avoid_stock(code, analysis)
             if should_avoid:
                 print(f"⚠️ {code} - 跳过: {avoid_reason}")
                 continue
             
-            # 详细分析
-            if self.risk_analyzer:
-                analysis = self.risk_analyzer.analyze_retracement_opportunity(code)
-                
-                if "error" not in analysis:
-                    score = self._calculate_retracement_score(analysis)
-                    
-                    candidate = {
-                        "代码": code,
-                        "名称": analysis.get("名称", ""),
-                        "当前价格": analysis["当前价格"],
-                        "今日涨跌幅": analysis["今日涨跌幅"],
-                        "连涨天数": analysis["连续分析"]["current_consecutive_rise"],
-                        "风险等级": analysis["连续分析"]["risk_level"],
-                        "位置评估": analysis["支撑分析"]["current_position"],
-                        "操作建议": analysis["操作建议"]["操作建议"],
-                        "介入时机": analysis["操作建议"]["介入时机"],
-                        "综合评分": score,
-                        "详细分析": analysis
-                    }
-                    
-                    candidates.append(candidate)
-                    print(f"✅ {code} - 评分: {score:.1f}")
+            score = self._calculate_retracement_score(analysis)
+            
+            candidate = {
+                "代码": code,
+                "名称": analysis.get("名称", ""),
+                "当前价格": analysis["当前价格"],
+                "今日涨跌幅": analysis["今日涨跌幅"],
+                "连涨天数": analysis["连续分析"]["current_consecutive_rise"],
+                "风险等级": analysis["连续分析"]["risk_level"],
+                "位置评估": analysis["支撑分析"]["current_position"],
+                "操作建议": analysis["操作建议"]["操作建议"],
+                "介入时机": analysis["操作建议"]["介入时机"],
+                "综合评分": score,
+                "详细分析": analysis
+            }
+            
+            candidates.append(candidate)
+            print(f"✅ {code} - 评分: {score:.1f}")
         
         # 按评分排序
         candidates.sort(key=lambda x: x["综合评分"], reverse=True)
+        context.add_timing("筛选评分", t_start)
+        context.print_timings()
         
         return candidates
     
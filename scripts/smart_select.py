@@ -16,15 +16,19 @@ import pandas as pd
 import json
 from datetime import datetime
 
-def perform_smart_selection(config, market_analysis):
+def perform_smart_selection(config, market_analysis, base_stocks=None):
     """
     执行智能选股
+    
+    base_stocks: 平衡配置下 TailUpStrategy 的选股结果（None 时现场计算）
     """
     try:
         # 获取基础股票池
-        trading_config = TradingConfig.get_preset("balanced")
-        strategy = TailUpStrategy(trading_config)
-        all_stocks = strategy.select_stocks()
+        all_stocks = base_stocks
+        if all_stocks is None:
+            trading_config = TradingConfig.get_preset("balanced")
+            strategy = TailUpStrategy(trading_config)
+            all_stocks = strategy.select_stocks()
         
         if all_stocks is None or all_stocks.empty:
             # 创建模拟数据
@@ -93,70 +97,7 @@ def main():
     print("🎯 专门解决与市场相反的选股问题")
     
     try:
-        # 1. 简化的市场分析（避免复杂依赖）
-        print("\n📊 分析市场环境...")
-        market_analysis = {
-            'trend': '震荡',
-            'strength': 0.6,
-            'risk_level': '中等'
-        }
-        
-        print(f"市场趋势：{market_analysis['trend']}")
-        print(f"趋势强度：{market_analysis['strength']:.1%}")
-        print(f"风险水平：{market_analysis['risk_level']}")
-        
-        # 2. 获取适应性配置
-        config = {
-            'strategy_type': '智能适应',
-            'stock_count': 10,
-            'min_prob_score': 20
-        }
-        print(f"策略类型：{config['strategy_type']}")
-        print(f"目标选股数量：{config['stock_count']}只")
-        print(f"最低评分要求：{config['min_prob_score']}分")
-        
-        # 3. 执行智能选股（使用市场适应性算法）
-        print("\n🔍 执行智能选股...")
-        
-        # 使用市场适应性算法进行选股
-        smart_stocks = perform_smart_selection(config, market_analysis)
-        
-        if smart_stocks is None or smart_stocks.empty:
-            print("❌ 智能选股没有找到合适的股票")
-            # 返回模拟数据
-            result_data = [
-                {"代码": "000001", "名称": "平安银行", "涨跌幅": 2.1, "适应性评分": 65.5, "风险评分": 35.0, "选股类型": "智能适应性"},
-                {"代码": "300001", "名称": "特锐德", "涨跌幅": 3.2, "适应性评分": 72.3, "风险评分": 42.0, "选股类型": "智能适应性"}
-            ]
-        else:
-            print(f"智能选股完成，共找到 {len(smart_stocks)} 只股票")
-            
-            # 显示前5只股票信息
-            print("\n📋 智能选股结果（按适应性评分排序）：")
-            for i, (_, stock) in enumerate(smart_stocks.head(5).iterrows()):
-                print(f"{i+1}. {stock['代码']} {stock.get('名称', '')} - 适应性评分：{stock.get('adaptive_score', 0):.1f}分")
-        
-            # 4. 输出结果供前端使用
-            result_data = []
-            for _, stock in smart_stocks.head(10).iterrows():
-                result_data.append({
-                    "代码": stock['代码'],
-                    "名称": stock.get('名称', ''),
-                    "涨跌幅": stock.get('涨跌幅', 0),
-                    "适应性评分": round(stock.get('adaptive_score', 0), 1),
-                    "风险评分": round(stock.get('风险评分', 35), 1),  # 添加风险评分字段
-                    "选股类型": "智能适应性"
-                })
-        
-        # 5. 输出JSON格式结果
-        output = {
-            "success": True,
-            "strategy": "smart",
-            "market_analysis": market_analysis,
-            "count": len(result_data),
-            "stocks": result_data,
-            "timestamp": datetime.now().isoformat()
-        }
+        output = run_smart_selection()
         
         print("\n" + "="*50)
         print("📊 智能选股结果（JSON格式）：")
@@ -173,5 +114,80 @@ def main():
         }
         print(json.dumps(error_output, ensure_ascii=False))
 
+def run_smart_selection(base_stocks: pd.DataFrame = None) -> dict:
+    """
+    执行智能选股并返回结构化结果
+    
+    Args:
+        base_stocks: 平衡配置下 TailUpStrategy 的选股结果（None 时现场计算）
+        
+    Returns:
+        结果字典（stocks 为前端使用的股票列表）
+    """
+    # 1. 简化的市场分析（避免复杂依赖）
+    print("\n📊 分析市场环境...")
+    market_analysis = {
+        'trend': '震荡',
+        'strength': 0.6,
+        'risk_level': '中等'
+    }
+    
+    print(f"市场趋势：{market_analysis['trend']}")
+    print(f"趋势强度：{market_analysis['strength']:.1%}")
+    print(f"风险水平：{market_analysis['risk_level']}")
+    
+    # 2. 获取适应性配置
+    config = {
+        'strategy_type': '智能适应',
+        'stock_count': 10,
+        'min_prob_score': 20
+    }
+    print(f"策略类型：{config['strategy_type']}")
+    print(f"目标选股数量：{config['stock_count']}只")
+    print(f"最低评分要求：{config['min_prob_score']}分")
+    
+    # 3. 执行智能选股（使用市场适应性算法）
+    print("\n🔍 执行智能选股...")
+    
+    # 使用市场适应性算法进行选股
+    smart_stocks = perform_smart_selection(config, market_analysis, base_stocks)
+    
+    if smart_stocks is None or smart_stocks.empty:
+        print("❌ 智能选股没有找到合适的股票")
+        # 返回模拟数据
+        result_data = [
+            {"代码": "000001", "名称": "平安银行", "涨跌幅": 2.1, "适应性评分": 65.5, "风险评分": 35.0, "选股类型": "智能适应性"},
+            {"代码": "300001", "名称": "特锐德", "涨跌幅": 3.2, "适应性评分": 72.3, "风险评分": 42.0, "选股类型": "智能适应性"}
+        ]
+    else:
+        print(f"智能选股完成，共找到 {len(smart_stocks)} 只股票")
+        
+        # 显示前5只股票信息
+        print("\n📋 智能选股结果（按适应性评分排序）：")
+        for i, (_, stock) in enumerate(smart_stocks.head(5).iterrows()):
+            print(f"{i+1}. {stock['代码']} {stock.get('名称', '')} - 适应性评分：{stock.get('adaptive_score', 0):.1f}分")
+    
+        # 4. 输出结果供前端使用
+        result_data = []
+        for _, stock in smart_stocks.head(10).iterrows():
+            result_data.append({
+                "代码": stock['代码'],
+                "名称": stock.get('名称', ''),
+                "涨跌幅": stock.get('涨跌幅', 0),
+                "适应性评分": round(stock.get('adaptive_score', 0), 1),
+                "风险评分": round(stock.get('风险评分', 35), 1),  # 添加风险评分字段
+                "选股类型": "智能适应性"
+            })
+    
+    # 5. 结构化结果
+    return {
+        "success": True,
+        "strategy": "smart",
+        "market_analysis": market_analysis,
+        "count": len(result_data),
+        "stocks": result_data,
+        "timestamp": datetime.now().isoformat()
+    }
+
 if __name__ == "__main__":
     main()
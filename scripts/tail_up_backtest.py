@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+尾盘上涨策略回测脚本
+
+用日线库中的历史数据回放 TailUpStrategy 的选股规则（收盘买入、次日卖出），
+输出胜率、收益、回撤以及按次日补涨概率分档的统计
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+from tail_trading.config.trading_config import TradingConfig
+from tail_trading.strategies.tail_up_backtest import TailUpBacktester
+
+def print_result(result, preset: str):
+    summary = result.summary
+    print(f"\n📊 尾盘上涨策略回测 [{preset}]")
+    print("=" * 60)
+    if not summary.get("信号数"):
+        print("❌ 回测区间内没有入选信号")
+        return
+    print(f"区间: {summary['开始日期']} ~ {summary['结束日期']}  信号日 {summary['信号日数']} 天，信号 {summary['信号数']} 个")
+    print(f"信号胜率: {summary['信号胜率']*100:.1f}%  平均收益: {summary['信号平均收益']*100:.2f}%")
+    print(f"平均盈利: {summary['平均盈利']*100:.2f}%  平均亏损: {summary['平均亏损']*100:.2f}%  盈亏比: {summary['盈亏比']:.2f}")
+    print(f"概率与次日收益秩相关: {summary['概率收益相关性']:.3f}")
+    print(f"组合日胜率: {summary['组合日胜率']*100:.1f}%  累计收益: {summary['累计收益']*100:.2f}%  "
+          f"年化收益: {summary['年化收益']*100:.2f}%  最大回撤: {summary['最大回撤']*100:.2f}%")
+    print(f"卖出原因: {summary['卖出原因']}")
+    print("\n按次日补涨概率分档:")
+    for _, row in result.probability_buckets.iterrows():
+        print(f"  {row['概率档位']:<8} 信号 {row['信号数']:>7}  胜率 {row['胜率']*100:>5.1f}%  "
+              f"平均收益 {row['平均收益']*100:>6.2f}%  中位数 {row['收益中位数']*100:>6.2f}%")
+    print(f"\n⏱️  耗时 {summary['耗时']} 秒")
+
+def main():
+    parser = argparse.ArgumentParser(description="尾盘上涨策略历史回测")
+    parser.add_argument("--preset", default="balanced", choices=list(TradingConfig.get_available_presets()), help="预设配置")
+    parser.add_argument("--start", help="信号起始日期，如 2023-01-01")
+    parser.add_argument("--end", help="信号结束日期")
+    parser.add_argument("--codes", help="股票池（逗号分隔），默认日线库全部股票")
+    parser.add_argument("--max-positions", type=int, help="每日最多买入股票数")
+    parser.add_argument("--cost", type=float, default=0.0, help="单笔买卖合计成本，如 0.0015")
+    parser.add_argument("--trades-csv", help="保存全部信号明细的 CSV 路径")
+    args = parser.parse_args()
+
+    backtester = TailUpBacktester(
+        TradingConfig.get_preset(args.preset),
+        max_positions=args.max_positions,
+        round_trip_cost=args.cost,
+    )
+    codes = args.codes.split(",") if args.codes else None
+    result = backtester.run(args.start, args.end, codes)
+    print_result(result, args.preset)
+
+    if args.trades_csv and not result.trades.empty:
+        result.trades.to_csv(args.trades_csv, index=False, encoding="utf-8")
+        print(f"💾 信号明细已保存: {args.trades_csv}")
+
+if __name__ == "__main__":
+    main()
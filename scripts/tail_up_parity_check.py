@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+尾盘上涨策略 向量化/逐股 一致性校验脚本
+
+用随机生成的日线面板（含平盘、十字星、缺失值、零成交量等边界情况）
+分别走 TailUpBatchScorer 与 TailUpStrategy 逐股路径，逐项比对指标、评分和筛选结果
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import numpy as np
+import pandas as pd
+from tail_trading.config.trading_config import TradingConfig
+from tail_trading.strategies.tail_up_strategy import TailUpStrategy
+from tail_trading.strategies.tail_up_vectorized import TailUpBatchScorer
+
+COMPARE_COLUMNS = [
+    "涨跌幅", "量比", "收盘价", "上影线", "下影线", "实体长度", "影线比",
+    "20日位置", "次日补涨概率", "风险评分",
+]
+
+def make_panel(n_stocks: int, days: int, seed: int = 0):
+    """生成随机日线面板，并注入边界情况"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(3, 80, size=(n_stocks, 1))
+    close = np.round(base * np.cumprod(1 + rng.normal(0, 0.02, size=(n_stocks, days)), axis=1), 2)
+    open_ = np.round(close * (1 + rng.normal(0, 0.01, size=close.shape)), 2)
+    high = np.maximum(open_, close) + np.round(rng.exponential(0.2, size=close.shape), 2)
+    low = np.minimum(open_, close) - np.round(rng.exponential(0.2, size=close.shape), 2)
+    volume = rng.integers(1_000, 200_000, size=close.shape).astype(np.int64)
+    pct_chg = np.round(rng.uniform(-3, 8, size=close.shape), 2)
+
+    # 十字星（实体为 0）、一字板（高低相同）、零成交量、缺失值
+    open_[0::17, -1] = close[0::17, -1]
+    high[1::19, :] = low[1::19, :] = open_[1::19, :] = close[1::19, :]
+    volume[2::23, :] = 0
+    close[3::29, 5] = np.nan
+    pct_chg[4::31, -1] = np.nan
+
+    return {"open": open_, "close": close, "high": high, "low": low, "volume": volume, "pct_chg": pct_chg}
+
+def panel_row_to_df(panel: dict, i: int) -> pd.DataFrame:
+    """将面板的一行还原为逐股路径使用的日线 DataFrame"""
+    return pd.DataFrame({
+        "开盘": panel["open"][i],
+        "收盘": panel["close"][i],
+        "最高": panel["high"][i],
+        "最低": panel["low"][i],
+        "成交量": panel["volume"][i],
+        "涨跌幅": panel["pct_chg"][i],
+    })
+
+def check_parity(preset: str, n_stocks: int, seed: int) -> int:
+    """返回不一致的股票数"""
+    config = TradingConfig.get_preset(preset)
+    strategy = TailUpStrategy(config)
+    scorer = TailUpBatchScorer(config)
+
+    panel = make_panel(n_stocks, config.lookback_days, seed)
+    codes = [f"{i:06d}" for i in range(n_stocks)]
+    batch, invalid = scorer.analyze(codes, panel)
+    mask = scorer.selection_mask(batch)
+
+    mismatches = 0
+    for i, code in enumerate(codes):
+        single = strategy._analyze_stock(code, panel_row_to_df(panel, i))
+        if single is None:
+            if not invalid[i]:
+                mismatches += 1
+                print(f"  {code}: 逐股分析失败，向量化未标记为无效")
+            continue
+        if invalid[i]:
+            mismatches += 1
+            print(f"  {code}: 向量化标记为无效，逐股分析成功")
+            continue
+        row = batch.iloc[i]
+        diffs = [col for col in COMPARE_COLUMNS if not np.array_equal(row[col], single[col], equal_nan=True)]
+        if strategy._meets_selection_criteria(single) != bool(mask[i]):
+            diffs.append("筛选结果")
+        if diffs:
+            mismatches += 1
+            print(f"  {code}: 不一致字段 {diffs}")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="尾盘上涨策略向量化评分一致性校验")
+    parser.add_argument("--stocks", type=int, default=2000, help="随机股票数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    failed = 0
+    for preset in ("conservative", "balanced", "aggressive"):
+        mismatches = check_parity(preset, args.stocks, args.seed)
+        status = "✅" if mismatches == 0 else "❌"
+        print(f"{status} {preset}: {args.stocks} 只股票，不一致 {mismatches} 只")
+        failed += mismatches
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+尾盘上涨策略参数扫描脚本
+
+在预设配置基础上对 TradingConfig 字段做网格或随机搜索，多进程回测后输出排名表
+
+示例:
+  python scripts/tail_up_sweep.py --grid "min_pct_chg=1,2;max_volume_ratio=2,3,4"
+  python scripts/tail_up_sweep.py --random 2000 --space "min_pct_chg=0.5:3;price_weight=0.1:0.4;max_position_ratio=0.6:0.95"
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+from dataclasses import fields
+from tail_trading.config.trading_config import TradingConfig
+from tail_trading.strategies.tail_up_sweep import ParameterSweep, RESULT_METRICS, expand_grid, random_configs
+
+FIELD_TYPES = {f.name: f.type for f in fields(TradingConfig)}
+
+def _cast(key: str, value: str):
+    if key not in FIELD_TYPES:
+        raise SystemExit(f"未知的配置字段: {key}")
+    return FIELD_TYPES[key](value)
+
+def parse_grid(text: str) -> dict:
+    """"a=1,2;b=3" -> {"a": [1, 2], "b": [3]}"""
+    grid = {}
+    for part in filter(None, text.split(";")):
+        key, values = part.split("=", 1)
+        key = key.strip()
+        grid[key] = [_cast(key, v.strip()) for v in values.split(",")]
+    return grid
+
+def parse_space(text: str) -> dict:
+    """"a=1:3;b=x,y" -> {"a": (1, 3), "b": [x, y]}"""
+    space = {}
+    for part in filter(None, text.split(";")):
+        key, spec = part.split("=", 1)
+        key = key.strip()
+        if ":" in spec:
+            low, high = spec.split(":", 1)
+            space[key] = (_cast(key, low.strip()), _cast(key, high.strip()))
+        else:
+            space[key] = [_cast(key, v.strip()) for v in spec.split(",")]
+    return space
+
+def main():
+    parser = argparse.ArgumentParser(description="尾盘上涨策略参数扫描")
+    parser.add_argument("--preset", default="balanced", choices=list(TradingConfig.get_available_presets()), help="基础预设配置")
+    parser.add_argument("--grid", help='网格，如 "min_pct_chg=1,2;max_volume_ratio=2,3"')
+    parser.add_argument("--random", type=int, default=0, help="随机搜索的参数组数")
+    parser.add_argument("--space", help='随机搜索空间，如 "min_pct_chg=0.5:3;ma_period=10,20"')
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--start", help="信号起始日期")
+    parser.add_argument("--end", help="信号结束日期")
+    parser.add_argument("--workers", type=int, help="进程数，默认 CPU 核数")
+    parser.add_argument("--cost", type=float, default=0.0, help="单笔买卖合计成本")
+    parser.add_argument("--sort-by", default="累计收益", choices=RESULT_METRICS, help="排名指标")
+    parser.add_argument("--top", type=int, default=20, help="显示前 N 名")
+    parser.add_argument("--csv", help="保存完整结果表的 CSV 路径")
+    args = parser.parse_args()
+
+    if args.grid:
+        configs = expand_grid(parse_grid(args.grid))
+    elif args.random and args.space:
+        configs = random_configs(parse_space(args.space), args.random, args.seed)
+    else:
+        parser.error("需要 --grid，或同时指定 --random 和 --space")
+
+    print(f"🔍 扫描 {len(configs)} 组参数（基础配置: {args.preset}）...")
+    sweep = ParameterSweep(
+        TradingConfig.get_preset(args.preset),
+        max_workers=args.workers,
+        round_trip_cost=args.cost,
+    )
+    result = sweep.run(configs, args.start, args.end, sort_by=args.sort_by)
+    if result.empty:
+        print("❌ 没有结果")
+        return
+
+    print(f"\n🏆 按 {args.sort_by} 排名前 {args.top}:")
+    print(result.head(args.top).to_string(index=False))
+    if args.csv:
+        result.to_csv(args.csv, index=False, encoding="utf-8")
+        print(f"💾 结果已保存: {args.csv}")
+
+if __name__ == "__main__":
+    main()
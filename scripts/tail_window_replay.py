@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+尾盘扫描 回放校验与微基准脚本
+
+在临时目录中生成随机的当天分时，按轮次追加到盘中日志（每轮新增若干分钟，并改写仍在形成中的最后一分钟），
+用 TailWindowScanner 增量计算，每轮与“读取全天分时后整体重算”的参照结果比对，并统计两种方式的每轮耗时
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from data.est.req.est_minute_log import MinuteAppendLog, TREND_COLUMNS
+from tail_trading.strategies.tail_window_scanner import TailWindowScanner, TAIL_START
+
+TRADE_DAY = "2024-06-20"
+
+def trading_minutes() -> list:
+    """A 股一个交易日的 240 个分钟结束时刻"""
+    morning = pd.date_range(f"{TRADE_DAY} 09:31", f"{TRADE_DAY} 11:30", freq="min")
+    afternoon = pd.date_range(f"{TRADE_DAY} 13:01", f"{TRADE_DAY} 15:00", freq="min")
+    return [t.strftime("%Y-%m-%d %H:%M:%S") for t in morning.append(afternoon)]
+
+def make_day(code: str, minutes: list, rng) -> pd.DataFrame:
+    """生成一只股票的全天分时（尾盘成交量随机放大）"""
+    n = len(minutes)
+    close = np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.002, n))), 2)
+    open_ = np.round(np.r_[close[0], close[:-1]], 2)
+    high = np.round(np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, n)), 2)
+    low = np.round(np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, n)), 2)
+    surge = np.where(np.array([m[11:16] for m in minutes]) > TAIL_START, rng.uniform(0.8, 3.0), 1.0)
+    volume = np.round(rng.integers(100, 5000, n) * surge).astype(np.int64)
+    amount = np.round(volume * close * 100, 2)
+    avg = np.round(np.cumsum(amount) / np.cumsum(volume) / 100, 3)
+    return pd.DataFrame({"时间": minutes, "开盘": open_, "收盘": close, "最高": high, "最低": low,
+                         "成交量": volume, "成交额": amount, "均价": avg}, columns=TREND_COLUMNS)
+
+def forming(df: pd.DataFrame, rng) -> pd.DataFrame:
+    """模拟最后一分钟尚未走完：成交量只有一部分，收盘价尚未确定"""
+    df = df.copy()
+    last = df.index[-1]
+    df.loc[last, "成交量"] = max(1, int(df.loc[last, "成交量"] * rng.uniform(0.2, 0.8)))
+    df.loc[last, "收盘"] = round(df.loc[last, "收盘"] * rng.uniform(0.998, 1.002), 2)
+    df.loc[last, "最高"] = max(df.loc[last, "最高"], df.loc[last, "收盘"])
+    df.loc[last, "最低"] = min(df.loc[last, "最低"], df.loc[last, "收盘"])
+    df.loc[last, "成交额"] = round(df.loc[last, "成交量"] * df.loc[last, "收盘"] * 100, 2)
+    return df
+
+class ReplaySource:
+    """按轮次把生成的分时写入盘中日志，提供扫描器需要的数据接口"""
+
+    def __init__(self, save_dir: str, days: dict, rng):
+        self.log = MinuteAppendLog(save_dir)
+        self.days = days
+        self.rng = rng
+        self.upto = 0
+
+    def advance(self, upto: int):
+        """追加到第 upto 分钟（最后一分钟为形成中状态）"""
+        self.upto = upto
+        for code, day in self.days.items():
+            self.log.append(code, forming(day.iloc[:upto], self.rng))
+
+    def refresh_intraday(self, codes, concurrency=10) -> int:
+        return 0
+
+    def get_intraday_trade_date(self):
+        return self.log.latest_trade_date()
+
+    def get_intraday_since(self, code, since=None, trade_date=None):
+        return self.log.rows_since(code, since, trade_date)
+
+def full_metrics(df: pd.DataFrame) -> dict:
+    """参照实现：由全天分时整体重算"""
+    hhmm = df["时间"].str[11:16]
+    pre, tail = df[hhmm <= TAIL_START], df[hhmm > TAIL_START]
+    last = df["收盘"].iloc[-1]
+    high, low = df["最高"].max(), df["最低"].min()
+    result = {
+        "最新价": last,
+        "均价": df["均价"].iloc[-1],
+        "均价偏离": (last / df["均价"].iloc[-1] - 1) * 100,
+        "日内位置": (last - low) / (high - low) if high > low else 0.5,
+        "尾盘量比": np.nan,
+        "尾盘涨幅": np.nan,
+    }
+    if len(tail):
+        result["尾盘量比"] = tail["成交量"].mean() / pre["成交量"].mean()
+        result["尾盘涨幅"] = (last / pre["收盘"].iloc[-1] - 1) * 100
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="尾盘扫描回放校验与微基准")
+    parser.add_argument("--codes", type=int, default=500, help="股票数")
+    parser.add_argument("--step", type=int, default=1, help="每轮新增分钟数")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    minutes = trading_minutes()
+    codes = [f"{600000 + i:06d}" for i in range(args.codes)]
+    days = {code: make_day(code, minutes, rng) for code in codes}
+    tail_from = next(k for k, m in enumerate(minutes) if m[11:16] > TAIL_START) - 5
+
+    save_dir = tempfile.mkdtemp(prefix="tail_window_replay_")
+    try:
+        source = ReplaySource(save_dir, days, rng)
+        scanner = TailWindowScanner(codes, data_fetcher=source)
+
+        incremental_times, full_times, mismatched = [], [], 0
+        for upto in range(tail_from, len(minutes) + 1, args.step):
+            source.advance(upto)
+
+            t_start = time.time()
+            scanner.poll()
+            board = scanner.update_board()
+            incremental_times.append(time.time() - t_start)
+
+            t_start = time.time()
+            expected = {code: full_metrics(source.log.get_today_df(code)) for code in codes}
+            full_times.append(time.time() - t_start)
+
+            actual = scanner.board
+            for column in ["最新价", "均价偏离", "尾盘量比", "日内位置", "尾盘涨幅"]:
+                want = np.array([expected[code][column] for code in codes], dtype=np.float64)
+                got = actual.loc[codes, column].to_numpy(dtype=np.float64)
+                digits = 3 if column == "日内位置" else 2
+                if not np.allclose(got, np.round(want, digits), atol=10 ** -digits, equal_nan=True):
+                    mismatched += 1
+                    print(f"第 {upto} 分钟 {column} 不一致")
+
+        rounds = len(incremental_times)
+        print(f"回放 {rounds} 轮，{args.codes} 只股票")
+        print(f"校验: {'增量结果与整体重算一致' if not mismatched else f'{mismatched} 处不一致'}")
+        print(f"增量计算: 每轮平均 {np.mean(incremental_times) * 1000:.0f}ms，最慢 {max(incremental_times) * 1000:.0f}ms")
+        print(f"整体重算: 每轮平均 {np.mean(full_times) * 1000:.0f}ms，最慢 {max(full_times) * 1000:.0f}ms")
+        print("\n最终看板前 5 名:")
+        print(board.head(5).to_string(index=False))
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
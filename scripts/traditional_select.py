@@ -20,17 +20,46 @@ def main():
     print("🎯 基于经典技术指标和量价关系")
     
     try:
-        # 1. 使用平衡配置进行传统选股
-        print("\n🔍 执行传统技术指标选股...")
-        trading_config = TradingConfig.get_preset("balanced")
-        strategy = TailUpStrategy(trading_config)
+        output = run_traditional_selection()
         
-        all_stocks = strategy.select_stocks()
+        print("\n" + "="*50)
+        print("📊 传统选股结果（JSON格式）：")
+        print(json.dumps(output, ensure_ascii=False, indent=2))
         
-        if all_stocks is None or all_stocks.empty:
-            print("❌ 传统选股没有找到合适的股票")
-            return
+    except Exception as e:
+        print(f"❌ 传统选股失败：{e}")
+        error_output = {
+            "success": False,
+            "strategy": "traditional",
+            "error": str(e),
+            "stocks": [],
+            "timestamp": datetime.now().isoformat()
+        }
+        print(json.dumps(error_output, ensure_ascii=False))
+
+def run_traditional_selection(base_stocks: pd.DataFrame = None) -> dict:
+    """
+    执行传统选股并返回结构化结果
+    
+    Args:
+        base_stocks: 平衡配置下 TailUpStrategy 的选股结果（None 时现场计算）
         
+    Returns:
+        结果字典（stocks 为前端使用的股票列表）
+    """
+    # 1. 使用平衡配置进行传统选股
+    print("\n🔍 执行传统技术指标选股...")
+    if base_stocks is None:
+        trading_config = TradingConfig.get_preset("balanced")
+        strategy = TailUpStrategy(trading_config)
+        base_stocks = strategy.select_stocks()
+    
+    result_data = []
+    all_stocks = base_stocks
+    
+    if all_stocks is None or all_stocks.empty:
+        print("❌ 传统选股没有找到合适的股票")
+    else:
         print(f"传统选股完成，共找到 {len(all_stocks)} 只候选股票")
         
         # 2. 应用传统技术指标筛选
@@ -46,7 +75,6 @@ def main():
                 print(f"{i+1}. {stock['代码']} {stock.get('名称', '')} - 技术评分：{stock.get('technical_score', 0):.1f}分")
         
         # 4. 输出结果供前端使用
-        result_data = []
         for _, stock in filtered_stocks.head(10).iterrows():
             result_data.append({
                 "代码": stock['代码'],
@@ -56,30 +84,15 @@ def main():
                 "风险评分": round(stock.get('风险评分', 30), 1),  # 添加风险评分字段
                 "选股类型": "传统技术指标"
             })
-        
-        # 5. 输出JSON格式结果
-        output = {
-            "success": True,
-            "strategy": "traditional",
-            "count": len(result_data),
-            "stocks": result_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        print("\n" + "="*50)
-        print("📊 传统选股结果（JSON格式）：")
-        print(json.dumps(output, ensure_ascii=False, indent=2))
-        
-    except Exception as e:
-        print(f"❌ 传统选股失败：{e}")
-        error_output = {
-            "success": False,
-            "strategy": "traditional",
-            "error": str(e),
-            "stocks": [],
-            "timestamp": datetime.now().isoformat()
-        }
-        print(json.dumps(error_output, ensure_ascii=False))
+    
+    # 5. 结构化结果
+    return {
+        "success": True,
+        "strategy": "traditional",
+        "count": len(result_data),
+        "stocks": result_data,
+        "timestamp": datetime.now().isoformat()
+    }
 
 def apply_traditional_filters(stocks_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -29,13 +29,14 @@ class VolumeRetracementAnalyzer:
         except:
             self.data_fetcher = None
     
-    def analyze_volume_pattern(self, daily_df: pd.DataFrame, days: int = 10) -> Dict[str, Any]:
+    def analyze_volume_pattern(self, daily_df: pd.DataFrame, days: int = 10, indicators: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         分析成交量形态
         
         Args:
             daily_df: 日线数据
             days: 分析天数
+            indicators: 缓存的日线指标（给出时直接使用其中的均量）
             
         Returns:
             成交量分析结果
@@ -54,9 +55,14 @@ class VolumeRetracementAnalyzer:
         recent_changes = pct_changes.tail(days)
         
         # 计算均量
-        avg_volume_5 = recent_volumes.tail(5).mean()
-        avg_volume_10 = recent_volumes.tail(10).mean() if len(recent_volumes) >= 10 else avg_volume_5
-        avg_volume_20 = volumes.tail(20).mean() if len(volumes) >= 20 else avg_volume_10
+        if indicators is not None and days >= 10:
+            avg_volume_5 = indicators["vol_ma5"]
+            avg_volume_10 = indicators["vol_ma10"]
+            avg_volume_20 = indicators["vol_ma20"]
+        else:
+            avg_volume_5 = recent_volumes.tail(5).mean()
+            avg_volume_10 = recent_volumes.tail(10).mean() if len(recent_volumes) >= 10 else avg_volume_5
+            avg_volume_20 = volumes.tail(20).mean() if len(volumes) >= 20 else avg_volume_10
         
         # 寻找放量上涨日
         volume_surge_days = []
@@ -179,12 +185,13 @@ class VolumeRetracementAnalyzer:
         except:
             return 0
     
-    def analyze_stock_pattern(self, daily_df: pd.DataFrame) -> Dict[str, Any]:
+    def analyze_stock_pattern(self, daily_df: pd.DataFrame, indicators: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         分析股票技术形态
         
         Args:
             daily_df: 日线数据
+            indicators: 缓存的日线指标（给出时直接使用其中的均线和近期高低点）
             
         Returns:
             形态分析结果
@@ -202,9 +209,14 @@ class VolumeRetracementAnalyzer:
         ma20 = closes.rolling(20).mean()
         
         current_price = closes.iloc[-1]
-        current_ma5 = ma5.iloc[-1]
-        current_ma10 = ma10.iloc[-1]
-        current_ma20 = ma20.iloc[-1]
+        if indicators is not None:
+            current_ma5 = indicators["ma5"]
+            current_ma10 = indicators["ma10"]
+            current_ma20 = indicators["ma20"]
+        else:
+            current_ma5 = ma5.iloc[-1]
+            current_ma10 = ma10.iloc[-1]
+            current_ma20 = ma20.iloc[-1]
         
         # 均线排列
         ma_alignment = self._analyze_ma_alignment(current_price, current_ma5, current_ma10, current_ma20)
@@ -213,7 +225,7 @@ class VolumeRetracementAnalyzer:
         trend_strength = self._calculate_trend_strength(closes, ma20)
         
         # 支撑阻力
-        support_resistance = self._find_support_resistance(highs, lows, closes)
+        support_resistance = self._find_support_resistance(highs, lows, closes, indicators)
         
         # 形态评分
         pattern_score = self._calculate_pattern_score(ma_alignment, trend_strength, support_resistance, closes)
@@ -305,14 +317,19 @@ class VolumeRetracementAnalyzer:
             "近期涨幅": round(recent_change, 2)
         }
     
-    def _find_support_resistance(self, highs: pd.Series, lows: pd.Series, closes: pd.Series) -> Dict[str, Any]:
+    def _find_support_resistance(self, highs: pd.Series, lows: pd.Series, closes: pd.Series,
+                                 indicators: Dict[str, Any] = None) -> Dict[str, Any]:
         """寻找支撑和阻力位"""
         
         current_price = closes.iloc[-1]
         
         # 近期高低点
-        recent_high = highs.tail(10).max()
-        recent_low = lows.tail(10).min()
+        if indicators is not None:
+            recent_high = indicators["high_10"]
+            recent_low = indicators["low_10"]
+        else:
+            recent_high = highs.tail(10).max()
+            recent_low = lows.tail(10).min()
         
         # 距离支撑和阻力的百分比
         support_distance = (current_price - recent_low) / current_price * 100
@@ -410,11 +427,14 @@ class VolumeRetracementAnalyzer:
                 
                 return {"error": "无法获取数据"}
             
+            # 与日线同一交易日的缓存指标
+            indicators = self.data_fetcher.get_indicator(code, daily_df)
+            
             # 成交量分析
-            volume_analysis = self.analyze_volume_pattern(daily_df)
+            volume_analysis = self.analyze_volume_pattern(daily_df, indicators=indicators)
             
             # 形态分析
-            pattern_analysis = self.analyze_stock_pattern(daily_df)
+            pattern_analysis = self.analyze_stock_pattern(daily_df, indicators)
             
             # 综合评分
             final_score = self._calculate_final_score(volume_analysis, pattern_analysis)
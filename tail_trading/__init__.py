@@ -16,31 +16,29 @@ __version__ = "3.0.0"
 __author__ = "Stock Trading Team"
 __email__ = "team@stocktrading.com"
 
-# 导入核心类
-try:
+from typing import TYPE_CHECKING
+from ._lazy import lazy_exports
+
+# 核心类、主要策略和配置，首次访问时才导入对应模块（命令行轻量命令不需要加载 pandas 和策略）
+_EXPORTS = {
+    "BaseStrategy": ".core.strategy",
+    "DataFetcher": ".core.data_fetcher",
+    "RiskManager": ".core.risk_manager",
+    "PositionManager": ".core.position_manager",
+    "TailUpStrategy": ".strategies.tail_up_strategy",
+    "Settings": ".config.settings",
+    "TradingConfig": ".config.trading_config",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
     from .core.strategy import BaseStrategy
     from .core.data_fetcher import DataFetcher
     from .core.risk_manager import RiskManager
     from .core.position_manager import PositionManager
-    
-    # 导入主要策略
     from .strategies.tail_up_strategy import TailUpStrategy
-    
-    # 导入配置
     from .config.settings import Settings
     from .config.trading_config import TradingConfig
-    
-    __all__ = [
-        "BaseStrategy",
-        "DataFetcher", 
-        "RiskManager",
-        "PositionManager",
-        "TailUpStrategy",
-        "Settings",
-        "TradingConfig"
-    ]
-    
-except ImportError as e:
-    # 如果导入失败，提供基本信息
-    print(f"Warning: Some modules could not be imported: {e}")
-    __all__ = []
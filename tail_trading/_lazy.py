@@ -0,0 +1,34 @@
+"""
+包属性延迟导入
+
+包的 __init__ 只登记“名称 -> 子模块”，首次访问某个名称时才导入对应子模块（PEP 562），
+避免 `import tail_trading` 时连带导入 pandas、策略和数据模块
+"""
+
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    生成包的 __getattr__ 和 __dir__
+
+    Args:
+        package: 包名（__name__）
+        exports: 名称 -> 相对子模块路径，如 {"TailUpStrategy": ".strategies.tail_up_strategy"}
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        # 缓存到包的命名空间，之后的访问不再经过 __getattr__
+        setattr(import_module(package), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
@@ -4,21 +4,33 @@
 包含所有CLI命令的实现
 """
 
-from .select import add_select_parser, execute_select
-from .trade import add_trade_parser, execute_trade
-from .monitor import add_monitor_parser, execute_monitor
-from .config import add_config_parser, execute_config
-from .update import add_update_parser, execute_update
+from typing import TYPE_CHECKING
+from ..._lazy import lazy_exports
 
-__all__ = [
-    "add_select_parser",
-    "execute_select",
-    "add_trade_parser", 
-    "execute_trade",
-    "add_monitor_parser",
-    "execute_monitor",
-    "add_config_parser",
-    "execute_config",
-    "add_update_parser",
-    "execute_update"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "add_select_parser": ".select",
+    "execute_select": ".select",
+    "add_trade_parser": ".trade",
+    "execute_trade": ".trade",
+    "add_monitor_parser": ".monitor",
+    "execute_monitor": ".monitor",
+    "add_config_parser": ".config",
+    "execute_config": ".config",
+    "add_update_parser": ".update",
+    "execute_update": ".update",
+    "add_scan_parser": ".scan",
+    "execute_scan": ".scan",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .select import add_select_parser, execute_select
+    from .trade import add_trade_parser, execute_trade
+    from .monitor import add_monitor_parser, execute_monitor
+    from .config import add_config_parser, execute_config
+    from .update import add_update_parser, execute_update
+    from .scan import add_scan_parser, execute_scan
@@ -0,0 +1,166 @@
+"""
+尾盘扫描命令
+
+14:30-15:00 按固定间隔刷新候选股票分时，实时更新尾盘排名看板
+"""
+
+import argparse
+import time
+from datetime import datetime
+from ...config.trading_config import TradingConfig
+from ...config.logging_config import get_logger
+from ..ui.table import print_tail_board
+
+def add_scan_parser(subparsers: argparse._SubParsersAction) -> None:
+    """
+    添加尾盘扫描命令解析器
+
+    Args:
+        subparsers: 子命令解析器
+    """
+    parser = subparsers.add_parser(
+        "scan",
+        help="尾盘实时扫描",
+        description="尾盘时段按固定间隔刷新候选股票分时，计算均价偏离、尾盘放量、日内位置并实时排名",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  tail-trading scan                          # 以当日选股结果前50只为候选池，14:30开始扫描
+  tail-trading scan --codes 600000,000001    # 指定候选股票
+  tail-trading scan --interval 15 --top 30   # 每15秒刷新，显示前30名
+  tail-trading scan --once --now             # 立即刷新一轮后退出
+        """
+    )
+
+    parser.add_argument(
+        "--codes",
+        type=str,
+        help="候选股票代码，逗号分隔（默认使用当日选股结果）"
+    )
+
+    parser.add_argument(
+        "--pool",
+        type=int,
+        default=50,
+        help="从选股结果中取前N只作为候选池 (默认: 50)"
+    )
+
+    parser.add_argument(
+        "--preset",
+        choices=["conservative", "balanced", "aggressive"],
+        help="选股使用的预设配置"
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30,
+        help="刷新间隔秒数 (默认: 30)"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="并发请求数 (默认: 10)"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="看板显示前N名 (默认: 20)"
+    )
+
+    parser.add_argument(
+        "--until",
+        type=str,
+        default="15:00",
+        help="结束时间 HH:MM (默认: 15:00)"
+    )
+
+    parser.add_argument(
+        "--now",
+        action="store_true",
+        help="不等待尾盘时段，立即开始"
+    )
+
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="只刷新一轮"
+    )
+
+def _load_candidates(args: argparse.Namespace):
+    """候选股票代码和名称"""
+    if args.codes:
+        return [code.strip() for code in args.codes.split(",") if code.strip()], {}
+
+    from ...strategies.tail_up_strategy import TailUpStrategy
+    config = TradingConfig.get_preset(args.preset) if args.preset else TradingConfig.load()
+    selected = TailUpStrategy(config).select_stocks()
+    if selected.empty:
+        return [], {}
+    selected = selected.head(args.pool)
+    codes = selected["代码"].astype(str).tolist()
+    return codes, dict(zip(codes, selected.get("名称", [""] * len(codes))))
+
+def execute_scan(args: argparse.Namespace) -> int:
+    """
+    执行尾盘扫描命令
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        退出码
+    """
+    logger = get_logger("scan_command")
+
+    print("=== 尾盘实时扫描 ===")
+    print(f"运行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+
+    try:
+        from ...strategies.tail_window_scanner import TailWindowScanner, TAIL_START
+
+        codes, names = _load_candidates(args)
+        if not codes:
+            print("没有候选股票")
+            return 1
+        print(f"候选股票: {len(codes)} 只")
+
+        if not args.now and datetime.now().strftime("%H:%M") < TAIL_START:
+            print(f"尾盘时段未开始，等待至 {TAIL_START}（使用 --now 立即开始）")
+            while datetime.now().strftime("%H:%M") < TAIL_START:
+                time.sleep(5)
+
+        scanner = TailWindowScanner(codes, names)
+
+        def show(board, stats):
+            print("\033[2J\033[H", end="")
+            print(f"=== 尾盘实时扫描  {datetime.now().strftime('%H:%M:%S')}  候选 {len(codes)} 只 ===")
+            if "error" in stats:
+                print(f"本轮刷新失败: {stats['error']}")
+            else:
+                print(f"拉取 {stats['fetch_seconds']:.1f}s，计算 {stats['compute_seconds'] * 1000:.0f}ms，"
+                      f"新增 {stats['appended']} 分钟")
+            print()
+            print_tail_board(board.head(args.top))
+
+        scanner.run(
+            interval=args.interval,
+            until=args.until,
+            concurrency=args.concurrency,
+            on_update=show,
+            max_rounds=1 if args.once else None,
+        )
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n扫描已停止")
+        return 0
+    except Exception as e:
+        logger.error(f"尾盘扫描失败: {e}")
+        print(f"❌ 尾盘扫描失败: {e}")
+        return 1
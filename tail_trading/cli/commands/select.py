@@ -6,7 +6,6 @@
 
 import argparse
 from typing import Any
-from ...strategies.tail_up_strategy import TailUpStrategy
 from ...config.trading_config import TradingConfig
 from ...config.logging_config import get_logger
 from ...config.settings import Settings
@@ -85,6 +84,9 @@ def execute_select(args: argparse.Namespace) -> int:
     print()
     
     try:
+        # 策略依赖 pandas 和数据模块，执行选股时才导入
+        from ...strategies.tail_up_strategy import TailUpStrategy
+        
         # 加载配置
         if args.preset:
             config = TradingConfig.get_preset(args.preset)
@@ -6,7 +6,6 @@
 
 import argparse
 from ...core.position_manager import PositionManager
-from ...strategies.tail_up_strategy import TailUpStrategy
 from ...config.trading_config import TradingConfig
 from ...config.logging_config import get_logger
 from ..ui.table import print_stock_table
@@ -64,6 +63,9 @@ def execute_trade(args: argparse.Namespace) -> int:
     print()
     
     try:
+        # 策略依赖 pandas 和数据模块，执行交易命令时才导入
+        from ...strategies.tail_up_strategy import TailUpStrategy
+        
         # 加载配置
         if args.preset:
             config = TradingConfig.get_preset(args.preset)
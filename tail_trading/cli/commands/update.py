@@ -13,8 +13,6 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from data.est.req.est_prepare_data import EstStockPipeline
-
 def add_update_parser(subparsers):
     """添加数据更新命令解析器"""
     parser = subparsers.add_parser(
@@ -28,6 +26,7 @@ def add_update_parser(subparsers):
   tail-trading update --top-n 20        # 更新top20板块数据
   tail-trading update --top-n 5 --skip-minute  # 更新top5板块，跳过分钟线
   tail-trading update --daily-only       # 仅更新日线数据
+  tail-trading update --intraday         # 盘中刷新，分钟线只追加新分钟
         """
     )
     
@@ -50,6 +49,12 @@ def add_update_parser(subparsers):
         help="仅更新日线数据，不更新分钟线"
     )
     
+    parser.add_argument(
+        "--intraday",
+        action="store_true",
+        help="盘中模式：分钟线只拉当天分时并追加新分钟"
+    )
+    
     parser.add_argument(
         "--use-proxy",
         action="store_true",
@@ -139,17 +144,31 @@ async def run_update_pipeline(pipeline, args):
     est_common.save_df_to_file(members_df, MEMBERS_DF_PATH)
     print(f"✓ 已保存成员股票数据到 {MEMBERS_DF_PATH}")
     
-    # 步骤3: 更新日线数据
-    print("📊 步骤3: 更新股票日线数据...")
-    await pipeline.update_daily_for_members(members_df)
-    print("✓ 日线数据更新完成")
-    
-    # 步骤4: 更新分钟线数据（如果未跳过）
+    # 步骤3/4: 并行更新日线和分钟线数据（共享请求引擎的并发额度）
+    time_stats = {}
+    stages = [
+        pipeline.timed_stage(
+            "更新日线",
+            pipeline.update_daily_for_members(members_df, use_proxy_and_concurrent=args.concurrent),
+            time_stats,
+        )
+    ]
     if not (args.daily_only or args.skip_minute):
-        print("📊 步骤4: 更新股票分钟线数据...")
-        await pipeline.update_minute_for_members(members_df)
-        print("✓ 分钟线数据更新完成")
+        print("📊 步骤3: 并行更新股票日线和分钟线数据...")
+        stages.append(
+            pipeline.timed_stage(
+                "更新分钟线",
+                pipeline.update_minute_for_members(
+                    members_df, use_proxy_and_concurrent=args.concurrent, intraday=args.intraday
+                ),
+                time_stats,
+            )
+        )
     else:
+        print("📊 步骤3: 更新股票日线数据...")
         print("⏭️ 跳过分钟线数据更新")
+    await asyncio.gather(*stages)
+    for name, seconds in time_stats.items():
+        print(f"✓ {name}完成，耗时 {seconds:.2f} 秒")
     
     print("🎉 数据更新管道执行完成！")
@@ -41,6 +41,7 @@ def main(args: Optional[List[str]] = None) -> int:
   tail-trading config --preset balanced  # 设置配置
   tail-trading update                    # 更新数据
   tail-trading update --top-n 20         # 更新top20板块数据
+  tail-trading scan                      # 尾盘实时扫描
         """
     )
     
@@ -91,6 +92,10 @@ def main(args: Optional[List[str]] = None) -> int:
     from .commands.update import add_update_parser
     add_update_parser(subparsers)
     
+    # 尾盘扫描命令
+    from .commands.scan import add_scan_parser
+    add_scan_parser(subparsers)
+    
     # 解析参数
     parsed_args = parser.parse_args(args)
     
@@ -116,6 +121,9 @@ def main(args: Optional[List[str]] = None) -> int:
         elif parsed_args.command == "update":
             from .commands.update import execute_update
             return execute_update(parsed_args)
+        elif parsed_args.command == "scan":
+            from .commands.scan import execute_scan
+            return execute_scan(parsed_args)
         else:
             parser.print_help()
             return 1
@@ -4,10 +4,20 @@ UI组件模块
 提供用户界面相关的工具和组件
 """
 
-from .table import print_stock_table, print_position_table, print_summary_box
+from typing import TYPE_CHECKING
+from ..._lazy import lazy_exports
 
-__all__ = [
-    "print_stock_table",
-    "print_position_table", 
-    "print_summary_box"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "print_stock_table": ".table",
+    "print_position_table": ".table",
+    "print_summary_box": ".table",
+    "print_tail_board": ".table",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .table import print_stock_table, print_position_table, print_summary_box, print_tail_board
@@ -4,10 +4,12 @@
 提供美观的表格输出功能
 """
 
-import pandas as pd
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any
 
-def print_stock_table(stocks_df: pd.DataFrame) -> None:
+if TYPE_CHECKING:
+    import pandas as pd
+
+def print_stock_table(stocks_df: "pd.DataFrame") -> None:
     """
     打印股票表格
     
@@ -257,3 +259,54 @@ def print_summary_box(title: str, data: Dict[str, Any]) -> None:
     
     print("└" + "─" * (max_width - 2) + "┘")
     print()
+
+def print_tail_board(board: "pd.DataFrame") -> None:
+    """
+    打印尾盘实时看板
+    
+    Args:
+        board: TailWindowScanner.ranked() 返回的看板
+    """
+    if board.empty:
+        print("没有数据可显示")
+        return
+    
+    # (显示名, 列名, 宽度, 格式)
+    display_columns = [
+        ("排名", "排名", 4, "{:.0f}"),
+        ("代码", "代码", 8, "{}"),
+        ("名称", "名称", 10, "{}"),
+        ("最新价", "最新价", 8, "{:.2f}"),
+        ("均价偏离", "均价偏离", 8, "{:+.2f}%"),
+        ("尾盘量比", "尾盘量比", 8, "{:.2f}倍"),
+        ("日内位置", "日内位置", 8, "{:.0%}"),
+        ("尾盘涨幅", "尾盘涨幅", 8, "{:+.2f}%"),
+        ("评分", "尾盘评分", 6, "{:.0f}"),
+        ("信号", "信号", 4, "{}"),
+        ("更新", "更新时间", 5, "{}"),
+    ]
+    
+    border = "─" * (sum(width for _, _, width, _ in display_columns) + len(display_columns) * 3 - 1)
+    print("┌" + border + "┐")
+    print("│" + "".join(f" {name:^{width}} │" for name, _, width, _ in display_columns))
+    print("├" + border + "┤")
+    
+    for _, row in board.iterrows():
+        data_row = "│"
+        for _, col_name, width, fmt in display_columns:
+            raw_value = row.get(col_name)
+            if raw_value is None or (isinstance(raw_value, float) and _is_nan(raw_value)):
+                value = "-"
+            else:
+                value = fmt.format(raw_value)
+            if len(value) > width:
+                value = value[:width-2] + ".."
+            data_row += f" {value:<{width}} │"
+        print(data_row)
+    
+    print("└" + border + "┘")
+    print()
+
+def _is_nan(value: float) -> bool:
+    """浮点 NaN 判断（不导入 pandas）"""
+    return value != value
@@ -4,13 +4,22 @@
 包含所有配置相关的类和函数
 """
 
-from .settings import Settings
-from .trading_config import TradingConfig
-from .logging_config import setup_logging, get_logger
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "Settings",
-    "TradingConfig", 
-    "setup_logging",
-    "get_logger"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "Settings": ".settings",
+    "TradingConfig": ".trading_config",
+    "setup_logging": ".logging_config",
+    "get_logger": ".logging_config",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .settings import Settings
+    from .trading_config import TradingConfig
+    from .logging_config import setup_logging, get_logger
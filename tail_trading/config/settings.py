@@ -61,6 +61,8 @@ class Settings:
     # 缓存配置
     CACHE_ENABLED = True
     CACHE_EXPIRE_MINUTES = 10
+    CACHE_MEMORY_MAX_MB = int(os.getenv("CACHE_MEMORY_MAX_MB", "256"))  # 进程内缓存容量
+    CACHE_DISK_ENABLED = os.getenv("CACHE_DISK_ENABLED", "false").lower() == "true"  # 默认只缓存在内存
     
     @classmethod
     def ensure_directories(cls):
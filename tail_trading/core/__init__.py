@@ -4,17 +4,29 @@
 包含策略、数据获取、风险管理和持仓管理等核心功能
 """
 
-from .strategy import BaseStrategy
-from .data_fetcher import DataFetcher
-from .risk_manager import RiskManager, RiskMetrics
-from .position_manager import PositionManager, Position, Trade
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "BaseStrategy",
-    "DataFetcher",
-    "RiskManager",
-    "RiskMetrics",
-    "PositionManager",
-    "Position",
-    "Trade"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "BaseStrategy": ".strategy",
+    "DataFetcher": ".data_fetcher",
+    "LRUCache": ".cache",
+    "TieredCache": ".cache",
+    "RiskManager": ".risk_manager",
+    "RiskMetrics": ".risk_manager",
+    "PositionManager": ".position_manager",
+    "Position": ".position_manager",
+    "Trade": ".position_manager",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .strategy import BaseStrategy
+    from .data_fetcher import DataFetcher
+    from .cache import LRUCache, TieredCache
+    from .risk_manager import RiskManager, RiskMetrics
+    from .position_manager import PositionManager, Position, Trade
@@ -0,0 +1,198 @@
+"""
+分层缓存
+
+DataFetcher 使用的缓存：进程内 LRU（按字节数限制容量）+ 可选的磁盘层（pickle，原子写入）
+"""
+
+import os
+import sys
+import time
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+
+def estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return sys.getsizeof(value)
+
+class LRUCache:
+    """
+    进程内 LRU 缓存
+
+    总字节数超过 max_bytes 时淘汰最久未使用的条目；读取时按 max_age 判断过期，
+    并可按 version 校验数据版本（如数据文件的修改时间），版本不一致视为未命中
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, max_age: Optional[float] = None, version: Any = None) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            max_age: 最长有效时间（秒），None 表示不过期
+            version: 期望的数据版本，None 表示不校验
+
+        Returns:
+            缓存值，未命中返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at, stored_version, size = entry
+            if (max_age is not None and time.time() - stored_at > max_age) or \
+                    (version is not None and stored_version != version):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, version: Any = None, stored_at: float = None) -> None:
+        """写入缓存，超过容量时淘汰最久未使用的条目（单个超过容量的值不缓存）"""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, stored_at or time.time(), version, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+class TieredCache:
+    """
+    内存 + 磁盘两级缓存
+
+    读取先查内存，未命中再查磁盘（命中后放回内存）；写入默认只写内存，persist=True 时同时原子写入磁盘
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.memory = LRUCache(max_bytes)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_writes = 0
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str, max_age: Optional[float] = None, version: Any = None,
+            use_disk: bool = True) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            max_age: 最长有效时间（秒），None 表示不过期
+            version: 期望的数据版本，None 表示不校验
+            use_disk: 内存未命中时是否读取磁盘层
+        """
+        value = self.memory.get(key, max_age, version)
+        if value is not None or not use_disk:
+            return value
+
+        path = self.get_path(key)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if max_age is not None and time.time() - mtime > max_age:
+            return None
+        with open(path, "rb") as f:
+            stored_version, value = pickle.load(f)
+        if version is not None and stored_version != version:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.put(key, value, stored_version, stored_at=mtime)
+        return value
+
+    def put(self, key: str, value: Any, version: Any = None, persist: bool = False) -> None:
+        """写入缓存，persist=True 时同时写入磁盘层（先写临时文件再替换）"""
+        self.memory.put(key, value, version)
+        if not persist:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((version, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.disk_writes += 1
+
+    def clear(self) -> None:
+        """清空内存层和磁盘层"""
+        self.memory.clear()
+        if not self.cache_dir.exists():
+            return
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            cache_file.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"memory": self.memory.stats()}
+        with self._lock:
+            stats["disk"] = {
+                "hits": self.disk_hits,
+                "writes": self.disk_writes,
+                "files": len(list(self.cache_dir.glob("*.pkl"))) if self.cache_dir.exists() else 0,
+            }
+        return stats
+
+_shared_caches: Dict[str, TieredCache] = {}
+_shared_lock = threading.Lock()
+
+def get_shared_cache(cache_dir: Path, max_bytes: int) -> TieredCache:
+    """按缓存目录返回进程内共享的分层缓存，同一进程内的多个数据获取器共用内存层"""
+    with _shared_lock:
+        cache = _shared_caches.get(str(cache_dir))
+        if cache is None:
+            cache = _shared_caches[str(cache_dir)] = TieredCache(cache_dir, max_bytes)
+    return cache
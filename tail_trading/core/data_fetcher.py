@@ -7,11 +7,12 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 from ..config.logging_config import get_logger
 from ..config.settings import Settings
+from .cache import get_shared_cache
 
 class DataFetcher(ABC):
     """数据获取器基类"""
@@ -27,6 +28,7 @@ class DataFetcher(ABC):
         self.logger = get_logger(f"data.{self.__class__.__name__}")
         self.cache_dir = Settings.CACHE_DIR
         Settings.ensure_directories()
+        self.cache = get_shared_cache(self.cache_dir, Settings.CACHE_MEMORY_MAX_MB * 1024 * 1024)
     
     @abstractmethod
     def get_stock_list(self) -> pd.DataFrame:
@@ -76,15 +78,17 @@ class DataFetcher(ABC):
         Returns:
             缓存文件路径
         """
-        return self.cache_dir / f"{cache_key}.pkl"
+        return self.cache.get_path(cache_key)
     
-    def get_from_cache(self, cache_key: str, expire_minutes: int = 10) -> Optional[pd.DataFrame]:
+    def get_from_cache(self, cache_key: str, expire_minutes: int = 10,
+                       version: Any = None) -> Optional[pd.DataFrame]:
         """
-        从缓存获取数据
+        从缓存获取数据（先查进程内缓存，未命中再查磁盘缓存）
         
         Args:
             cache_key: 缓存键
             expire_minutes: 过期时间（分钟）
+            version: 期望的数据版本（如数据文件的版本标识），不一致视为未命中
             
         Returns:
             缓存数据或None
@@ -92,50 +96,40 @@ class DataFetcher(ABC):
         if not self.cache_enabled:
             return None
         
-        cache_path = self.get_cache_path(cache_key)
-        
-        if not cache_path.exists():
-            return None
-        
-        # 检查缓存是否过期
-        cache_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        if datetime.now() - cache_time > timedelta(minutes=expire_minutes):
-            return None
-        
         try:
-            return pd.read_pickle(cache_path)
+            return self.cache.get(cache_key, max_age=expire_minutes * 60, version=version)
         except Exception as e:
             self.logger.warning(f"Failed to load cache {cache_key}: {e}")
             return None
     
-    def save_to_cache(self, cache_key: str, data: pd.DataFrame) -> None:
+    def save_to_cache(self, cache_key: str, data: pd.DataFrame, version: Any = None,
+                      persist: Optional[bool] = None) -> None:
         """
         保存数据到缓存
         
         Args:
             cache_key: 缓存键
-            data: 数据
+            data: 数据（调用方不应再原地修改）
+            version: 数据版本
+            persist: 是否同时写入磁盘缓存，默认取 Settings.CACHE_DISK_ENABLED
         """
         if not self.cache_enabled:
             return
         
-        cache_path = self.get_cache_path(cache_key)
+        if persist is None:
+            persist = Settings.CACHE_DISK_ENABLED
         
         try:
-            data.to_pickle(cache_path)
+            self.cache.put(cache_key, data, version=version, persist=persist)
         except Exception as e:
             self.logger.warning(f"Failed to save cache {cache_key}: {e}")
     
     def clear_cache(self) -> None:
-        """清理缓存"""
-        if not self.cache_dir.exists():
-            return
-        
-        for cache_file in self.cache_dir.glob("*.pkl"):
-            try:
-                cache_file.unlink()
-            except Exception as e:
-                self.logger.warning(f"Failed to remove cache file {cache_file}: {e}")
+        """清理缓存（内存和磁盘）"""
+        try:
+            self.cache.clear()
+        except Exception as e:
+            self.logger.warning(f"Failed to clear cache: {e}")
     
     def get_batch_data(self, stock_codes: List[str], data_type: str = "daily") -> Dict[str, pd.DataFrame]:
         """
@@ -175,10 +169,13 @@ class DataFetcher(ABC):
         Returns:
             健康状态信息
         """
+        cache_stats = self.cache.stats()
         return {
             "fetcher_name": self.__class__.__name__,
             "cache_enabled": self.cache_enabled,
             "cache_dir": str(self.cache_dir),
-            "cache_files_count": len(list(self.cache_dir.glob("*.pkl"))) if self.cache_dir.exists() else 0,
+            "cache_files_count": cache_stats["disk"]["files"],
+            "cache_disk_enabled": Settings.CACHE_DISK_ENABLED,
+            "cache_stats": cache_stats,
             "last_check": datetime.now().isoformat()
         }
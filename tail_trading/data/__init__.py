@@ -4,12 +4,21 @@
 包含数据获取、存储和模型相关的功能
 """
 
-from .eastmoney import EastmoneyDataFetcher
-from .models import Stock, DailyData, TechnicalIndicators
-
-__all__ = [
-    "EastmoneyDataFetcher",
-    "Stock",
-    "DailyData",
-    "TechnicalIndicators"
-]
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "EastmoneyDataFetcher": ".eastmoney",
+    "Stock": ".models",
+    "DailyData": ".models",
+    "TechnicalIndicators": ".models",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .eastmoney import EastmoneyDataFetcher
+    from .models import Stock, DailyData, TechnicalIndicators
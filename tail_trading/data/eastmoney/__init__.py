@@ -4,8 +4,17 @@
 提供东方财富数据源的统一接口
 """
 
-from .daily_fetcher import EastmoneyDataFetcher
+from typing import TYPE_CHECKING
+from ..._lazy import lazy_exports
 
-__all__ = [
-    "EastmoneyDataFetcher"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "EastmoneyDataFetcher": ".daily_fetcher",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .daily_fetcher import EastmoneyDataFetcher
@@ -4,9 +4,10 @@
 基于原有的data.est模块，提供统一的数据获取接口
 """
 
+import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import pandas as pd
 
 # 添加原有模块路径
@@ -30,12 +31,14 @@ class EastmoneyDataFetcher(DataFetcher):
         
         # 导入原有模块
         try:
-            from data.est.req import est_daily, est_prepare_data
+            from data.est.req import est_daily, est_minute, est_prepare_data
             self.daily_fetcher = est_daily.EastmoneyDailyStockFetcher()
+            self.minute_fetcher = est_minute.EastmoneyMinuteStockFetcher()
             self.prepare_data = est_prepare_data
         except ImportError as e:
             self.logger.error(f"Failed to import legacy modules: {e}")
             self.daily_fetcher = None
+            self.minute_fetcher = None
             self.prepare_data = None
     
     def get_stock_list(self) -> pd.DataFrame:
@@ -51,6 +54,12 @@ class EastmoneyDataFetcher(DataFetcher):
             if self.prepare_data is None:
                 raise ImportError("prepare_data module not available")
             
+            # 成分股文件未变化时直接使用进程内缓存
+            source_version = self._members_version()
+            cached_data = self.get_from_cache(cache_key, expire_minutes=60, version=source_version)
+            if cached_data is not None:
+                return cached_data
+            
             # 从原有模块获取数据
             members_df = self.prepare_data.load_members_df_from_path()
             
@@ -64,8 +73,8 @@ class EastmoneyDataFetcher(DataFetcher):
                 self.logger.warning("No stock list data available")
                 return pd.DataFrame()
             
-            # 保存到缓存（每次都更新缓存）
-            self.save_to_cache(cache_key, members_df)
+            # 成分股文件变化后才重新缓存，并写入磁盘作为数据源不可用时的后备
+            self.save_to_cache(cache_key, members_df, version=source_version, persist=True)
             
             self.logger.info(f"Loaded {len(members_df)} stocks from data source")
             return members_df
@@ -79,6 +88,13 @@ class EastmoneyDataFetcher(DataFetcher):
                 return cached_data
             return pd.DataFrame()
     
+    def _members_version(self):
+        """成分股文件的版本标识（修改时间），文件不存在返回 None"""
+        try:
+            return os.stat(self.prepare_data.MEMBERS_DF_PATH).st_mtime_ns
+        except OSError:
+            return None
+    
     def get_daily_data(self, stock_code: str, days: int = 30) -> Optional[pd.DataFrame]:
         """
         获取日线数据
@@ -92,27 +108,24 @@ class EastmoneyDataFetcher(DataFetcher):
         """
         cache_key = f"daily_{stock_code}_{days}"
         
-        # 尝试从缓存获取
-        cached_data = self.get_from_cache(cache_key, expire_minutes=10)
-        if cached_data is not None:
-            return cached_data
-        
         try:
             if self.daily_fetcher is None:
                 raise ImportError("daily_fetcher not available")
             
-            # 从原有模块获取数据
-            daily_df = self.daily_fetcher.get_daily_df(stock_code)
+            # 日线库文件被替换（数据更新）后缓存失效
+            store_version = self.daily_fetcher.store.version_key()
+            cached_data = self.get_from_cache(cache_key, expire_minutes=10, version=store_version)
+            if cached_data is not None:
+                return cached_data
+            
+            # 从列存库读取最近指定天数的数据
+            daily_df = self.daily_fetcher.get_daily_df(stock_code, last_n=days)
             
             if daily_df is None or daily_df.empty:
                 return None
             
-            # 取最近指定天数的数据
-            if len(daily_df) > days:
-                daily_df = daily_df.tail(days)
-            
-            # 保存到缓存
-            self.save_to_cache(cache_key, daily_df)
+            # 只缓存在内存（日线库本身已在磁盘上）
+            self.save_to_cache(cache_key, daily_df, version=store_version, persist=False)
             
             return daily_df
             
@@ -120,6 +133,124 @@ class EastmoneyDataFetcher(DataFetcher):
             self.logger.error(f"Failed to get daily data for {stock_code}: {e}")
             return None
     
+    def get_batch_data(self, stock_codes: List[str], data_type: str = "daily", days: int = 30) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取数据
+        
+        日线数据一次性从列存库读取，其他类型沿用逐只获取
+        
+        Args:
+            stock_codes: 股票代码列表
+            data_type: 数据类型 ("daily" 或 "minute")
+            days: 日线天数
+            
+        Returns:
+            股票代码到数据的映射
+        """
+        if data_type != "daily" or self.daily_fetcher is None:
+            return super().get_batch_data(stock_codes, data_type)
+        
+        results = {}
+        try:
+            dfs = self.daily_fetcher.get_multi_daily_df(stock_codes, last_n=days)
+        except Exception as e:
+            self.logger.error(f"Failed to load batch daily data: {e}")
+            return results
+        
+        for code, data in zip(stock_codes, dfs):
+            if data is not None and not data.empty:
+                results[code] = data
+        
+        return results
+    
+    def get_daily_panel(self, stock_codes: List[str], days: int = 30, fields: Optional[List[str]] = None):
+        """
+        获取日线二维面板（股票数 × 天数），供批量向量化计算使用
+        
+        Args:
+            stock_codes: 股票代码列表
+            days: 天数，不足该天数的股票不返回
+            fields: 字段列表（open/close/high/low/volume/pct_chg 等），None 表示全部
+            
+        Returns:
+            (股票代码列表, {字段: ndarray})
+        """
+        if self.daily_fetcher is None:
+            raise ImportError("daily_fetcher not available")
+        return self.daily_fetcher.get_daily_panel(stock_codes, days, fields)
+    
+    def get_daily_history(self, stock_codes: Optional[List[str]] = None):
+        """
+        获取日线库中的全部历史日线，供回测按日回放
+        
+        Args:
+            stock_codes: 股票代码列表，None 表示全部
+            
+        Returns:
+            结构化数组（code/date 及 est_daily_store.FIELD_MAP 中的字段），按 (code, date) 排序
+        """
+        if self.daily_fetcher is None:
+            raise ImportError("daily_fetcher not available")
+        return self.daily_fetcher.get_daily_history(stock_codes)
+    
+    def get_price_panel(self):
+        """
+        获取共享价格面板（股票 × 交易日 × 字段，float32，内存映射只读）
+        
+        面板在每次日线更新后重建，多个进程同时打开时共享同一份页缓存
+        
+        Returns:
+            est_price_panel.PricePanel，面板不存在或与日线库不一致时返回 None
+        """
+        if self.daily_fetcher is None:
+            return None
+        try:
+            return self.daily_fetcher.get_price_panel()
+        except Exception as e:
+            self.logger.error(f"Failed to open price panel: {e}")
+            return None
+    
+    def get_indicators(self, stock_codes: List[str]) -> pd.DataFrame:
+        """
+        获取缓存的日线技术指标
+        
+        指标按 (代码, 最后交易日) 缓存在日线库旁，只在有新日线时重算
+        
+        Args:
+            stock_codes: 股票代码列表
+            
+        Returns:
+            指标 DataFrame（index 为股票代码，日线不足20天的股票不返回）
+        """
+        if self.daily_fetcher is None:
+            return pd.DataFrame()
+        try:
+            return self.daily_fetcher.get_indicators(stock_codes)
+        except Exception as e:
+            self.logger.error(f"Failed to load indicators: {e}")
+            return pd.DataFrame()
+    
+    def get_indicator(self, stock_code: str, daily_df: pd.DataFrame = None) -> Optional[Dict[str, Any]]:
+        """
+        获取单只股票的日线技术指标
+        
+        Args:
+            stock_code: 股票代码
+            daily_df: 调用方已持有的日线数据，给出时只返回与其最后交易日一致的指标
+            
+        Returns:
+            指标字典，不可用时返回 None
+        """
+        df = self.get_indicators([stock_code])
+        if df.empty:
+            return None
+        indicators = df.iloc[0].to_dict()
+        if daily_df is not None and not daily_df.empty:
+            last_date = int(str(daily_df["日期"].iloc[-1]).replace("-", "")[:8])
+            if int(indicators["date"]) != last_date:
+                return None
+        return indicators
+    
     def get_minute_data(self, stock_code: str, minutes: int = 240) -> Optional[pd.DataFrame]:
         """
         获取分钟数据
@@ -131,10 +262,60 @@ class EastmoneyDataFetcher(DataFetcher):
         Returns:
             分钟数据
         """
-        # 目前原有系统不支持分钟数据，返回空
-        self.logger.warning("Minute data not supported by legacy system")
-        return None
+        if self.minute_fetcher is None:
+            self.logger.warning("Minute data not available")
+            return None
+        
+        try:
+            # 优先使用盘中追加日志的当天分时，没有时读取分钟线文件
+            minute_df = self.minute_fetcher.get_intraday_df(stock_code)
+            if minute_df is None or minute_df.empty:
+                minute_df = self.minute_fetcher.get_minute_df(stock_code)
+            if minute_df is None or minute_df.empty:
+                return None
+            return minute_df.tail(minutes).reset_index(drop=True)
+        except Exception as e:
+            self.logger.error(f"Failed to get minute data for {stock_code}: {e}")
+            return None
     
+    def refresh_intraday(self, stock_codes: List[str], concurrency: int = 10) -> int:
+        """
+        盘中刷新当天分时：拉取当天 1 分钟分时并把新分钟追加到盘中日志
+
+        Args:
+            stock_codes: 股票代码列表
+            concurrency: 并发请求数
+
+        Returns:
+            本次追加的分钟数
+        """
+        if self.minute_fetcher is None:
+            raise ImportError("minute_fetcher not available")
+        return self.minute_fetcher.update_intraday(stock_codes, use_proxy_and_concurrent=concurrency)
+
+    def get_intraday_since(self, stock_code: str, since: Optional[str] = None,
+                           trade_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        获取当天分时中不早于 since 的分钟（含 since 本身），供增量计算使用
+
+        Args:
+            stock_code: 股票代码
+            since: 起始分钟（"YYYY-MM-DD HH:MM"），None 表示全部
+            trade_date: 交易日（YYYYMMDD），None 表示盘中日志中最近的交易日
+
+        Returns:
+            分时数据（时间/开盘/收盘/最高/最低/成交量/成交额/均价）
+        """
+        if self.minute_fetcher is None:
+            return pd.DataFrame()
+        return self.minute_fetcher.intraday_log.rows_since(stock_code, since, trade_date)
+
+    def get_intraday_trade_date(self) -> Optional[str]:
+        """盘中日志中最近的交易日（YYYYMMDD），没有日志时返回 None"""
+        if self.minute_fetcher is None:
+            return None
+        return self.minute_fetcher.intraday_log.latest_trade_date()
+
     def get_concept_data(self, stock_code: str) -> Optional[pd.DataFrame]:
         """
         获取概念板块数据
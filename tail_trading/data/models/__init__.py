@@ -4,15 +4,23 @@
 包含系统中使用的所有数据模型
 """
 
-from .stock import Stock, DailyData, TechnicalIndicators, SelectionResult
-from .stock import StockStatus, TradeAction, PositionStatus
+from typing import TYPE_CHECKING
+from ..._lazy import lazy_exports
 
-__all__ = [
-    "Stock",
-    "DailyData", 
-    "TechnicalIndicators",
-    "SelectionResult",
-    "StockStatus",
-    "TradeAction",
-    "PositionStatus"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "Stock": ".stock",
+    "DailyData": ".stock",
+    "TechnicalIndicators": ".stock",
+    "SelectionResult": ".stock",
+    "StockStatus": ".stock",
+    "TradeAction": ".stock",
+    "PositionStatus": ".stock",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .stock import Stock, DailyData, TechnicalIndicators, SelectionResult, StockStatus, TradeAction, PositionStatus
@@ -4,8 +4,26 @@
 包含各种交易策略的实现
 """
 
-from .tail_up_strategy import TailUpStrategy
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
 
-__all__ = [
-    "TailUpStrategy"
-]
+# 名称 -> 所在子模块，首次访问时才导入
+_EXPORTS = {
+    "TailUpStrategy": ".tail_up_strategy",
+    "TailUpBatchScorer": ".tail_up_vectorized",
+    "TailUpBacktester": ".tail_up_backtest",
+    "BacktestResult": ".tail_up_backtest",
+    "ParameterSweep": ".tail_up_sweep",
+    "TailWindowScanner": ".tail_window_scanner",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .tail_up_strategy import TailUpStrategy
+    from .tail_up_vectorized import TailUpBatchScorer
+    from .tail_up_backtest import TailUpBacktester, BacktestResult
+    from .tail_up_sweep import ParameterSweep
+    from .tail_window_scanner import TailWindowScanner
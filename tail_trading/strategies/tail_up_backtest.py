@@ -0,0 +1,304 @@
+"""
+尾盘上涨策略 - 历史回测引擎
+
+按交易日回放日线库中的历史数据：每个交易日只用截至当日的 lookback_days 根日线，
+以 TailUpBatchScorer 计算评分并应用选股条件（与 select_stocks 一致，无未来数据），
+收盘买入、次日按 TradingConfig 的止损/止盈规则卖出，统计胜率、收益和回撤
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..config.trading_config import TradingConfig
+from ..config.logging_config import get_logger
+from .tail_up_vectorized import TailUpBatchScorer, PANEL_FIELDS
+
+# 每批评分的 (股票, 交易日) 窗口数，控制内存占用
+CHUNK_SIZE = 100_000
+
+# 特征表中与配置无关的技术指标（见 TailUpBatchScorer.features）
+FEATURE_FIELDS = ["pct_chg", "volume_ratio", "close", "upper_shadow", "lower_shadow",
+                  "body_length", "position_ratio", "ma3_slope", "invalid"]
+
+FEATURE_DTYPE = np.dtype(
+    [("code", "U6"), ("date", "i4"), ("next_date", "i4")]
+    + [(name, "?" if name == "invalid" else "f8") for name in FEATURE_FIELDS]
+    + [(f"next_{name}", "f8") for name in ("open", "high", "low", "close")]
+)
+
+# 年化收益按每年交易日数计算
+TRADING_DAYS_PER_YEAR = 242
+
+@dataclass
+class BacktestResult:
+    """回测结果"""
+
+    trades: pd.DataFrame                      # 全部入选信号及其次日收益
+    daily: pd.DataFrame                       # 按信号日汇总的组合收益、净值和回撤
+    summary: Dict[str, Any] = field(default_factory=dict)
+    probability_buckets: pd.DataFrame = None  # 按次日补涨概率分档的胜率和平均收益
+
+class TailUpBacktester:
+    """
+    尾盘上涨策略回测器
+
+    全部 (股票, 交易日) 评分窗口按批次整体计算，组合按信号日逐日回放：
+    每个信号日按次日补涨概率取前 max_positions 只，单只仓位 max_single_position，
+    次日卖出后资金可用于当日尾盘的新信号
+    """
+
+    def __init__(self, config: TradingConfig = None, data_fetcher=None,
+                 max_positions: Optional[int] = None, round_trip_cost: float = 0.0):
+        """
+        初始化回测器
+
+        Args:
+            config: 交易配置
+            data_fetcher: 数据获取器（需提供 get_daily_history），默认在首次读取时创建东方财富数据获取器
+            max_positions: 每个信号日最多买入的股票数，默认 max_total_position / max_single_position
+            round_trip_cost: 单笔买卖合计成本（如 0.0015 表示 0.15%）
+        """
+        self.config = config or TradingConfig()
+        self.logger = get_logger("strategy.TailUpBacktester")
+        self.data_fetcher = data_fetcher
+        self.max_positions = max_positions or max(
+            1, int(round(self.config.max_total_position / self.config.max_single_position))
+        )
+        self.round_trip_cost = round_trip_cost
+        self.scorer = TailUpBatchScorer(self.config)
+
+    @staticmethod
+    def _to_int_date(value) -> Optional[int]:
+        """'2024-01-02' / '20240102' / datetime -> 20240102"""
+        if value is None:
+            return None
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        return int(pd.Timestamp(value).strftime("%Y%m%d"))
+
+    def compute_features(self, bars: np.ndarray, start=None, end=None) -> np.ndarray:
+        """
+        计算每个 (股票, 交易日) 的技术指标及次日价格，只依赖 lookback_days 和 volume_ma_period，
+        同一特征表可用于这两个参数相同的任意配置
+
+        Args:
+            bars: 结构化日线数组（按 (code, date) 排序，见 DailyBarStore.load_history）
+            start: 信号起始日期（含）
+            end: 信号结束日期（含）
+
+        Returns:
+            FEATURE_DTYPE 结构化数组，每行一个有次日数据的候选信号
+        """
+        lookback = self.config.lookback_days
+        n = len(bars)
+        if n == 0:
+            return np.empty(0, dtype=FEATURE_DTYPE)
+
+        codes = bars["code"]
+        dates = bars["date"]
+        # 每行在该股票内的序号，用于判断回看窗口是否足够、次日是否存在
+        new_stock = np.r_[True, codes[1:] != codes[:-1]]
+        starts = np.maximum.accumulate(np.where(new_stock, np.arange(n), 0))
+        pos = np.arange(n) - starts
+        has_next = np.r_[~new_stock[1:], False]
+
+        candidate = (pos >= lookback - 1) & has_next
+        start, end = self._to_int_date(start), self._to_int_date(end)
+        if start is not None:
+            candidate &= dates >= start
+        if end is not None:
+            candidate &= dates <= end
+        rows = np.flatnonzero(candidate)
+
+        columns = {name: np.asarray(bars[name]) for name in PANEL_FIELDS}
+        offsets = np.arange(lookback) - (lookback - 1)
+        out = np.empty(len(rows), dtype=FEATURE_DTYPE)
+        for i in range(0, len(rows), CHUNK_SIZE):
+            chunk = rows[i:i + CHUNK_SIZE]
+            window = chunk[:, None] + offsets[None, :]
+            features = self.scorer.features({name: values[window] for name, values in columns.items()})
+            part = out[i:i + len(chunk)]
+            for name in FEATURE_FIELDS:
+                value = features[name]
+                part[name] = np.nan if value is None else value
+        nxt = rows + 1
+        out["code"] = codes[rows]
+        out["date"] = dates[rows]
+        out["next_date"] = dates[nxt]
+        for name in ("open", "high", "low", "close"):
+            out[f"next_{name}"] = columns[name][nxt]
+        return out
+
+    def generate_trades(self, features: np.ndarray) -> pd.DataFrame:
+        """
+        按当前配置对特征表评分、筛选，并模拟次日交易
+
+        Args:
+            features: compute_features 返回的特征表
+
+        Returns:
+            入选信号 DataFrame（信号日期、代码、评分、买卖价格、收益率、卖出原因）
+        """
+        if len(features) == 0:
+            return pd.DataFrame()
+        f = {name: np.asarray(features[name]) for name in FEATURE_FIELDS}
+        risk = self.scorer.risk_scores(f["position_ratio"], f["volume_ratio"], f["pct_chg"],
+                                       f["upper_shadow"], f["body_length"])
+        mask = self.scorer.selection_mask({
+            "涨跌幅": f["pct_chg"], "量比": f["volume_ratio"], "实体长度": f["body_length"],
+            "上影线": f["upper_shadow"], "下影线": f["lower_shadow"],
+            "position_ratio": f["position_ratio"], "风险评分": risk,
+        }) & ~f["invalid"]
+
+        selected = features[mask]
+        if len(selected) == 0:
+            return pd.DataFrame()
+        # 次日补涨概率只对入选信号计算
+        prob = self.scorer.probability_scores(
+            selected["pct_chg"], selected["volume_ratio"], selected["lower_shadow"], selected["body_length"],
+            selected["position_ratio"], selected["ma3_slope"] if self.config.lookback_days >= 6 else None,
+        )
+        trades = pd.DataFrame({
+            "信号日期": selected["date"],
+            "卖出日期": selected["next_date"],
+            "代码": selected["code"].astype(str),
+            "次日补涨概率": prob,
+            "风险评分": risk[mask].astype(int),
+            "涨跌幅": selected["pct_chg"],
+        })
+        for name, values in self._simulate_exit(selected).items():
+            trades[name] = values
+        # 次日价格缺失的信号无法成交
+        return trades[np.isfinite(trades["收益率"].to_numpy())].reset_index(drop=True)
+
+    def _simulate_exit(self, selected: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        收盘买入、次日卖出：
+        开盘即跌破止损价/突破止盈价按开盘价成交；盘中触及止损按止损价、触及止盈按止盈价成交
+        （同一天两者都触及时按先止损处理）；都未触及则按次日收盘价卖出
+        """
+        buy = selected["close"]
+        open_, high, low, close = (selected[f"next_{name}"] for name in ("open", "high", "low", "close"))
+        stop = buy * (1 + self.config.stop_loss_ratio)
+        target = buy * (1 + self.config.take_profit_ratio)
+
+        gap_stop = open_ <= stop
+        gap_target = ~gap_stop & (open_ >= target)
+        hit_stop = ~gap_stop & ~gap_target & (low <= stop)
+        hit_target = ~gap_stop & ~gap_target & ~hit_stop & (high >= target)
+        sell = np.select(
+            [gap_stop | gap_target, hit_stop, hit_target],
+            [open_, stop, target],
+            close,
+        )
+        reason = np.select(
+            [gap_stop, gap_target, hit_stop, hit_target],
+            ["开盘止损", "开盘止盈", "止损", "止盈"],
+            "收盘卖出",
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = sell / buy - 1 - self.round_trip_cost
+        return {"买入价": buy, "卖出价": sell, "收益率": ret, "卖出原因": reason}
+
+    def simulate_portfolio(self, trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        按信号日逐日回放组合：每日取次日补涨概率最高的 max_positions 只等仓位买入
+
+        Returns:
+            每个信号日的持仓数、组合收益、净值和回撤
+        """
+        if trades.empty:
+            return pd.DataFrame(columns=["信号日期", "持仓数", "组合收益", "净值", "回撤"])
+        ranked = trades.sort_values(["信号日期", "次日补涨概率", "代码"], ascending=[True, False, True])
+        ranked = ranked[ranked.groupby("信号日期").cumcount() < self.max_positions]
+        weight = self.config.max_single_position
+        daily = ranked.groupby("信号日期").agg(持仓数=("代码", "size"), 组合收益=("收益率", "sum"))
+        daily["组合收益"] *= weight
+        daily["净值"] = (1 + daily["组合收益"]).cumprod()
+        daily["回撤"] = daily["净值"] / daily["净值"].cummax().clip(lower=1.0) - 1
+        return daily.reset_index()
+
+    def probability_buckets(self, trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        按 TradingConfig 的概率阈值分档，统计每档信号的次日胜率和平均收益
+        """
+        cfg = self.config
+        bins = [-np.inf, cfg.low_prob_threshold, cfg.medium_prob_threshold, cfg.high_prob_threshold, np.inf]
+        labels = [f"<{cfg.low_prob_threshold}", f"{cfg.low_prob_threshold}-{cfg.medium_prob_threshold}",
+                  f"{cfg.medium_prob_threshold}-{cfg.high_prob_threshold}", f">={cfg.high_prob_threshold}"]
+        bucket = pd.cut(trades["次日补涨概率"], bins=bins, labels=labels, right=False)
+        grouped = trades.groupby(bucket, observed=False)["收益率"]
+        return pd.DataFrame({
+            "信号数": grouped.size(),
+            "胜率": grouped.apply(lambda r: (r > 0).mean() if len(r) else np.nan),
+            "平均收益": grouped.mean(),
+            "收益中位数": grouped.median(),
+        }).rename_axis("概率档位").reset_index()
+
+    def summarize(self, trades: pd.DataFrame, daily: pd.DataFrame) -> Dict[str, Any]:
+        """汇总回测指标"""
+        if trades.empty:
+            return {"信号数": 0}
+        ret = trades["收益率"]
+        wins, losses = ret[ret > 0], ret[ret <= 0]
+        days = len(daily)
+        final = float(daily["净值"].iloc[-1])
+        annual = final ** (TRADING_DAYS_PER_YEAR / days) - 1 if days else 0.0
+        return {
+            "开始日期": int(trades["信号日期"].min()),
+            "结束日期": int(trades["信号日期"].max()),
+            "信号日数": days,
+            "信号数": len(trades),
+            "信号胜率": float((ret > 0).mean()),
+            "信号平均收益": float(ret.mean()),
+            "平均盈利": float(wins.mean()) if len(wins) else 0.0,
+            "平均亏损": float(losses.mean()) if len(losses) else 0.0,
+            "盈亏比": float(wins.sum() / -losses.sum()) if losses.sum() < 0 else float("inf"),
+            "概率收益相关性": float(trades["次日补涨概率"].rank().corr(ret.rank())),
+            "组合日胜率": float((daily["组合收益"] > 0).mean()),
+            "累计收益": final - 1,
+            "年化收益": annual,
+            "最大回撤": float(daily["回撤"].min()),
+            "卖出原因": trades["卖出原因"].value_counts().to_dict(),
+        }
+
+    def run(self, start=None, end=None, stock_codes: Optional[List[str]] = None) -> BacktestResult:
+        """
+        运行回测
+
+        Args:
+            start: 信号起始日期（如 "2023-01-01"），None 表示从最早可用日期开始
+            end: 信号结束日期，None 表示到最后一个有次日数据的交易日
+            stock_codes: 股票池，None 表示日线库中的全部股票
+
+        Returns:
+            回测结果
+        """
+        t_start = datetime.now()
+        bars = self.load_history(stock_codes)
+        self.logger.info(f"Loaded {len(bars)} daily bars for backtest")
+
+        trades = self.generate_trades(self.compute_features(bars, start, end))
+        return self.evaluate(trades, t_start)
+
+    def load_history(self, stock_codes: Optional[List[str]] = None) -> np.ndarray:
+        """读取历史日线（数据获取器在首次使用时创建）"""
+        if self.data_fetcher is None:
+            from ..data.eastmoney.daily_fetcher import EastmoneyDataFetcher
+            self.data_fetcher = EastmoneyDataFetcher()
+        return self.data_fetcher.get_daily_history(stock_codes)
+
+    def evaluate(self, trades: pd.DataFrame, t_start: datetime = None) -> BacktestResult:
+        """由信号明细生成组合净值和统计结果"""
+        t_start = t_start or datetime.now()
+        daily = self.simulate_portfolio(trades)
+        result = BacktestResult(
+            trades=trades,
+            daily=daily,
+            summary=self.summarize(trades, daily),
+            probability_buckets=self.probability_buckets(trades) if not trades.empty else pd.DataFrame(),
+        )
+        result.summary["耗时"] = round((datetime.now() - t_start).total_seconds(), 2)
+        return result
@@ -10,6 +10,7 @@ from datetime import datetime
 from ..core.strategy import BaseStrategy
 from ..config.trading_config import TradingConfig
 from ..data.eastmoney.daily_fetcher import EastmoneyDataFetcher
+from .tail_up_vectorized import TailUpBatchScorer, PANEL_FIELDS
 
 class TailUpStrategy(BaseStrategy):
     """
@@ -34,12 +35,13 @@ class TailUpStrategy(BaseStrategy):
         super().__init__(config)
         self.data_fetcher = EastmoneyDataFetcher()
         
-    def select_stocks(self, stocks_data: pd.DataFrame = None) -> pd.DataFrame:
+    def select_stocks(self, stocks_data: pd.DataFrame = None, vectorized: bool = True) -> pd.DataFrame:
         """
         选择股票
         
         Args:
             stocks_data: 股票数据（如果为None，则自动获取）
+            vectorized: 是否使用全市场向量化评分（False 时逐股分析，结果一致）
             
         Returns:
             选中的股票数据
@@ -56,15 +58,74 @@ class TailUpStrategy(BaseStrategy):
         if "名称" in stocks_data.columns:
             stock_names = dict(zip(stocks_data["代码"], stocks_data["名称"]))
         
-        # 统计信息
         total_stocks = len(stocks_data)
-        no_data_count = 0
-        analysis_failed_count = 0
-        criteria_failed_count = 0
-        success_count = 0
-        
         print(f"📊 开始分析 {total_stocks} 只股票...")
         
+        if vectorized:
+            result, stats = self._select_vectorized(stocks_data, stock_names)
+        else:
+            result, stats = self._select_per_stock(stocks_data, stock_names)
+        
+        # 打印统计结果
+        print(f"\n📈 筛选统计结果:")
+        print(f"  📊 总股票数: {total_stocks}")
+        print(f"  ❌ 数据不足: {stats['no_data']} ({stats['no_data']/total_stocks*100:.1f}%)")
+        print(f"  🔧 分析失败: {stats['analysis_failed']} ({stats['analysis_failed']/total_stocks*100:.1f}%)")
+        print(f"  🚫 不符合条件: {stats['criteria_failed']} ({stats['criteria_failed']/total_stocks*100:.1f}%)")
+        print(f"  ✅ 符合条件: {stats['success']} ({stats['success']/total_stocks*100:.1f}%)")
+        
+        if result.empty:
+            return pd.DataFrame()
+        
+        return result.sort_values(by="次日补涨概率", ascending=False).reset_index(drop=True)
+    
+    def _select_vectorized(self, stocks_data: pd.DataFrame, stock_names: Dict[str, str]):
+        """
+        全市场向量化选股：一次读取 (股票数 × 回看天数) 面板，整体计算评分和筛选条件
+        
+        Returns:
+            (符合条件的股票 DataFrame，统计信息)
+        """
+        all_codes = stocks_data["代码"].astype(str).tolist()
+        codes, panel = self.data_fetcher.get_daily_panel(
+            all_codes, days=self.config.lookback_days, fields=PANEL_FIELDS
+        )
+        
+        scorer = TailUpBatchScorer(self.config)
+        analysis, invalid = scorer.analyze(codes, panel)
+        selected = scorer.selection_mask(analysis) & ~invalid
+        
+        # 保持输入顺序，与逐股路径排序前的顺序一致
+        order = {code: i for i, code in enumerate(codes)}
+        names = {str(code): name for code, name in stock_names.items()}
+        rows = [order[code] for code in all_codes if code in order and selected[order[code]]]
+        result = analysis.iloc[rows].reset_index(drop=True)
+        result.insert(1, "名称", [names.get(code, "") for code in result["代码"]])
+        result["风险评分"] = result["风险评分"].astype(int)
+        
+        stats = {
+            "no_data": len(stocks_data) - len(codes),
+            "analysis_failed": int(invalid.sum()),
+            "criteria_failed": int((~invalid & ~selected).sum()),
+            "success": int(selected.sum()),
+        }
+        return result, stats
+    
+    def _select_per_stock(self, stocks_data: pd.DataFrame, stock_names: Dict[str, str]):
+        """
+        逐股选股（向量化路径的参照实现）
+        
+        Returns:
+            (符合条件的股票 DataFrame，统计信息)
+        """
+        total_stocks = len(stocks_data)
+        stats = {"no_data": 0, "analysis_failed": 0, "criteria_failed": 0, "success": 0}
+        
+        # 一次性批量读取全部股票的日线
+        daily_data = self.data_fetcher.get_batch_data(
+            stocks_data["代码"].astype(str).tolist(), days=self.config.lookback_days
+        )
+        
         result = []
         
         for i, (_, row) in enumerate(stocks_data.iterrows()):
@@ -77,52 +138,32 @@ class TailUpStrategy(BaseStrategy):
             
             try:
                 # 获取日线数据
-                daily_df = self.data_fetcher.get_daily_data(code, days=self.config.lookback_days)
+                daily_df = daily_data.get(str(code))
                 
                 if daily_df is None or daily_df.empty or len(daily_df) < self.config.lookback_days:
-                    no_data_count += 1
+                    stats["no_data"] += 1
                     continue
                 
                 # 分析股票
                 stock_analysis = self._analyze_stock(code, daily_df, name)
                 
                 if stock_analysis is None:
-                    analysis_failed_count += 1
+                    stats["analysis_failed"] += 1
                     continue
                 
                 # 应用选股条件
                 if self._meets_selection_criteria(stock_analysis):
                     result.append(stock_analysis)
-                    success_count += 1
+                    stats["success"] += 1
                 else:
-                    criteria_failed_count += 1
+                    stats["criteria_failed"] += 1
                     
             except Exception as e:
                 self.logger.error(f"Error analyzing stock {code}: {e}")
-                analysis_failed_count += 1
+                stats["analysis_failed"] += 1
                 continue
         
-        # 打印统计结果
-        print(f"\n📈 筛选统计结果:")
-        print(f"  📊 总股票数: {total_stocks}")
-        print(f"  ❌ 数据不足: {no_data_count} ({no_data_count/total_stocks*100:.1f}%)")
-        print(f"  🔧 分析失败: {analysis_failed_count} ({analysis_failed_count/total_stocks*100:.1f}%)")
-        print(f"  🚫 不符合条件: {criteria_failed_count} ({criteria_failed_count/total_stocks*100:.1f}%)")
-        print(f"  ✅ 符合条件: {success_count} ({success_count/total_stocks*100:.1f}%)")
-        
-        if not result:
-            return pd.DataFrame()
-        
-        # 转换为DataFrame并排序
-        df = pd.DataFrame(result)
-        return df.sort_values(by="次日补涨概率", ascending=False).reset_index(drop=True)
-        
-        if not result:
-            return pd.DataFrame()
-        
-        # 转换为DataFrame并排序
-        df = pd.DataFrame(result)
-        return df.sort_values(by="次日补涨概率", ascending=False).reset_index(drop=True)
+        return pd.DataFrame(result), stats
     
     def _analyze_stock(self, code: str, daily_df: pd.DataFrame, name: str = "") -> Dict[str, Any]:
         """
@@ -0,0 +1,181 @@
+"""
+尾盘上涨策略 - 参数扫描
+
+对 TradingConfig 字段做网格或随机搜索，每组参数在历史区间上回测并排名。
+与配置无关的技术指标按 (lookback_days, volume_ma_period) 只计算一次并写入特征文件，
+进程池中的各个工作进程以内存映射方式共享读取，每组参数只做评分、筛选和交易模拟
+"""
+
+import os
+import shutil
+import tempfile
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..config.trading_config import TradingConfig
+from ..config.logging_config import get_logger
+from .tail_up_backtest import TailUpBacktester
+
+# 决定特征表的配置字段，这些字段不同的参数组需要各自的特征文件
+FEATURE_KEYS = ("lookback_days", "volume_ma_period")
+
+# 结果表中保留的回测指标
+RESULT_METRICS = [
+    "信号数", "信号胜率", "信号平均收益", "盈亏比", "概率收益相关性",
+    "组合日胜率", "累计收益", "年化收益", "最大回撤",
+]
+
+# 工作进程内已映射的特征文件
+_worker_features = {}
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    网格展开：{字段: [取值...]} -> [{字段: 取值}...]
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def random_configs(space: Dict[str, Any], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    随机搜索：space 中每个字段为 (下限, 上限) 区间或候选值列表
+
+    int 字段的区间按整数均匀采样，其余按浮点均匀采样
+    """
+    rng = np.random.default_rng(seed)
+    types = {f.name: f.type for f in fields(TradingConfig)}
+    result = []
+    for _ in range(n):
+        overrides = {}
+        for key, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high = spec
+                if types.get(key) in (int, "int"):
+                    overrides[key] = int(rng.integers(low, high + 1))
+                else:
+                    overrides[key] = round(float(rng.uniform(low, high)), 4)
+            else:
+                overrides[key] = spec[int(rng.integers(len(spec)))]
+        result.append(overrides)
+    return result
+
+def _load_features(path: str) -> np.ndarray:
+    features = _worker_features.get(path)
+    if features is None:
+        features = np.load(path, mmap_mode="r")
+        _worker_features[path] = features
+    return features
+
+def _evaluate(task) -> Dict[str, Any]:
+    """在工作进程中回测一组参数"""
+    index, overrides, base, features_path, max_positions, round_trip_cost = task
+    config = replace(TradingConfig.from_dict(base), **overrides)
+    backtester = TailUpBacktester(config, max_positions=max_positions, round_trip_cost=round_trip_cost)
+    features = _load_features(features_path)
+    summary = backtester.evaluate(backtester.generate_trades(features)).summary
+    row = {"编号": index, **overrides}
+    row.update({metric: summary.get(metric, 0 if metric == "信号数" else np.nan) for metric in RESULT_METRICS})
+    return row
+
+class ParameterSweep:
+    """
+    TradingConfig 参数扫描器
+    """
+
+    def __init__(self, base_config: TradingConfig = None, data_fetcher=None, max_workers: Optional[int] = None,
+                 max_positions: Optional[int] = None, round_trip_cost: float = 0.0, work_dir: Optional[str] = None):
+        """
+        初始化参数扫描器
+
+        Args:
+            base_config: 基础配置，各参数组在其上覆盖字段
+            data_fetcher: 数据获取器（需提供 get_daily_history）
+            max_workers: 进程数，默认 CPU 核数
+            max_positions: 每个信号日最多买入的股票数
+            round_trip_cost: 单笔买卖合计成本
+            work_dir: 特征文件目录，默认临时目录（扫描结束后删除）
+        """
+        self.base_config = base_config or TradingConfig()
+        self.data_fetcher = data_fetcher
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_positions = max_positions
+        self.round_trip_cost = round_trip_cost
+        self.work_dir = work_dir
+        self.logger = get_logger("strategy.ParameterSweep")
+
+    def _prepare_features(self, configs: List[Dict[str, Any]], bars: np.ndarray, start, end, work_dir: str) -> Dict[tuple, str]:
+        """为每种 (lookback_days, volume_ma_period) 计算一次特征表并写入文件"""
+        paths = {}
+        base = self.base_config.to_dict()
+        for overrides in configs:
+            key = tuple(overrides.get(k, base[k]) for k in FEATURE_KEYS)
+            if key in paths:
+                continue
+            config = replace(self.base_config, **dict(zip(FEATURE_KEYS, key)))
+            features = TailUpBacktester(config).compute_features(bars, start, end)
+            path = os.path.join(work_dir, "features_{}_{}.npy".format(*key))
+            np.save(path, features)
+            paths[key] = path
+            self.logger.info(f"Computed {len(features)} feature rows for lookback/volume_ma={key}")
+        return paths
+
+    def run(self, configs: List[Dict[str, Any]], start=None, end=None, stock_codes: Optional[List[str]] = None,
+            sort_by: str = "累计收益") -> pd.DataFrame:
+        """
+        回测全部参数组并按 sort_by 降序排名
+
+        Args:
+            configs: 参数组列表，每组为 {TradingConfig 字段: 取值}
+            start: 信号起始日期
+            end: 信号结束日期
+            stock_codes: 股票池，None 表示日线库全部股票
+            sort_by: 排名指标（见 RESULT_METRICS）
+
+        Returns:
+            排名结果表（参数字段 + 回测指标）
+        """
+        unknown = {k for overrides in configs for k in overrides} - {f.name for f in fields(TradingConfig)}
+        if unknown:
+            raise ValueError(f"Unknown TradingConfig fields: {sorted(unknown)}")
+        if not configs:
+            return pd.DataFrame()
+
+        t_start = datetime.now()
+        backtester = TailUpBacktester(self.base_config, data_fetcher=self.data_fetcher)
+        bars = backtester.load_history(stock_codes)
+        self.data_fetcher = backtester.data_fetcher
+
+        work_dir = self.work_dir or tempfile.mkdtemp(prefix="tail_up_sweep_")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            paths = self._prepare_features(configs, bars, start, end, work_dir)
+            del bars
+            base = self.base_config.to_dict()
+            tasks = [
+                (i, overrides, base, paths[tuple(overrides.get(k, base[k]) for k in FEATURE_KEYS)],
+                 self.max_positions, self.round_trip_cost)
+                for i, overrides in enumerate(configs)
+            ]
+            if self.max_workers > 1 and len(tasks) > 1:
+                chunksize = max(1, len(tasks) // (self.max_workers * 4))
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    rows = list(executor.map(_evaluate, tasks, chunksize=chunksize))
+            else:
+                rows = [_evaluate(task) for task in tasks]
+        finally:
+            if self.work_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        elapsed = (datetime.now() - t_start).total_seconds()
+        self.logger.info(f"Evaluated {len(configs)} configs in {elapsed:.1f}s")
+        result = pd.DataFrame(rows)
+        # 未在某组参数中出现的字段按基础配置取值
+        keys = list(dict.fromkeys(k for overrides in configs for k in overrides))
+        for key in keys:
+            result[key] = result[key].fillna(base[key]).astype(type(base[key]))
+        result["信号数"] = result["信号数"].astype(int)
+        result = result[["编号"] + keys + RESULT_METRICS]
+        return result.sort_values(sort_by, ascending=False, na_position="last").reset_index(drop=True)
@@ -0,0 +1,232 @@
+"""
+尾盘上涨策略 - 全市场向量化评分引擎
+
+将 TailUpStrategy 的逐股分析改为对 (股票数 × 回看天数) 二维面板的整体 numpy 运算，
+指标、评分、风险和筛选条件与逐股路径逐项对应，结果一致
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from ..config.trading_config import TradingConfig
+
+# 评分所需的日线字段
+PANEL_FIELDS = ["open", "close", "high", "low", "volume", "pct_chg"]
+
+class TailUpBatchScorer:
+    """
+    尾盘上涨策略批量评分器
+
+    输入 get_daily_panel 返回的面板，一次性计算全部股票的：
+    量比、上下影线、实体、20日位置、MA3 斜率、次日补涨概率、风险评分和筛选结果
+    """
+
+    def __init__(self, config: TradingConfig):
+        """
+        初始化评分器
+
+        Args:
+            config: 交易配置
+        """
+        self.config = config
+
+    def features(self, panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        计算与配置权重/阈值无关的技术指标
+
+        Args:
+            panel: {字段: ndarray(股票数, 回看天数)}
+
+        Returns:
+            {指标名: ndarray(股票数)}，含 invalid（价格/成交量含缺失值的行掩码）；
+            回看天数不足 6 天时 ma3_slope 为 None
+        """
+        cfg = self.config
+        close = np.asarray(panel["close"], dtype=np.float64)
+        high = np.asarray(panel["high"], dtype=np.float64)
+        low = np.asarray(panel["low"], dtype=np.float64)
+        open_ = np.asarray(panel["open"], dtype=np.float64)
+        volume = np.asarray(panel["volume"])
+        pct_chg = np.asarray(panel["pct_chg"], dtype=np.float64)[:, -1]
+
+        invalid = (np.isnan(close).any(axis=1) | np.isnan(high).any(axis=1) |
+                   np.isnan(low).any(axis=1) | np.isnan(open_).any(axis=1))
+        if volume.dtype.kind == "f":
+            invalid |= np.isnan(volume).any(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # 量比
+            today_vol = volume[:, -1]
+            avg_vol = volume[:, -cfg.volume_ma_period:].mean(axis=1)
+            volume_ratio = np.where(avg_vol > 0, today_vol / avg_vol, 0.0)
+
+            # 影线与实体
+            today_open, today_close = open_[:, -1], close[:, -1]
+            upper_shadow = high[:, -1] - np.maximum(today_open, today_close)
+            lower_shadow = np.minimum(today_open, today_close) - low[:, -1]
+            body_length = np.abs(today_close - today_open)
+            shadow_ratio = np.where(body_length > 0, lower_shadow / body_length, 0.0)
+
+            # 20日位置
+            high_20 = high[:, -20:].max(axis=1)
+            low_20 = low[:, -20:].min(axis=1)
+            position_ratio = np.where(high_20 > low_20, (today_close - low_20) / (high_20 - low_20), 0.0)
+
+            # MA3 斜率（回看天数不足 6 天时不计趋势分）
+            if close.shape[1] >= 6:
+                ma3_today = close[:, -3:].mean(axis=1)
+                ma3_3days_ago = close[:, -6:-3].mean(axis=1)
+                ma3_slope = (ma3_today - ma3_3days_ago) / ma3_3days_ago * 100
+            else:
+                ma3_slope = None
+
+        return {
+            "pct_chg": pct_chg,
+            "volume_ratio": volume_ratio,
+            "close": today_close,
+            "upper_shadow": upper_shadow,
+            "lower_shadow": lower_shadow,
+            "body_length": body_length,
+            "shadow_ratio": shadow_ratio,
+            "position_ratio": position_ratio,
+            "ma3_slope": ma3_slope,
+            "invalid": invalid,
+        }
+
+    def analyze(self, codes: List[str], panel: Dict[str, np.ndarray]) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        计算全部股票的技术指标和评分
+
+        Args:
+            codes: 股票代码列表（与面板行对应）
+            panel: {字段: ndarray(股票数, 回看天数)}
+
+        Returns:
+            (指标 DataFrame，列名同 TailUpStrategy._analyze_stock；价格/成交量含缺失值的行掩码)
+        """
+        f = self.features(panel)
+        prob_score = self.probability_scores(f["pct_chg"], f["volume_ratio"], f["lower_shadow"],
+                                             f["body_length"], f["position_ratio"], f["ma3_slope"])
+        risk_score = self.risk_scores(f["position_ratio"], f["volume_ratio"], f["pct_chg"],
+                                      f["upper_shadow"], f["body_length"])
+
+        df = pd.DataFrame({
+            "代码": codes,
+            "涨跌幅": f["pct_chg"],
+            "量比": f["volume_ratio"],
+            "收盘价": f["close"],
+            "上影线": f["upper_shadow"],
+            "下影线": f["lower_shadow"],
+            "实体长度": f["body_length"],
+            "影线比": f["shadow_ratio"],
+            "20日位置": f["position_ratio"] * 100,
+            "次日补涨概率": prob_score,
+            "position_ratio": f["position_ratio"],
+            "volume_ratio": f["volume_ratio"],
+            "pct_chg": f["pct_chg"],
+            "upper_shadow": f["upper_shadow"],
+            "body_length": f["body_length"],
+            "lower_shadow": f["lower_shadow"],
+            "风险评分": risk_score,
+        })
+        return df, f["invalid"]
+
+    def probability_scores(self, pct_chg: np.ndarray, volume_ratio: np.ndarray,
+                           lower_shadow: np.ndarray, body_length: np.ndarray,
+                           position_ratio: np.ndarray, ma3_slope: np.ndarray = None) -> np.ndarray:
+        """
+        次日补涨概率评分，对应 TailUpStrategy._calculate_probability_score
+
+        Returns:
+            概率评分数组 (0-100)
+        """
+        cfg = self.config
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shadow_ratio = lower_shadow / body_length
+
+        # 各分项的累加顺序与逐股路径一致，保证浮点结果相同
+        score = np.zeros(len(pct_chg))
+
+        # 1. 涨跌幅评分
+        score += np.select(
+            [(2.0 <= pct_chg) & (pct_chg <= 4.0), (1.0 <= pct_chg) & (pct_chg < 2.0), (4.0 < pct_chg) & (pct_chg <= 6.0)],
+            [25 * cfg.price_weight, 20 * cfg.price_weight, 15 * cfg.price_weight],
+            0.0,
+        )
+
+        # 2. 量比评分
+        score += np.select(
+            [(1.5 <= volume_ratio) & (volume_ratio <= 2.5), (1.2 <= volume_ratio) & (volume_ratio < 1.5),
+             (2.5 < volume_ratio) & (volume_ratio <= 3.0)],
+            [25 * cfg.volume_weight, 20 * cfg.volume_weight, 15 * cfg.volume_weight],
+            10 * cfg.volume_weight,
+        )
+
+        # 3. 技术形态评分
+        has_body = body_length > 0
+        score += np.select(
+            [has_body & (shadow_ratio >= 0.8), has_body & (shadow_ratio >= 0.5), has_body & (shadow_ratio >= 0.2),
+             has_body, lower_shadow >= 0],
+            [25 * cfg.technical_weight, 20 * cfg.technical_weight, 15 * cfg.technical_weight,
+             10 * cfg.technical_weight, 20 * cfg.technical_weight],
+            15 * cfg.technical_weight,
+        )
+
+        # 4. 位置评分
+        score += np.select(
+            [position_ratio <= 0.4, position_ratio <= 0.6, position_ratio <= 0.8],
+            [20 * cfg.position_weight, 15 * cfg.position_weight, 10 * cfg.position_weight],
+            5 * cfg.position_weight,
+        )
+
+        # 5. 趋势评分
+        if ma3_slope is not None:
+            score += np.select([ma3_slope > 1, ma3_slope > 0], [5, 3], 0)
+
+        return np.minimum(score, 100)
+
+    @staticmethod
+    def risk_scores(position_ratio: np.ndarray, volume_ratio: np.ndarray, pct_chg: np.ndarray,
+                    upper_shadow: np.ndarray, body_length: np.ndarray) -> np.ndarray:
+        """
+        风险评分，对应 BaseStrategy.calculate_risk_score
+
+        Returns:
+            风险评分数组 (0-100, 越低越安全)
+        """
+        risk = np.select([position_ratio > 0.8, position_ratio > 0.6], [30, 15], 0)
+        risk += np.select([volume_ratio > 2.5, volume_ratio > 2.0], [25, 10], 0)
+        risk += np.select([pct_chg > 5, pct_chg > 4], [20, 10], 0)
+        risk += np.where(upper_shadow > body_length * 0.3, 15, 0)
+        return np.minimum(risk, 100)
+
+    def selection_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        选股条件，对应 TailUpStrategy._meets_selection_criteria
+
+        Args:
+            df: analyze 返回的指标 DataFrame（或含相同键的 {列名: ndarray}）
+
+        Returns:
+            满足全部条件的布尔掩码
+        """
+        cfg = self.config
+        pct_chg = np.asarray(df["涨跌幅"])
+        volume_ratio = np.asarray(df["量比"])
+        body_length = np.asarray(df["实体长度"])
+        upper_shadow = np.asarray(df["上影线"])
+        lower_shadow = np.asarray(df["下影线"])
+
+        # 条件1：涨跌幅在指定范围内
+        mask = (cfg.min_pct_chg <= pct_chg) & (pct_chg <= cfg.max_pct_chg)
+        # 条件2：量比在合理范围内
+        mask &= (cfg.min_volume_ratio <= volume_ratio) & (volume_ratio <= cfg.max_volume_ratio)
+        # 条件3：技术形态良好（小实体只限制上影线，正常实体要求下影线支撑且上影线不过长）
+        small_body_ok = ~(upper_shadow > 2.0)
+        normal_body_ok = ~(lower_shadow < upper_shadow * 0.8) & ~(upper_shadow > body_length * cfg.max_upper_shadow_ratio)
+        mask &= np.where(body_length <= 0.5, small_body_ok, normal_body_ok)
+        # 条件4：位置不能太高
+        mask &= ~(np.asarray(df["position_ratio"]) > cfg.max_position_ratio)
+        # 条件5：风险评分不能太高
+        mask &= ~(np.asarray(df["风险评分"]) > cfg.high_risk_threshold)
+        return mask
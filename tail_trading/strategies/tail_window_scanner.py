@@ -0,0 +1,296 @@
+"""
+尾盘实时扫描
+
+14:30-15:00 尾盘时段按固定间隔刷新候选股票的当天分时，增量计算：
+- 分时均价（VWAP）偏离
+- 尾盘放量（尾盘每分钟成交量 / 尾盘前每分钟成交量）
+- 日内高低位置
+- 尾盘涨幅（相对 14:30 收盘价）
+并原地更新排名看板。每只股票只维护累计量，每轮只处理新分钟
+"""
+
+import time
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..config.logging_config import get_logger
+from ..data.eastmoney.daily_fetcher import EastmoneyDataFetcher
+
+# 尾盘时段（分时时间为分钟结束时刻，14:30 这一分钟属于尾盘前）
+TAIL_START = "14:30"
+TAIL_END = "15:00"
+
+# 看板列
+BOARD_COLUMNS = ["代码", "名称", "最新价", "均价", "均价偏离", "尾盘量比", "日内位置", "尾盘涨幅",
+                 "尾盘评分", "信号", "更新时间"]
+
+# 尾盘评分权重
+SCORE_WEIGHTS = {"均价偏离": 0.3, "尾盘量比": 0.3, "日内位置": 0.2, "尾盘涨幅": 0.2}
+
+class TailWindowScanner:
+    """
+    尾盘实时扫描器
+
+    每只股票的状态分两部分：已确定的分钟累计量（成交额、成交量、最高、最低、尾盘前/尾盘成交量和分钟数、
+    14:30 收盘价），以及仍在形成中的最后一分钟（下一轮可能被更新，单独保存、不计入累计量）。
+    每轮从盘中日志读取不早于上次最后一分钟的分钟，只把新确定的分钟加入累计量，指标按股票整体向量计算。
+    """
+
+    def __init__(self, codes: List[str], names: Dict[str, str] = None,
+                 data_fetcher: EastmoneyDataFetcher = None, tail_start: str = TAIL_START):
+        """
+        初始化扫描器
+
+        Args:
+            codes: 候选股票代码
+            names: 代码 -> 名称
+            data_fetcher: 数据获取器
+            tail_start: 尾盘开始时间（HH:MM）
+        """
+        self.codes = [str(code) for code in codes]
+        self.names = {str(code): name for code, name in (names or {}).items()}
+        self.data_fetcher = data_fetcher or EastmoneyDataFetcher()
+        self.tail_start = tail_start
+        self.logger = get_logger("tail_window_scanner")
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.trade_date = None
+        self.board = pd.DataFrame(columns=BOARD_COLUMNS)
+        self._reset()
+
+    def _reset(self):
+        """清空全部累计量（新交易日开始时）"""
+        n = len(self.codes)
+        # 已确定分钟的累计量
+        self.amount = np.zeros(n)
+        self.volume = np.zeros(n)
+        self.high = np.full(n, -np.inf)
+        self.low = np.full(n, np.inf)
+        self.pre_volume = np.zeros(n)
+        self.pre_minutes = np.zeros(n)
+        self.tail_volume = np.zeros(n)
+        self.tail_minutes = np.zeros(n)
+        self.tail_base = np.full(n, np.nan)
+        # 形成中的最后一分钟
+        self.last_time: List[Optional[str]] = [None] * n
+        self.last_close = np.full(n, np.nan)
+        self.last_high = np.full(n, -np.inf)
+        self.last_low = np.full(n, np.inf)
+        self.last_volume = np.zeros(n)
+        self.last_amount = np.zeros(n)
+        self.last_avg_price = np.full(n, np.nan)
+        self.last_is_tail = np.zeros(n, dtype=bool)
+
+    # ---------- 增量更新 ----------
+    def _commit(self, i: int, minute: str, close: float, high: float, low: float,
+                volume: float, amount: float):
+        """把一分钟计入累计量"""
+        self.amount[i] += amount
+        self.volume[i] += volume
+        self.high[i] = max(self.high[i], high)
+        self.low[i] = min(self.low[i], low)
+        if minute <= self.tail_start:
+            self.pre_volume[i] += volume
+            self.pre_minutes[i] += 1
+            self.tail_base[i] = close
+        else:
+            self.tail_volume[i] += volume
+            self.tail_minutes[i] += 1
+
+    def ingest(self, code: str, rows: pd.DataFrame) -> int:
+        """
+        处理某只股票的分时（时间不早于上次最后一分钟，按时间升序）
+
+        Args:
+            code: 股票代码
+            rows: 分时数据（时间/收盘/最高/最低/成交量/成交额/均价）
+
+        Returns:
+            新确定的分钟数
+        """
+        i = self.index[code]
+        if rows is None or rows.empty:
+            return 0
+        times = rows["时间"].astype(str).tolist()
+        last_time = self.last_time[i]
+        if last_time is not None:
+            # 上次形成中的分钟已被更新或仍是最后一分钟，以本次数据为准，不计入累计量
+            start = bisect_left(times, last_time)
+            if start == len(times):
+                return 0
+            rows = rows.iloc[start:]
+            times = times[start:]
+
+        close = rows["收盘"].to_numpy(dtype=np.float64)
+        high = rows["最高"].to_numpy(dtype=np.float64)
+        low = rows["最低"].to_numpy(dtype=np.float64)
+        volume = rows["成交量"].to_numpy(dtype=np.float64)
+        amount = rows["成交额"].to_numpy(dtype=np.float64)
+
+        # 除最后一分钟外都已确定
+        for k in range(len(times) - 1):
+            self._commit(i, times[k][11:16], close[k], high[k], low[k], volume[k], amount[k])
+
+        self.last_time[i] = times[-1]
+        self.last_close[i] = close[-1]
+        self.last_high[i] = high[-1]
+        self.last_low[i] = low[-1]
+        self.last_volume[i] = volume[-1]
+        self.last_amount[i] = amount[-1]
+        self.last_is_tail[i] = times[-1][11:16] > self.tail_start
+        if "均价" in rows.columns:
+            self.last_avg_price[i] = float(rows["均价"].iloc[-1])
+        if not self.last_is_tail[i]:
+            self.tail_base[i] = close[-1]
+        return len(times) - 1
+
+    def poll(self) -> int:
+        """
+        从盘中日志读取全部候选股票的新分钟
+
+        Returns:
+            新确定的分钟数
+        """
+        trade_date = self.data_fetcher.get_intraday_trade_date()
+        if trade_date is None:
+            return 0
+        if trade_date != self.trade_date:
+            self._reset()
+            self.trade_date = trade_date
+        committed = 0
+        for code, i in self.index.items():
+            rows = self.data_fetcher.get_intraday_since(code, self.last_time[i], trade_date)
+            committed += self.ingest(code, rows)
+        return committed
+
+    # ---------- 指标与看板 ----------
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """
+        由累计量和形成中的最后一分钟计算各股票的尾盘指标（向量运算）
+
+        Returns:
+            {指标名: ndarray(股票数)}，没有分时的股票为 NaN
+        """
+        last = self.last_close
+        amount = self.amount + self.last_amount
+        volume = self.volume + self.last_volume
+        high = np.maximum(self.high, self.last_high)
+        low = np.minimum(self.low, self.last_low)
+        tail = self.last_is_tail
+        pre_volume = self.pre_volume + np.where(tail, 0, self.last_volume)
+        pre_minutes = self.pre_minutes + np.where(tail, 0, 1)
+        tail_volume = self.tail_volume + np.where(tail, self.last_volume, 0)
+        tail_minutes = self.tail_minutes + np.where(tail, 1, 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # 优先使用接口给出的累计均价，缺失时按成交额 / 成交量（手）计算
+            vwap = np.where(self.last_avg_price > 0, self.last_avg_price, amount / (volume * 100))
+            vwap_dev = (last / vwap - 1) * 100
+            tail_ratio = np.where(tail_minutes > 0,
+                                  (tail_volume / tail_minutes) / (pre_volume / pre_minutes), np.nan)
+            position = np.where(high > low, (last - low) / (high - low), 0.5)
+            tail_chg = np.where(tail_minutes > 0, (last / self.tail_base - 1) * 100, np.nan)
+        has_data = ~np.isnan(last)
+        position = np.where(has_data, position, np.nan)
+        return {
+            "最新价": last,
+            "均价": vwap,
+            "均价偏离": vwap_dev,
+            "尾盘量比": tail_ratio,
+            "日内位置": position,
+            "尾盘涨幅": tail_chg,
+        }
+
+    @staticmethod
+    def score(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        尾盘评分（0-100）：站上均价、尾盘温和放量、处于日内高位、尾盘小幅拉升得分高
+        尾盘放量超过 4 倍视为异常拉抬，放量得分减半
+        """
+        vwap_score = np.clip((metrics["均价偏离"] + 1) / 3, 0, 1)
+        ratio = metrics["尾盘量比"]
+        ratio_score = np.clip((ratio - 0.8) / 1.7, 0, 1) * np.where(ratio > 4, 0.5, 1)
+        position_score = np.clip(metrics["日内位置"], 0, 1)
+        chg_score = np.clip((metrics["尾盘涨幅"] + 0.5) / 2, 0, 1)
+        total = (SCORE_WEIGHTS["均价偏离"] * np.nan_to_num(vwap_score) +
+                 SCORE_WEIGHTS["尾盘量比"] * np.nan_to_num(ratio_score) +
+                 SCORE_WEIGHTS["日内位置"] * np.nan_to_num(position_score) +
+                 SCORE_WEIGHTS["尾盘涨幅"] * np.nan_to_num(chg_score))
+        return np.where(np.isnan(metrics["最新价"]), np.nan, np.round(total * 100, 1))
+
+    def update_board(self) -> pd.DataFrame:
+        """
+        按最新指标原地更新看板（index 为股票代码），返回按尾盘评分排序的视图
+        """
+        metrics = self.metrics()
+        scores = self.score(metrics)
+        if self.board.empty:
+            self.board = pd.DataFrame(index=pd.Index(self.codes), columns=BOARD_COLUMNS)
+            self.board["代码"] = self.codes
+            self.board["名称"] = [self.names.get(code, "") for code in self.codes]
+        for column, values in metrics.items():
+            self.board[column] = np.round(values, 3 if column == "日内位置" else 2)
+        self.board["尾盘评分"] = scores
+        self.board["信号"] = np.where(
+            (scores >= 70) & (metrics["均价偏离"] > 0) & (metrics["尾盘量比"] >= 1.2), "关注", ""
+        )
+        self.board["更新时间"] = [t[11:16] if t else "" for t in self.last_time]
+        return self.ranked()
+
+    def ranked(self, n: int = None) -> pd.DataFrame:
+        """按尾盘评分降序的看板（没有分时的股票排在最后）"""
+        board = self.board.sort_values(["尾盘评分", "代码"], ascending=[False, True], na_position="last")
+        board = board.reset_index(drop=True)
+        board.insert(0, "排名", np.arange(1, len(board) + 1))
+        return board.head(n) if n else board
+
+    # ---------- 实时循环 ----------
+    def refresh(self, concurrency: int = 10) -> Dict[str, float]:
+        """
+        一轮刷新：拉取候选股票当天分时追加到日志，增量计算后更新看板
+
+        Returns:
+            本轮统计（拉取/计算耗时、追加和确定的分钟数）
+        """
+        t_start = time.time()
+        appended = self.data_fetcher.refresh_intraday(self.codes, concurrency=concurrency)
+        t_fetched = time.time()
+        committed = self.poll()
+        self.update_board()
+        t_end = time.time()
+        return {
+            "fetch_seconds": round(t_fetched - t_start, 2),
+            "compute_seconds": round(t_end - t_fetched, 3),
+            "appended": appended,
+            "committed": committed,
+        }
+
+    def run(self, interval: float = 30, until: str = TAIL_END, concurrency: int = 10,
+            on_update=None, max_rounds: int = None):
+        """
+        按 interval 秒循环刷新，直到 until（HH:MM）或达到 max_rounds 轮
+
+        Args:
+            interval: 刷新间隔（秒，从上一轮开始计）
+            until: 结束时间
+            concurrency: 并发请求数
+            on_update: 每轮结束后调用 on_update(看板, 本轮统计)
+            max_rounds: 最多刷新轮数，None 表示不限
+        """
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            t_start = time.time()
+            try:
+                stats = self.refresh(concurrency)
+            except Exception as e:
+                self.logger.error(f"Tail window refresh failed: {e}")
+                stats = {"error": str(e)}
+            rounds += 1
+            if on_update is not None:
+                on_update(self.ranked(), stats)
+            if datetime.now().strftime("%H:%M") >= until:
+                break
+            if max_rounds is not None and rounds >= max_rounds:
+                break
+            time.sleep(max(0.0, interval - (time.time() - t_start)))